@@ -0,0 +1,40 @@
+"""booking unique user event
+
+Revision ID: 4c543ce21ce5
+Revises: 64cde37cc23d
+Create Date: 2026-10-18 12:40:03.514927
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4c543ce21ce5'
+down_revision = '64cde37cc23d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "DELETE FROM booking WHERE id IN ("
+        "SELECT id FROM ("
+        "SELECT id, row_number() OVER ("
+        "PARTITION BY user_id, event_id ORDER BY created_at, id"
+        ") AS number FROM booking"
+        ") AS duplicates WHERE duplicates.number > 1)"
+    )
+    op.execute(
+        "UPDATE event SET booked_count = ("
+        "SELECT count(booking.id) FROM booking "
+        "WHERE booking.event_id = event.id)"
+    )
+    op.create_unique_constraint(
+        'booking_user_id_event_id_key', 'booking', ['user_id', 'event_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        'booking_user_id_event_id_key', 'booking', type_='unique'
+    )
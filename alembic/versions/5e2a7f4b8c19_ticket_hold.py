@@ -0,0 +1,38 @@
+"""ticket_hold
+
+Revision ID: 5e2a7f4b8c19
+Revises: d71b0e5a9c36
+Create Date: 2026-10-18 14:48:55.104392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2a7f4b8c19'
+down_revision = 'd71b0e5a9c36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ticket_hold',
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['event.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_ticket_hold_expires_at'), 'ticket_hold', ['expires_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ticket_hold_expires_at'), table_name='ticket_hold')
+    op.drop_table('ticket_hold')
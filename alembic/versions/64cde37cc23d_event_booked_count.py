@@ -0,0 +1,34 @@
+"""event booked_count
+
+Revision ID: 64cde37cc23d
+Revises: 232edc8733d6
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '64cde37cc23d'
+down_revision = '232edc8733d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'event',
+        sa.Column(
+            'booked_count', sa.Integer(), server_default='0', nullable=False
+        )
+    )
+    op.execute(
+        "UPDATE event SET booked_count = ("
+        "SELECT count(booking.id) FROM booking "
+        "WHERE booking.event_id = event.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('event', 'booked_count')
@@ -0,0 +1,60 @@
+"""event place period exclusion
+
+Revision ID: 8c1d4e7a2f90
+Revises: f3b8d2a61c47
+Create Date: 2026-10-18 17:05:12.640871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1d4e7a2f90'
+down_revision = 'f3b8d2a61c47'
+branch_labels = None
+depends_on = None
+
+
+# Overlapping events are not removed here, they may have bookings, the
+# host has to move or delete them first.
+OVERLAPPING_EVENTS_QUERY = (
+    "SELECT event_a.place_id, event_a.id, event_b.id FROM event AS event_a "
+    "JOIN event AS event_b ON event_a.place_id = event_b.place_id "
+    "AND event_a.id < event_b.id "
+    "AND tsrange(event_a.event_start, event_a.event_end, '[)') "
+    "&& tsrange(event_b.event_start, event_b.event_end, '[)') "
+    "ORDER BY event_a.place_id, event_a.id, event_b.id"
+)
+OVERLAPPING_EVENTS_MESSAGE = (
+    "events of one place overlap, move or delete them before the "
+    "upgrade (place_id: event_id, event_id):\n{pairs}"
+)
+
+
+def check_overlapping_events():
+    rows = op.get_bind().execute(sa.text(OVERLAPPING_EVENTS_QUERY)).all()
+    if rows:
+        raise RuntimeError(
+            OVERLAPPING_EVENTS_MESSAGE.format(
+                pairs="\n".join(
+                    "{0}: {1}, {2}".format(*row) for row in rows
+                )
+            )
+        )
+
+
+def upgrade() -> None:
+    check_overlapping_events()
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.execute(
+        "ALTER TABLE event ADD CONSTRAINT event_place_id_period_excl "
+        "EXCLUDE USING gist "
+        "(place_id WITH =, tsrange(event_start, event_end, '[)') WITH &&)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        'event_place_id_period_excl', 'event', type_='exclude'
+    )
@@ -0,0 +1,25 @@
+"""black_list host user index
+
+Revision ID: a3f1c9d27b84
+Revises: 4c543ce21ce5
+Create Date: 2026-10-18 13:21:47.902113
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c9d27b84'
+down_revision = '4c543ce21ce5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_black_list_host_id_user_id', 'black_list', ['host_id', 'user_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_black_list_host_id_user_id', table_name='black_list')
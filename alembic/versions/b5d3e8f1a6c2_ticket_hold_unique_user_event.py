@@ -0,0 +1,45 @@
+"""ticket_hold unique user event
+
+Revision ID: b5d3e8f1a6c2
+Revises: 8c1d4e7a2f90
+Create Date: 2026-10-18 19:12:40.318275
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d3e8f1a6c2'
+down_revision = '8c1d4e7a2f90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "DELETE FROM ticket_hold WHERE id IN ("
+        "SELECT id FROM ("
+        "SELECT id, row_number() OVER ("
+        "PARTITION BY event_id, user_id ORDER BY expires_at DESC, id"
+        ") AS number FROM ticket_hold"
+        ") AS duplicates WHERE duplicates.number > 1)"
+    )
+    # Expired holds are counted too, the sweeper takes them off when it
+    # deletes them.
+    op.execute(
+        "UPDATE event SET booked_count = ("
+        "SELECT count(booking.id) FROM booking "
+        "WHERE booking.event_id = event.id) + ("
+        "SELECT count(ticket_hold.id) FROM ticket_hold "
+        "WHERE ticket_hold.event_id = event.id)"
+    )
+    op.create_unique_constraint(
+        'ticket_hold_event_id_user_id_key', 'ticket_hold',
+        ['event_id', 'user_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        'ticket_hold_event_id_user_id_key', 'ticket_hold', type_='unique'
+    )
@@ -0,0 +1,26 @@
+"""event film_checked_at
+
+Revision ID: c7e2f4a9d1b3
+Revises: b5d3e8f1a6c2
+Create Date: 2026-10-18 21:04:12.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e2f4a9d1b3'
+down_revision = 'b5d3e8f1a6c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'event', sa.Column('film_checked_at', sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('event', 'film_checked_at')
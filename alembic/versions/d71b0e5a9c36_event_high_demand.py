@@ -0,0 +1,30 @@
+"""event high_demand
+
+Revision ID: d71b0e5a9c36
+Revises: a3f1c9d27b84
+Create Date: 2026-10-18 14:02:18.675340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd71b0e5a9c36'
+down_revision = 'a3f1c9d27b84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'event',
+        sa.Column(
+            'high_demand', sa.Boolean(), server_default='false',
+            nullable=False
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('event', 'high_demand')
@@ -0,0 +1,35 @@
+"""event film_validation
+
+Revision ID: f3b8d2a61c47
+Revises: 5e2a7f4b8c19
+Create Date: 2026-10-18 16:12:40.218563
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8d2a61c47'
+down_revision = '5e2a7f4b8c19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'event',
+        sa.Column(
+            'film_validation', sa.String(length=16), server_default='valid',
+            nullable=False
+        )
+    )
+    op.create_index(
+        'ix_event_pending_film_work_id', 'event', ['film_work_id'],
+        postgresql_where=sa.text("film_validation = 'pending'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_pending_film_work_id', table_name='event')
+    op.drop_column('event', 'film_validation')
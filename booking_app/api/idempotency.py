@@ -0,0 +1,117 @@
+import hashlib
+import json
+import logging
+from functools import wraps
+from http import HTTPStatus
+
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from redis.exceptions import RedisError
+
+from booking_app.api.v1.defines import ERROR_MESSAGE
+from booking_app.db import redis_db
+from booking_app.settings import settings
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+IDEMPOTENCY_KEY = "idempotency:{user_id}:{method}:{path}:{key}"
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint():
+    return hashlib.sha256(request.get_data()).hexdigest()
+
+
+def _replay(stored, fingerprint):
+    if stored["fingerprint"] != fingerprint:
+        return jsonify(
+            {"status": "Idempotency-Key was used for another request"}
+        ), HTTPStatus.UNPROCESSABLE_ENTITY
+    if stored.get("status", None) is None:
+        return jsonify(
+            {"status": "request with this Idempotency-Key is in progress"}
+        ), HTTPStatus.CONFLICT
+    response = current_app.response_class(
+        stored["body"], status=stored["status"], mimetype="application/json"
+    )
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def _release(redis_key):
+    try:
+        redis_db.delete(redis_key)
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="idempotency", error=error))
+
+
+def _store(redis_key, fingerprint, response):
+    if (
+        response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+        or response.status_code == HTTPStatus.UNAUTHORIZED
+    ):
+        _release(redis_key)
+        return
+    try:
+        redis_db.set(
+            redis_key,
+            json.dumps({
+                "fingerprint": fingerprint,
+                "status": response.status_code,
+                "body": response.get_data(as_text=True),
+            }),
+            ex=settings.idempotency_ttl_seconds,
+        )
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="idempotency", error=error))
+
+
+def idempotent(func):
+    """Answer retries with the same Idempotency-Key by the first response.
+
+    Responses are kept in redis, so a retry costs one GET and skips
+    remote auth and validation. Must be applied after jwt_required,
+    keys are scoped by the user. Server errors and 401 are not kept.
+    """
+
+    @wraps(func)
+    def wrapped(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER, None)
+        if not key:
+            return func(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify(
+                {"status": "Idempotency-Key is too long"}
+            ), HTTPStatus.BAD_REQUEST
+        redis_key = IDEMPOTENCY_KEY.format(
+            user_id=get_jwt_identity(),
+            method=request.method,
+            path=request.path,
+            key=key,
+        )
+        fingerprint = _fingerprint()
+        try:
+            stored = redis_db.get(redis_key)
+            if stored is None and not redis_db.set(
+                redis_key,
+                json.dumps({"fingerprint": fingerprint}),
+                ex=settings.idempotency_lock_ttl_seconds,
+                nx=True,
+            ):
+                stored = redis_db.get(redis_key)
+        except RedisError as error:
+            logging.error(
+                ERROR_MESSAGE.format(api="idempotency", error=error)
+            )
+            return func(*args, **kwargs)
+        if stored is not None:
+            return _replay(json.loads(stored), fingerprint)
+        try:
+            response = make_response(func(*args, **kwargs))
+        except Exception:
+            _release(redis_key)
+            raise
+        _store(redis_key, fingerprint, response)
+        return response
+
+    return wrapped
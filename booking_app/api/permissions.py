@@ -1,12 +1,145 @@
+import hashlib
+import logging
+import time
 from functools import wraps
 from http import HTTPStatus
 
-import requests
 from flask import jsonify, request
-from flask_jwt_extended import get_jwt_identity
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from redis.exceptions import RedisError
 
+from booking_app.api.v1.defines import ERROR_MESSAGE
+from booking_app.cache import LocalCache
+from booking_app.concurrency import get_executor
+from booking_app.db import redis_db
+from booking_app.http_client import (UPSTREAM_ERRORS, CircuitOpenError,
+                                     http_client)
 from booking_app.settings import settings
 
+AUTH_DECISION_KEY = "auth:decision:{token_hash}"
+SUPERUSER_DECISION_KEY = "auth:superuser:{user_id}"
+UNAVAILABLE_MESSAGE = "authentication service unavailable"
+
+# Maps hashes of Authorization headers to the time the auth service
+# last confirmed them.
+_auth_decisions = LocalCache(
+    settings.auth_cache_local_size, settings.auth_cache_ttl_seconds
+)
+_superuser_decisions = LocalCache(
+    settings.auth_cache_local_size, settings.superuser_cache_ttl_seconds
+)
+
+
+def _token_hash(authorization):
+    return hashlib.sha256(authorization.encode()).hexdigest()
+
+
+def _decision_ttl(exp):
+    ttl = settings.auth_cache_ttl_seconds
+    if settings.auth_degraded_mode_enabled:
+        ttl = max(ttl, settings.auth_degraded_ttl_seconds)
+    if exp is not None:
+        ttl = min(ttl, exp - time.time())
+    return int(ttl)
+
+
+def _get_confirmed_at(token_hash, exp):
+    confirmed_at = _auth_decisions.get(token_hash, None)
+    if confirmed_at is not None:
+        return confirmed_at
+    try:
+        confirmed_at = redis_db.get(
+            AUTH_DECISION_KEY.format(token_hash=token_hash)
+        )
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="auth cache", error=error))
+        return None
+    if confirmed_at is None:
+        return None
+    confirmed_at = float(confirmed_at)
+    _auth_decisions.set(token_hash, confirmed_at, _decision_ttl(exp))
+    return confirmed_at
+
+
+def _save_decision(token_hash, confirmed_at, exp):
+    ttl = _decision_ttl(exp)
+    if ttl <= 0:
+        return
+    _auth_decisions.set(token_hash, confirmed_at, ttl)
+    try:
+        redis_db.set(
+            AUTH_DECISION_KEY.format(token_hash=token_hash),
+            confirmed_at,
+            ex=ttl,
+        )
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="auth cache", error=error))
+
+
+def drop_auth_decision(authorization):
+    """Forget the cached auth service decision about the token."""
+    token_hash = _token_hash(authorization)
+    _auth_decisions.delete(token_hash)
+    try:
+        redis_db.delete(AUTH_DECISION_KEY.format(token_hash=token_hash))
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="auth cache", error=error))
+
+
+def _degraded_decision(confirmed_at, now):
+    """Accept a recently confirmed token while the auth service fails."""
+    if (
+        settings.auth_degraded_mode_enabled
+        and confirmed_at is not None
+        and now - confirmed_at < settings.auth_degraded_ttl_seconds
+    ):
+        logging.warning("auth service unavailable, cached decision is used")
+        return True
+    return False
+
+
+def is_authenticated(authorization, exp):
+    """Ask the auth service about the token, unless it confirmed the same
+    Authorization header less than auth_cache_ttl_seconds ago.
+
+    Must be called after the JWT is verified, cached decisions never
+    outlive its exp. Does not need the request context. Raises
+    CircuitOpenError if the auth service is failing and there is no
+    cached decision to fall back to.
+    """
+    if not authorization:
+        return False
+    token_hash = _token_hash(authorization)
+    confirmed_at = _get_confirmed_at(token_hash, exp)
+    now = time.time()
+    if (
+        confirmed_at is not None
+        and now - confirmed_at < settings.auth_cache_ttl_seconds
+    ):
+        return True
+    try:
+        response = http_client.get(
+            "auth",
+            settings.auth_host,
+            headers={
+                "Authorization": authorization,
+            },
+        )
+    except CircuitOpenError:
+        if _degraded_decision(confirmed_at, now):
+            return True
+        raise
+    except UPSTREAM_ERRORS:
+        return _degraded_decision(confirmed_at, now)
+    if response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        return _degraded_decision(confirmed_at, now)
+    if response.status_code != HTTPStatus.OK:
+        if confirmed_at is not None:
+            drop_auth_decision(authorization)
+        return False
+    _save_decision(token_hash, now, exp)
+    return True
+
 
 def authentication_required(func):
     @wraps(func)
@@ -14,22 +147,107 @@ def authentication_required(func):
         headers = request.headers.environ
         authorization = headers.get("HTTP_AUTHORIZATION", None)
         try:
-            response = getattr(requests, "get")(
-                settings.auth_host,
-                headers={
-                    "Authorization": authorization,
-                },
+            authenticated = is_authenticated(
+                authorization, get_jwt().get("exp")
             )
-        except requests.exceptions.ConnectionError:
+        except CircuitOpenError:
+            return jsonify({"info": UNAVAILABLE_MESSAGE}), 503
+        if not authenticated:
             return jsonify({"info": "unauthorized access"}), 401
-        else:
-            if response.status_code != HTTPStatus.OK:
-                return jsonify({"info": "unauthorized access"}), 401
         return func(*args, **kwargs)
 
     return wrapped
 
 
+def _get_superuser_flag(user_id):
+    flag = _superuser_decisions.get(str(user_id), None)
+    if flag is not None:
+        return flag
+    try:
+        flag = redis_db.get(SUPERUSER_DECISION_KEY.format(user_id=user_id))
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="auth cache", error=error))
+        return None
+    if flag is None:
+        return None
+    flag = flag == b"1"
+    _superuser_decisions.set(str(user_id), flag)
+    return flag
+
+
+def _save_superuser_flag(user_id, flag):
+    ttl = settings.superuser_cache_ttl_seconds
+    if ttl <= 0:
+        return
+    _superuser_decisions.set(str(user_id), flag)
+    try:
+        redis_db.set(
+            SUPERUSER_DECISION_KEY.format(user_id=user_id),
+            int(flag),
+            ex=ttl,
+        )
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="auth cache", error=error))
+
+
+def drop_superuser_decision(user_id):
+    """Forget the cached superuser flag of the user."""
+    _superuser_decisions.delete(str(user_id))
+    try:
+        redis_db.delete(SUPERUSER_DECISION_KEY.format(user_id=user_id))
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="auth cache", error=error))
+
+
+def _fetch_superuser_flag(authorization, user_id):
+    """Returns None if the users service gave no answer about the user.
+
+    Raises CircuitOpenError if the users service is failing.
+    """
+    try:
+        response = http_client.get(
+            "users",
+            settings.get_user_host.format(id=user_id),
+            headers={
+                "Authorization": authorization,
+            },
+        )
+    except CircuitOpenError:
+        raise
+    except UPSTREAM_ERRORS:
+        return None
+    if response.status_code != HTTPStatus.OK:
+        return None
+    return response.json().get("is_superuser", False) is True
+
+
+def is_superuser(authorization, user_id, exp):
+    """Check the token and the superuser flag of its user.
+
+    The flag is cached per user for superuser_cache_ttl_seconds and is
+    dropped as soon as the token is rejected or the users service does
+    not confirm the user. On a miss the auth check and the users service
+    request run concurrently.
+    """
+    flag = _get_superuser_flag(user_id)
+    if flag is False:
+        return False
+    if flag is True:
+        if not is_authenticated(authorization, exp):
+            drop_superuser_decision(user_id)
+            return False
+        return True
+    authenticated = get_executor().submit(
+        is_authenticated, authorization, exp
+    )
+    flag = _fetch_superuser_flag(authorization, user_id)
+    if not authenticated.result() or flag is None:
+        drop_superuser_decision(user_id)
+        return False
+    _save_superuser_flag(user_id, flag)
+    return flag
+
+
 def superuser_authentication_required(func):
     @wraps(func)
     def wrapped(*args, **kwargs):
@@ -37,32 +255,13 @@ def superuser_authentication_required(func):
         authorization = headers.get("HTTP_AUTHORIZATION", None)
         user_id = get_jwt_identity()
         try:
-            response = getattr(requests, "get")(
-                settings.auth_host,
-                headers={
-                    "Authorization": authorization,
-                },
-            )
-        except requests.exceptions.ConnectionError:
-            return jsonify({"info": "unauthorized access"}), 401
-        else:
-            if response.status_code != HTTPStatus.OK:
-                return jsonify({"info": "unauthorized access"}), 401
-        try:
-            response = getattr(requests, "get")(
-                settings.get_user_host.format(id=user_id),
-                headers={
-                    "Authorization": authorization,
-                },
+            superuser = is_superuser(
+                authorization, user_id, get_jwt().get("exp")
             )
-        except requests.exceptions.ConnectionError:
+        except CircuitOpenError:
+            return jsonify({"info": UNAVAILABLE_MESSAGE}), 503
+        if not superuser:
             return jsonify({"info": "unauthorized access"}), 401
-        else:
-            if (
-                response.status_code != HTTPStatus.OK
-                or response.json().get("is_superuser", False) is False
-            ):
-                return jsonify({"info": "unauthorized access"}), 401
         return func(*args, **kwargs)
 
     return wrapped
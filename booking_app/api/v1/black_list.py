@@ -11,12 +11,16 @@ from booking_app.api.permissions import (authentication_required,
                                          superuser_authentication_required)
 from booking_app.api.v1.defines import (END_LOG_MESSAGE, ERROR_MESSAGE,
                                         START_LOG_MESSAGE)
-from booking_app.api.v1.models.black_list import (BlackList, BlackListCreate,
+from booking_app.api.v1.models.black_list import (BlackList,
+                                                  BlackListBulkCreate,
+                                                  BlackListBulkResult,
+                                                  BlackListCreate,
                                                   BlackListFilter)
 from booking_app.api.v1.models.common import Status
 from booking_app.api.v1.services.black_list import (BlackListCreator,
                                                     BlackListGetter,
                                                     BlackListRemover,
+                                                    BlackListsBulkCreator,
                                                     BlackListsGetter)
 from booking_app.db_models import BlackList as BlackList_db_model
 from booking_app.utils import booking_doc
@@ -195,6 +199,42 @@ def my_black_list():
     ], HTTPStatus.OK
 
 
+@black_list.route("/bulk/", methods=["POST"])
+@jwt_required(verify_type=False)
+@authentication_required
+@booking_doc.validate(
+    tags=["black list"],
+    json=BlackListBulkCreate,
+    resp=Response(
+        HTTP_200=(List[BlackListBulkResult], "Create black lists"),
+        HTTP_400=(Status, "Error"),
+    ),
+)
+def bulk_black_list():
+    logging.debug(
+        START_LOG_MESSAGE.format(api="BlackListBulkAPI", method="post")
+    )
+    user_id = get_jwt_identity()
+    try:
+        creator = BlackListsBulkCreator(
+            request, BlackList_db_model, "BlackListBulkAPI", user_id=user_id
+        )
+        result, info = creator.save()
+    except Exception as error:
+        logging.error(
+            ERROR_MESSAGE.format(api="BlackListBulkAPI", error=error)
+        )
+        return {"status": "false"}, HTTPStatus.BAD_REQUEST
+    if result is False:
+        return {"status": info}, HTTPStatus.BAD_REQUEST
+    logging.debug(
+        END_LOG_MESSAGE.format(api="BlackListBulkAPI", method="post")
+    )
+    return [
+        BlackListBulkResult(**obj).dict() for obj in creator.objects
+    ], HTTPStatus.OK
+
+
 black_list.add_url_rule("/", view_func=BlackListAPI.as_view("black_lists"))
 black_list.add_url_rule(
     "/<path:black_list_id>/",
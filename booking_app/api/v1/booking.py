@@ -7,18 +7,31 @@ from flask.views import MethodView
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from spectree import Response
 
+from booking_app.api.idempotency import idempotent
 from booking_app.api.permissions import authentication_required
+from booking_app.api.waiting_room import waiting_room_required
 from booking_app.api.v1.defines import (END_LOG_MESSAGE, ERROR_MESSAGE,
                                         START_LOG_MESSAGE)
-from booking_app.api.v1.models.booking import (Booking, BookingCreate,
-                                               BookingFilter, BookingUpdate,
-                                               MyBookingFilter)
+from booking_app.api.v1.models.booking import (Booking, BookingBulkCreate,
+                                               BookingBulkResult,
+                                               BookingCreate, BookingFilter,
+                                               BookingUpdate, Hold,
+                                               MyBookingFilter, Reservation,
+                                               WaitingRoomToken)
 from booking_app.api.v1.models.common import Status
 from booking_app.api.v1.services.booking import (BookingCreator, BookingGetter,
                                                  BookingRemover,
+                                                 BookingReserver,
+                                                 BookingsBulkCreator,
                                                  BookingsGetter,
-                                                 BookingUpdater)
+                                                 BookingUpdater,
+                                                 HoldConfirmer, TicketHolder)
+from booking_app.api.v1.services.reservation import get_reservation
+from booking_app.api.v1.services.waiting_room import (
+    get_waiting_room_status_or_raise_exception,
+    join_waiting_room_or_raise_exception)
 from booking_app.db_models import Booking as Booking_db_model
+from booking_app.settings import settings
 from booking_app.utils import booking_doc
 
 booking = Blueprint("booking", __name__)
@@ -52,12 +65,16 @@ class BookingAPI(MethodView):
         ], HTTPStatus.OK
 
     @jwt_required(verify_type=False)
+    @idempotent
+    @waiting_room_required
     @authentication_required
     @booking_doc.validate(
         tags=["booking"],
         json=BookingCreate,
         resp=Response(
-            HTTP_201=(Booking, "Create booking"), HTTP_400=(Status, "Error")
+            HTTP_201=(Booking, "Create booking"),
+            HTTP_202=(Reservation, "Reserve booking"),
+            HTTP_400=(Status, "Error"),
         ),
     )
     def post(self):
@@ -66,10 +83,16 @@ class BookingAPI(MethodView):
         )
         user_id = get_jwt_identity()
         try:
-            creator = BookingCreator(
-                request, Booking_db_model, "BookingAPI", user_id=user_id
-            )
-            result, info = creator.save()
+            if settings.booking_write_behind_enabled:
+                creator = BookingReserver(
+                    request, Booking_db_model, "BookingAPI", user_id=user_id
+                )
+                result, info = creator.reserve()
+            else:
+                creator = BookingCreator(
+                    request, Booking_db_model, "BookingAPI", user_id=user_id
+                )
+                result, info = creator.save()
         except Exception as error:
             logging.error(ERROR_MESSAGE.format(api="BookingAPI", error=error))
             return {"status": "false"}, HTTPStatus.BAD_REQUEST
@@ -77,6 +100,9 @@ class BookingAPI(MethodView):
             logging.info(f"BookingAPI {self.post.__name__} BAD_REQUEST")
             return {"status": info}, HTTPStatus.BAD_REQUEST
         logging.debug(f"BookingAPI {self.post.__name__} end")
+        if getattr(creator, "reservation", None) is not None:
+            return Reservation(**creator.reservation).dict(), \
+                HTTPStatus.ACCEPTED
         return Booking(**creator.object.to_dict()).dict(), HTTPStatus.CREATED
 
 
@@ -213,6 +239,165 @@ def my_booking():
     ], HTTPStatus.OK
 
 
+@booking.route("/bulk/", methods=["POST"])
+@jwt_required(verify_type=False)
+@authentication_required
+@booking_doc.validate(
+    tags=["booking"],
+    json=BookingBulkCreate,
+    resp=Response(
+        HTTP_200=(List[BookingBulkResult], "Create bookings"),
+        HTTP_400=(Status, "Error"),
+    ),
+)
+def bulk_booking():
+    logging.debug(
+        START_LOG_MESSAGE.format(api="BookingBulkAPI", method="post")
+    )
+    user_id = get_jwt_identity()
+    try:
+        creator = BookingsBulkCreator(
+            request, Booking_db_model, "BookingBulkAPI", user_id=user_id
+        )
+        result, info = creator.save()
+    except Exception as error:
+        logging.error(ERROR_MESSAGE.format(api="BookingBulkAPI", error=error))
+        return {"status": "false"}, HTTPStatus.BAD_REQUEST
+    if result is False:
+        return {"status": info}, HTTPStatus.BAD_REQUEST
+    logging.debug(END_LOG_MESSAGE.format(api="BookingBulkAPI", method="post"))
+    return [
+        BookingBulkResult(**obj).dict() for obj in creator.objects
+    ], HTTPStatus.OK
+
+
+@booking.route("/reservation/<reservation_id>/", methods=["GET"])
+@jwt_required(verify_type=False)
+@booking_doc.validate(
+    tags=["booking"],
+    resp=Response(
+        HTTP_200=(Reservation, "Get reservation status"),
+        HTTP_400=(Status, "Error"),
+    ),
+)
+def reservation_status(reservation_id):
+    logging.debug(START_LOG_MESSAGE.format(api="ReservationAPI", method="get"))
+    user_id = get_jwt_identity()
+    try:
+        reservation = get_reservation(reservation_id)
+    except Exception as error:
+        logging.error(ERROR_MESSAGE.format(api="ReservationAPI", error=error))
+        return {"status": "false"}, HTTPStatus.BAD_REQUEST
+    if not reservation or reservation["user_id"] != user_id:
+        return {"status": "reservation not exist"}, HTTPStatus.BAD_REQUEST
+    logging.debug(END_LOG_MESSAGE.format(api="ReservationAPI", method="get"))
+    return Reservation(**reservation).dict(), HTTPStatus.OK
+
+
+@booking.route("/hold/", methods=["POST"])
+@jwt_required(verify_type=False)
+@waiting_room_required
+@authentication_required
+@booking_doc.validate(
+    tags=["booking"],
+    json=BookingCreate,
+    resp=Response(
+        HTTP_201=(Hold, "Hold ticket"),
+        HTTP_400=(Status, "Error"),
+    ),
+)
+def hold_ticket():
+    logging.debug(START_LOG_MESSAGE.format(api="HoldAPI", method="post"))
+    user_id = get_jwt_identity()
+    try:
+        holder = TicketHolder(
+            request, Booking_db_model, "HoldAPI", user_id=user_id
+        )
+        result, info = holder.hold_ticket()
+    except Exception as error:
+        logging.error(ERROR_MESSAGE.format(api="HoldAPI", error=error))
+        return {"status": "false"}, HTTPStatus.BAD_REQUEST
+    if result is False:
+        return {"status": info}, HTTPStatus.BAD_REQUEST
+    logging.debug(END_LOG_MESSAGE.format(api="HoldAPI", method="post"))
+    return Hold(**holder.hold).dict(), HTTPStatus.CREATED
+
+
+@booking.route("/hold/<hold_id>/confirm/", methods=["POST"])
+@jwt_required(verify_type=False)
+@authentication_required
+@booking_doc.validate(
+    tags=["booking"],
+    resp=Response(
+        HTTP_201=(Booking, "Confirm hold"),
+        HTTP_400=(Status, "Error"),
+    ),
+)
+def confirm_hold(hold_id):
+    logging.debug(START_LOG_MESSAGE.format(api="HoldAPI", method="confirm"))
+    user_id = get_jwt_identity()
+    try:
+        confirmer = HoldConfirmer(
+            hold_id, Booking_db_model, "HoldAPI", user_id=user_id
+        )
+        result, info = confirmer.confirm()
+    except Exception as error:
+        logging.error(ERROR_MESSAGE.format(api="HoldAPI", error=error))
+        return {"status": "false"}, HTTPStatus.BAD_REQUEST
+    if result is False:
+        return {"status": info}, HTTPStatus.BAD_REQUEST
+    logging.debug(END_LOG_MESSAGE.format(api="HoldAPI", method="confirm"))
+    return Booking(**confirmer.object.to_dict()).dict(), HTTPStatus.CREATED
+
+
+@booking.route("/waiting_room/<event_id>/", methods=["POST"])
+@jwt_required(verify_type=False)
+@booking_doc.validate(
+    tags=["booking"],
+    resp=Response(
+        HTTP_200=(WaitingRoomToken, "Get waiting room position"),
+        HTTP_400=(Status, "Error"),
+    ),
+)
+def join_waiting_room(event_id):
+    logging.debug(
+        START_LOG_MESSAGE.format(api="WaitingRoomAPI", method="post")
+    )
+    user_id = get_jwt_identity()
+    try:
+        status = join_waiting_room_or_raise_exception(event_id, user_id)
+    except ValueError as error:
+        return {"status": str(error)}, HTTPStatus.BAD_REQUEST
+    except Exception as error:
+        logging.error(ERROR_MESSAGE.format(api="WaitingRoomAPI", error=error))
+        return {"status": "false"}, HTTPStatus.BAD_REQUEST
+    logging.debug(END_LOG_MESSAGE.format(api="WaitingRoomAPI", method="post"))
+    return WaitingRoomToken(**status).dict(), HTTPStatus.OK
+
+
+@booking.route("/waiting_room/token/<token>/", methods=["GET"])
+@jwt_required(verify_type=False)
+@booking_doc.validate(
+    tags=["booking"],
+    resp=Response(
+        HTTP_200=(WaitingRoomToken, "Get waiting room status"),
+        HTTP_400=(Status, "Error"),
+    ),
+)
+def waiting_room_status(token):
+    logging.debug(START_LOG_MESSAGE.format(api="WaitingRoomAPI", method="get"))
+    user_id = get_jwt_identity()
+    try:
+        status = get_waiting_room_status_or_raise_exception(token, user_id)
+    except ValueError as error:
+        return {"status": str(error)}, HTTPStatus.BAD_REQUEST
+    except Exception as error:
+        logging.error(ERROR_MESSAGE.format(api="WaitingRoomAPI", error=error))
+        return {"status": "false"}, HTTPStatus.BAD_REQUEST
+    logging.debug(END_LOG_MESSAGE.format(api="WaitingRoomAPI", method="get"))
+    return WaitingRoomToken(**status).dict(), HTTPStatus.OK
+
+
 booking.add_url_rule("/", view_func=BookingAPI.as_view("bookings"))
 booking.add_url_rule(
     "/<path:booking_id>/",
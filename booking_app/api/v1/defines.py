@@ -6,5 +6,8 @@ USER_IN_BLOCK_LIST = "user_in_block_list"
 BAD_REQUEST_MESSAGE = "{api} {method} bad_request"
 NOT_OWNER_MESSAGE = "only owner can change/delete the object"
 NOT_FOUND_MESSAGE = "Object {model} ({id}) not exist"
+NO_TICKETS_MESSAGE = "Event have not available tickets"
+INVALID_FILMS_MESSAGE = "events of films {ids} are marked invalid"
+UNRESOLVED_USERS_MESSAGE = "logins of users {user_ids} not resolved"
 
 DICT = "dict"
@@ -7,15 +7,18 @@ from flask.views import MethodView
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from spectree import Response
 
+from booking_app.api.idempotency import idempotent
 from booking_app.api.permissions import authentication_required
 from booking_app.api.v1.defines import (END_LOG_MESSAGE, ERROR_MESSAGE,
                                         START_LOG_MESSAGE)
 from booking_app.api.v1.models.common import Status
-from booking_app.api.v1.models.event import (Event, EventCreate, EventFilter,
+from booking_app.api.v1.models.event import (Event, EventCreate,
+                                             EventExpand, EventFilter,
                                              EventGet, EventUpdate)
-from booking_app.api.v1.services.event import (EventCreator, EventGetter,
-                                               EventRemover, EventsGetter,
-                                               EventUpdater)
+from booking_app.api.v1.services.event import (EXPAND_FILM, EventCreator,
+                                               EventGetter, EventRemover,
+                                               EventsGetter, EventUpdater,
+                                               expand_events_with_films)
 from booking_app.db_models import Event as Event_db_model
 from booking_app.utils import booking_doc
 
@@ -43,13 +46,19 @@ class EventAPI(MethodView):
             return {"status": "false"}, HTTPStatus.BAD_REQUEST
         if result is False:
             return {"status": info}, HTTPStatus.BAD_REQUEST
-        logging.debug(END_LOG_MESSAGE.format(api="EventAPI", method="get"))
-        return [
+        data = [
             EventGet(**city_obj.to_dict()).dict() for
             city_obj in getter.objects
-        ], HTTPStatus.OK
+        ]
+        if request.args.get("expand", None) == EXPAND_FILM:
+            expand_events_with_films(
+                data, request.headers.get("Authorization", None)
+            )
+        logging.debug(END_LOG_MESSAGE.format(api="EventAPI", method="get"))
+        return data, HTTPStatus.OK
 
     @jwt_required(verify_type=False)
+    @idempotent
     @authentication_required
     @booking_doc.validate(
         tags=["event"],
@@ -116,6 +125,7 @@ class EventDetailAPI(MethodView):
 
     @booking_doc.validate(
         tags=["event"],
+        query=EventExpand,
         resp=Response(
             HTTP_200=(Event, "Get event"), HTTP_400=(Status, "Error")
         ),
@@ -134,10 +144,15 @@ class EventDetailAPI(MethodView):
             return {"status": "false"}, HTTPStatus.BAD_REQUEST
         if result is False:
             return {"status": info}, HTTPStatus.BAD_REQUEST
+        data = EventGet(**getter.object.to_dict()).dict()
+        if request.args.get("expand", None) == EXPAND_FILM:
+            expand_events_with_films(
+                [data], request.headers.get("Authorization", None)
+            )
         logging.debug(
             END_LOG_MESSAGE.format(api="EventDetailAPI", method="get")
         )
-        return EventGet(**getter.object.to_dict()).dict(), HTTPStatus.OK
+        return data, HTTPStatus.OK
 
     @jwt_required(verify_type=False)
     @authentication_required
@@ -0,0 +1,41 @@
+import logging
+from http import HTTPStatus
+from typing import List
+
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required
+from spectree import Response
+
+from booking_app.api.permissions import authentication_required
+from booking_app.api.v1.defines import END_LOG_MESSAGE, START_LOG_MESSAGE
+from booking_app.api.v1.models.common import Status
+from booking_app.api.v1.models.films import FilmExists, FilmsWarmUp
+from booking_app.api.v1.services.films import warm_up_film_cache
+from booking_app.utils import booking_doc
+
+films = Blueprint("films", __name__)
+
+
+@films.route("/warm_up/", methods=["POST"])
+@jwt_required(verify_type=False)
+@authentication_required
+@booking_doc.validate(
+    tags=["films"],
+    json=FilmsWarmUp,
+    resp=Response(
+        HTTP_200=(List[FilmExists], "Check films and cache the result"),
+        HTTP_400=(Status, "Error"),
+    ),
+)
+def warm_up():
+    logging.debug(START_LOG_MESSAGE.format(api="FilmsAPI", method="post"))
+    result = warm_up_film_cache(
+        request.get_json()["film_work_ids"],
+        request.headers.get("Authorization", None),
+    )
+    data = [
+        FilmExists(film_work_id=film_work_id, exists=exists).dict()
+        for film_work_id, exists in result.items()
+    ]
+    logging.debug(END_LOG_MESSAGE.format(api="FilmsAPI", method="post"))
+    return data, HTTPStatus.OK
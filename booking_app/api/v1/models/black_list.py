@@ -16,6 +16,16 @@ class BlackListCreate(BaseModel):
     user_id: uuid.UUID
 
 
+class BlackListBulkCreate(BaseModel):
+    user_ids: List[uuid.UUID]
+
+
+class BlackListBulkResult(BaseModel):
+    user_id: uuid.UUID
+    status: str
+    black_list: Optional[BlackList]
+
+
 class BlackListFilter(BaseModel):
     host_id: Optional[uuid.UUID]
     user_id: Optional[uuid.UUID]
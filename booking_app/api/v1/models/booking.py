@@ -1,3 +1,4 @@
+import datetime
 import uuid
 from typing import List, Optional
 
@@ -12,10 +13,43 @@ class Booking(IDAndConfigMixin, CreateAtMixin):
     user_id: uuid.UUID
 
 
+class Reservation(BaseModel):
+    id: str
+    status: str
+    event_id: uuid.UUID
+    booking_id: Optional[uuid.UUID]
+    info: Optional[str]
+
+
+class Hold(BaseModel):
+    id: uuid.UUID
+    event_id: uuid.UUID
+    user_id: uuid.UUID
+    expires_at: datetime.datetime
+
+
+class WaitingRoomToken(BaseModel):
+    token: str
+    event_id: uuid.UUID
+    position: int
+    admitted: bool
+    ahead: int
+
+
 class BookingCreate(BaseModel):
     event_id: uuid.UUID
 
 
+class BookingBulkCreate(BaseModel):
+    event_ids: List[uuid.UUID]
+
+
+class BookingBulkResult(BaseModel):
+    event_id: uuid.UUID
+    status: str
+    booking: Optional[Booking]
+
+
 class BookingUpdate(BaseModel):
     event_id: Optional[uuid.UUID]
 
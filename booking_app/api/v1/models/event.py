@@ -1,25 +1,35 @@
 import datetime
 import uuid
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-import pytz
 from pydantic import BaseModel, Field, validator
+from pytz import utc
 
 from booking_app.api.v1.models.common import (CreateAtMixin, IDAndConfigMixin,
                                               validate_sorting_value)
+from booking_app.api.v1.services.utils import get_timezone
 from booking_app.db import db
-from booking_app.db_models import Booking as Booking_db_model
 from booking_app.db_models import Place as Place_db_model
 
 
 def get_local_date_str(date, timezone_str):
-    timezone = pytz.timezone(timezone_str)
-    timezone_utc = pytz.timezone("UTC")
-    date_utc = timezone_utc.localize(date)
-    localized_datetime = date_utc.astimezone(timezone)
+    date_utc = utc.localize(date)
+    localized_datetime = date_utc.astimezone(get_timezone(timezone_str))
     return str(localized_datetime)
 
 
+def get_event_timezone_str(values):
+    """City timezone given by Event.to_dict, the database is only asked
+    if it is missing.
+    """
+    timezone_str = values.get("timezone", None)
+    if timezone_str is None:
+        timezone_str = db.session.get(
+            Place_db_model, values["place_id"]
+        ).city.timezone
+    return timezone_str
+
+
 class Event(IDAndConfigMixin, CreateAtMixin):
     film_work_id: uuid.UUID
     place_id: uuid.UUID
@@ -27,42 +37,43 @@ class Event(IDAndConfigMixin, CreateAtMixin):
     event_end: str
     max_tickets_count: int
     host_id: uuid.UUID
+    high_demand: Optional[bool]
+    film_validation: Optional[str]
     number_of_available_tickets: Optional[int]
+    film: Optional[Dict[str, Any]]
 
 
 class EventGet(IDAndConfigMixin, CreateAtMixin):
     film_work_id: uuid.UUID
     place_id: uuid.UUID
+    timezone: Optional[str]
     event_start: datetime.datetime
     event_end: datetime.datetime
     max_tickets_count: int
     host_id: uuid.UUID
+    high_demand: bool = False
+    film_validation: str = "valid"
+    booked_count: int = 0
 
     def dict(self, *args, **kwargs):
         data = super().dict(*args, **kwargs)
+        data.pop("booked_count", None)
+        data.pop("timezone", None)
         data["number_of_available_tickets"] = self.number_of_available_tickets
         return data
 
     @property
     def number_of_available_tickets(cls, **kwargs):
-        return (
-            cls.max_tickets_count
-            - Booking_db_model.query.filter_by(event_id=cls.id).count()
-        )
+        """Read from event.booked_count, which bookings and holds keep."""
+        return max(cls.max_tickets_count - cls.booked_count, 0)
 
     @validator("event_start")
     def validate_event_start_timezone(cls, value, values, **kwargs):
-        timezone_str = db.session.get(
-            Place_db_model, values["place_id"]
-        ).city.timezone
-        return get_local_date_str(value, timezone_str)
+        return get_local_date_str(value, get_event_timezone_str(values))
 
     @validator("event_end")
     def validate_event_end_timezone(cls, value, values, **kwargs):
-        timezone_str = db.session.get(
-            Place_db_model, values["place_id"]
-        ).city.timezone
-        return get_local_date_str(value, timezone_str)
+        return get_local_date_str(value, get_event_timezone_str(values))
 
 
 class EventCreate(BaseModel):
@@ -71,6 +82,7 @@ class EventCreate(BaseModel):
     event_start: datetime.datetime
     event_end: datetime.datetime
     max_tickets_count: int
+    high_demand: Optional[bool]
 
 
 class EventUpdate(BaseModel):
@@ -79,6 +91,21 @@ class EventUpdate(BaseModel):
     event_start: Optional[datetime.datetime]
     event_end: Optional[datetime.datetime]
     max_tickets_count: Optional[int]
+    high_demand: Optional[bool]
+
+
+def validate_expand_value(value):
+    if value not in ["film"]:
+        raise ValueError("Expand invalid, must be film")
+    return value
+
+
+class EventExpand(BaseModel):
+    expand: Optional[str] = Field(example="&expand=film")
+
+    @validator("expand")
+    def validate_expand(cls, value, values, **kwargs):
+        return validate_expand_value(value)
 
 
 class EventFilter(BaseModel):
@@ -89,6 +116,11 @@ class EventFilter(BaseModel):
     sorting: Optional[
         List[str]
     ] = Field(example="&sorting=created_at&sorting=desc")
+    expand: Optional[str] = Field(example="&expand=film")
+
+    @validator("expand")
+    def validate_expand(cls, value, values, **kwargs):
+        return validate_expand_value(value)
 
     @validator("sorting")
     def validate_sorting(cls, value, values, **kwargs):
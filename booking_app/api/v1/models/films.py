@@ -0,0 +1,13 @@
+import uuid
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class FilmsWarmUp(BaseModel):
+    film_work_ids: List[uuid.UUID] = Field(min_items=1, max_items=100)
+
+
+class FilmExists(BaseModel):
+    film_work_id: uuid.UUID
+    exists: Optional[bool]
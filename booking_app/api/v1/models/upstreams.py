@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class Upstream(BaseModel):
+    name: str
+    requests: int
+    errors: int
+    average_latency_ms: float
+    max_latency_ms: float
+    state: str
+    opened: int
+    rejected: int
@@ -7,6 +7,7 @@ from flask.views import MethodView
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from spectree import Response
 
+from booking_app.api.idempotency import idempotent
 from booking_app.api.permissions import authentication_required
 from booking_app.api.v1.defines import (END_LOG_MESSAGE, ERROR_MESSAGE,
                                         START_LOG_MESSAGE)
@@ -50,6 +51,7 @@ class PlaceAPI(MethodView):
         ], HTTPStatus.OK
 
     @jwt_required(verify_type=False)
+    @idempotent
     @authentication_required
     @booking_doc.validate(
         tags=["place"],
@@ -142,10 +142,14 @@ class ObjUpdater:
             self.db.session.refresh(self.obj)
         except Exception as error:
             self.db.session.rollback()
-            logging.info(ERROR_MESSAGE.format(error=error))
-            return False, error
+            logging.info(ERROR_MESSAGE.format(api=self.api_name, error=error))
+            return False, self._save_error_info(error)
         return True, ""
 
+    def _save_error_info(self, error):
+        """Info returned for a failed save, subclasses map known errors."""
+        return "false"
+
     def _update_obj(self):
         for field, value in self.new_data.items():
             setattr(self.obj, field, value)
@@ -196,12 +200,13 @@ class ObjGetter:
         self.data = dict()
         self.api_name = api_name
         self.user_id = user_id
+        self.options: List = []
 
     def _get_obj_if_exist(self):
         try:
             obj_id_is_uuid_or_raise_exception(self.obj_id, self.api_name)
             self.obj = get_obj_if_exist_or_raise_exception(
-                self.obj_id, self.db_model, self.db
+                self.obj_id, self.db_model, self.db, options=self.options
             )
 
         except ValueError as error:
@@ -243,6 +248,7 @@ class ObjectsGetter:
         self.query_dict = query_dict
         self.join_filters: dict = dict()
         self.other_filters: List = []
+        self.options: List = []
         self.order_by: Optional[List] = query_dict.getlist("sorting", None)
 
     def _check_filters_obj_if_exist(self):
@@ -280,6 +286,8 @@ class ObjectsGetter:
                 )
         if len(self.other_filters) > 0:
             self._get_filtered_obj_with_other_filters()
+        if len(self.options) > 0:
+            self.objs = self.objs.options(*self.options)
         self._sorting()
         self.objs = self.objs.paginate(
             page=self.page, per_page=settings.page_size
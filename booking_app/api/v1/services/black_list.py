@@ -1,8 +1,20 @@
+import logging
+import uuid
+
+from sqlalchemy import insert, select
+
+from booking_app.api.v1.defines import ERROR_MESSAGE
 from booking_app.api.v1.services.base import (ObjCreator, ObjectsGetter,
                                               ObjGetter, ObjRemover)
-from booking_app.api.v1.services.validators.black_list import check_user_exist
+from booking_app.api.v1.services.black_list_cache import (
+    add_user_to_black_list_cache, black_list_cache_enabled,
+    drop_host_black_list_cache)
+from booking_app.api.v1.services.validators.black_list import (
+    check_user_exist, check_users_exist)
 from booking_app.api.v1.services.validators.common import \
     check_that_user_is_host
+from booking_app.db import db as _db
+from booking_app.settings import settings
 
 
 class BlackListCreator(ObjCreator):
@@ -12,11 +24,120 @@ class BlackListCreator(ObjCreator):
 
     def _validate(self):
         try:
-            check_user_exist(self.request, self.user_id)
+            check_user_exist(self.request, self.obj.user_id)
         except ValueError as error:
             return False, str(error)
         return True, ""
 
+    def _save_obj(self):
+        result, info = super()._save_obj()
+        if result is True and black_list_cache_enabled():
+            add_user_to_black_list_cache(self.obj.host_id, self.obj.user_id)
+        return result, info
+
+
+class BlackListsBulkCreator:
+    """Black-list several users for the request host.
+
+    Users are checked by batched requests to the users service and saved
+    by one insert, users already black-listed by the host are skipped.
+    """
+
+    def __init__(self, request, db_model, api_name, db=_db, user_id=None):
+        self.user_ids = [
+            str(uuid.UUID(str(user_id)))
+            for user_id in ObjCreator._get_data(request)["user_ids"]
+        ]
+        self.request = request
+        self.db_model: _db.Model = db_model
+        self.api_name: str = api_name
+        self.db: _db = db
+        self.user_id = user_id
+        self.results: dict = dict()
+        self.black_lists: dict = dict()
+
+    def _validate(self):
+        if len(self.user_ids) > settings.black_list_bulk_max_size:
+            return False, "too many users"
+        user_ids = list(dict.fromkeys(self.user_ids))
+        black_listed = {
+            str(user_id)
+            for user_id in self.db.session.execute(
+                select(self.db_model.user_id).where(
+                    self.db_model.host_id == self.user_id,
+                    self.db_model.user_id.in_(user_ids),
+                )
+            ).scalars()
+        }
+        for user_id in black_listed:
+            self.results[user_id] = "already exist"
+        user_ids = [
+            user_id for user_id in user_ids if user_id not in black_listed
+        ]
+        if user_ids:
+            errors = check_users_exist(self.request, user_ids)
+            for user_id in user_ids:
+                self.results[user_id] = errors.get(user_id, "user_id invalid")
+        return True, ""
+
+    def _save_objs(self, user_ids):
+        try:
+            rows = self.db.session.execute(
+                insert(self.db_model)
+                .values([
+                    {
+                        "id": uuid.uuid4(),
+                        "host_id": self.user_id,
+                        "user_id": user_id,
+                    }
+                    for user_id in user_ids
+                ])
+                .returning(
+                    self.db_model.id,
+                    self.db_model.host_id,
+                    self.db_model.user_id,
+                    self.db_model.created_at,
+                )
+            ).all()
+            self.db.session.commit()
+        except Exception as error:
+            self.db.session.rollback()
+            logging.error(ERROR_MESSAGE.format(api=self.api_name, error=error))
+            for user_id in user_ids:
+                self.results[user_id] = "false"
+            return
+        for row in rows:
+            self.results[str(row.user_id)] = "created"
+            self.black_lists[str(row.user_id)] = {
+                key: str(value) for key, value in row._asdict().items()
+            }
+            if black_list_cache_enabled():
+                add_user_to_black_list_cache(row.host_id, row.user_id)
+
+    def save(self):
+        result, info = self._validate()
+        if result is False:
+            return result, info
+        user_ids = [
+            user_id
+            for user_id, status in self.results.items()
+            if status is None
+        ]
+        if user_ids:
+            self._save_objs(user_ids)
+        return True, ""
+
+    @property
+    def objects(self):
+        return [
+            {
+                "user_id": user_id,
+                "status": self.results[user_id],
+                "black_list": self.black_lists.get(user_id, None),
+            }
+            for user_id in dict.fromkeys(self.user_ids)
+        ]
+
 
 class BlackListGetter(ObjGetter):
     def _validate(self):
@@ -44,3 +165,10 @@ class BlackListRemover(ObjRemover):
         except ValueError as error:
             return False, str(error)
         return True, ""
+
+    def _dell_obj(self):
+        host_id, user_id = self.obj.host_id, self.obj.user_id
+        result, info = super()._dell_obj()
+        if result is True and black_list_cache_enabled():
+            drop_host_black_list_cache(host_id, user_id)
+        return result, info
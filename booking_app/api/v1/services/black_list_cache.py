@@ -0,0 +1,174 @@
+import logging
+
+from redis.exceptions import RedisError
+from sqlalchemy import exists, select
+
+from booking_app.api.v1.defines import ERROR_MESSAGE
+from booking_app.cache import LocalCache
+from booking_app.db import db, redis_db
+from booking_app.db_models import BlackList as BlackList_db_model
+from booking_app.settings import settings
+
+BLACK_LIST_KEY = "black_list:{host_id}:users"
+# Bumped by every change of the black list of the host. A set read from
+# postgres is only stored if the version did not change meanwhile, so a
+# load can not overwrite a concurrent add or removal.
+BLACK_LIST_VERSION_KEY = "black_list:{host_id}:version"
+
+# Kept in every loaded set, so a host without black-listed users is
+# still told apart from a host whose set is not loaded.
+LOADED_MARKER = "loaded"
+
+# ARGV: version read before postgres, ttl, marker and user ids.
+LOAD_SCRIPT = """
+local version = redis.call('GET', KEYS[2]) or ''
+if version ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+for i = 3, #ARGV, 1000 do
+    redis.call('SADD', KEYS[1], unpack(ARGV, i, math.min(i + 999, #ARGV)))
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+ADD_USER_SCRIPT = """
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('SADD', KEYS[1], ARGV[1])
+end
+return false
+"""
+
+DROP_SCRIPT = """
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return redis.call('DEL', KEYS[1])
+"""
+
+load_script = redis_db.script(LOAD_SCRIPT)
+add_user_script = redis_db.script(ADD_USER_SCRIPT)
+drop_script = redis_db.script(DROP_SCRIPT)
+
+# Only the app worker that changes a black list clears its entries, the
+# others may answer from their entries for their whole ttl.
+_local_cache = LocalCache(
+    settings.black_list_local_cache_size,
+    settings.black_list_local_cache_ttl_seconds,
+)
+
+
+def black_list_cache_enabled():
+    return settings.black_list_cache_enabled
+
+
+def _user_in_black_list_in_db(host_id, user_id):
+    return db.session.execute(
+        select(
+            exists().where(
+                BlackList_db_model.host_id == host_id,
+                BlackList_db_model.user_id == user_id,
+            )
+        )
+    ).scalar()
+
+
+def _keys(host_id):
+    return [
+        BLACK_LIST_KEY.format(host_id=host_id),
+        BLACK_LIST_VERSION_KEY.format(host_id=host_id),
+    ]
+
+
+def _get_version(host_id):
+    version = redis_db.get(BLACK_LIST_VERSION_KEY.format(host_id=host_id))
+    return version.decode() if version is not None else ""
+
+
+def _store_black_list(host_id, version, user_ids):
+    """Store the set unless the black list changed after version was read.
+
+    Returns True if the set was stored.
+    """
+    return bool(
+        load_script(
+            keys=_keys(host_id),
+            args=[
+                version,
+                settings.black_list_cache_ttl_seconds,
+                LOADED_MARKER,
+                *user_ids,
+            ],
+        )
+    )
+
+
+def _load_black_list(host_id):
+    """Copy black-listed users of the host from postgres to redis."""
+    version = _get_version(host_id)
+    user_ids = {
+        str(user_id)
+        for user_id in db.session.execute(
+            select(BlackList_db_model.user_id).where(
+                BlackList_db_model.host_id == host_id
+            )
+        ).scalars()
+    }
+    _store_black_list(host_id, version, user_ids)
+    return user_ids
+
+
+def user_in_black_list(host_id, user_id):
+    """Check black list membership without touching postgres if possible.
+
+    The in-process cache is tried first, then the redis set of the host.
+    A host whose set is not loaded yet is loaded from postgres, which is
+    also used directly if redis is unavailable.
+    """
+    local_key = (str(host_id), str(user_id))
+    in_black_list = _local_cache.get(local_key, None)
+    if in_black_list is not None:
+        return in_black_list
+    try:
+        pipeline = redis_db.pipeline(transaction=False)
+        pipeline.exists(BLACK_LIST_KEY.format(host_id=host_id))
+        pipeline.sismember(
+            BLACK_LIST_KEY.format(host_id=host_id), str(user_id)
+        )
+        loaded, in_black_list = pipeline.execute()
+        if not loaded:
+            in_black_list = str(user_id) in _load_black_list(host_id)
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="black list", error=error))
+        in_black_list = _user_in_black_list_in_db(host_id, user_id)
+    in_black_list = bool(in_black_list)
+    _local_cache.set(local_key, in_black_list)
+    return in_black_list
+
+
+def add_user_to_black_list_cache(host_id, user_id):
+    _local_cache.delete((str(host_id), str(user_id)))
+    try:
+        add_user_script(
+            keys=_keys(host_id),
+            args=[str(user_id), settings.black_list_cache_ttl_seconds],
+        )
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="black list", error=error))
+
+
+def drop_host_black_list_cache(host_id, user_id):
+    """Forget the host set after a removal.
+
+    The black list may keep the same user more than once, so the set is
+    reloaded from postgres instead of removing the user from it.
+    """
+    _local_cache.delete((str(host_id), str(user_id)))
+    try:
+        drop_script(
+            keys=_keys(host_id), args=[settings.black_list_cache_ttl_seconds]
+        )
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="black list", error=error))
@@ -1,14 +1,37 @@
+import logging
+import uuid
+
+from redis.exceptions import RedisError
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+from booking_app.api.v1.defines import (ERROR_MESSAGE, EXIST_LOG_MESSAGE,
+                                        NO_TICKETS_MESSAGE)
 from booking_app.api.v1.services.base import (ObjCreator, ObjectsGetter,
                                               ObjGetter, ObjRemover,
                                               ObjUpdater)
+from booking_app.api.v1.services.holds import (
+    confirm_hold_or_raise_exception, create_hold_or_raise_exception)
+from booking_app.api.v1.services.reservation import \
+    create_reservation_or_raise_exception
+from booking_app.api.v1.services.tickets import (
+    claim_inventory_ticket_or_raise_exception, insert_bookings,
+    inventory_enabled, return_event_ticket, return_inventory_ticket,
+    take_event_ticket_or_raise_exception, take_events_tickets)
 from booking_app.api.v1.services.validators.booking import (
-    check_booking_not_exist_or_raise_exception,
+    check_booking_admission_or_raise_exception,
     check_event_exist_or_raise_exception,
     check_event_have_available_tickets_or_raise_exception,
-    check_event_not_finished_or_raise_exception,
     check_that_user_is_host_or_owner, check_that_user_is_not_host,
-    check_that_user_is_owner, check_user_not_in_black_list_or_raise_exception)
+    check_that_user_is_owner, check_user_has_no_booking_or_raise_exception,
+    get_booking_admission, get_bookings_admission)
+from booking_app.api.v1.services.validators.common import (
+    obj_id_is_uuid_or_raise_exception, raise_exception_if_unique_violation)
+from booking_app.api.v1.services.waiting_room import (TOKEN_REQUIRED_MESSAGE,
+                                                      get_high_demand_events)
+from booking_app.db import db as _db
 from booking_app.db_models import Event as Event_db_model
+from booking_app.settings import settings
 
 
 class BookingCreator(ObjCreator):
@@ -18,33 +41,314 @@ class BookingCreator(ObjCreator):
 
     def _validate(self):
         try:
-            check_event_exist_or_raise_exception(self.obj.event_id)
-            check_event_not_finished_or_raise_exception(
-                self.obj, self.api_name
+            admission = get_booking_admission(
+                self.obj.event_id, self.obj.user_id
+            )
+            check_booking_admission_or_raise_exception(
+                admission, self.obj, self.api_name
+            )
+        except ValueError as error:
+            return False, str(error)
+        return True, ""
+
+    def _save_obj(self):
+        try:
+            rows = insert_bookings([
+                {"event_id": self.obj.event_id, "user_id": self.obj.user_id}
+            ])
+            if not rows:
+                logging.info(EXIST_LOG_MESSAGE.format(model="booking"))
+                raise ValueError("already exist")
+            take_event_ticket_or_raise_exception(self.obj.event_id)
+            self.db.session.commit()
+        except ValueError as error:
+            self.db.session.rollback()
+            return False, str(error)
+        except Exception as error:
+            self.db.session.rollback()
+            return False, error
+        self.obj = self.db_model(**rows[0]._asdict())
+        return True, ""
+
+    def save(self):
+        if not inventory_enabled():
+            return super().save()
+        event_id = self.obj.event_id
+        try:
+            claimed = claim_inventory_ticket_or_raise_exception(event_id)
+        except ValueError as error:
+            return False, str(error)
+        result, info = super().save()
+        if result is False and claimed:
+            return_inventory_ticket(event_id)
+        return result, info
+
+
+class BookingReserver(BookingCreator):
+    """Claim a ticket and leave writing the booking to the booking worker."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reservation = None
+
+    def reserve(self):
+        result, info = self._validate()
+        if result is False:
+            return result, info
+        event_id = self.obj.event_id
+        claimed = False
+        try:
+            claimed = claim_inventory_ticket_or_raise_exception(event_id)
+            if not claimed:
+                return self.save()
+            self.reservation = create_reservation_or_raise_exception(
+                event_id, self.obj.user_id
+            )
+        except ValueError as error:
+            if claimed:
+                return_inventory_ticket(event_id)
+            return False, str(error)
+        except RedisError as error:
+            logging.error(ERROR_MESSAGE.format(api=self.api_name, error=error))
+            return_inventory_ticket(event_id)
+            return self.save()
+        return True, ""
+
+
+class TicketHolder(BookingCreator):
+    """Hold a ticket for the user instead of booking it at once."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.hold = None
+
+    def hold_ticket(self):
+        result, info = self._validate()
+        if result is False:
+            return result, info
+        try:
+            # A confirmation would fail, the hold would only keep the
+            # ticket off sale.
+            check_user_has_no_booking_or_raise_exception(
+                self.obj.event_id, self.obj.user_id
             )
-            check_booking_not_exist_or_raise_exception(self.obj)
-            check_user_not_in_black_list_or_raise_exception(self.obj)
-            check_that_user_is_not_host(self.obj)
-            check_event_have_available_tickets_or_raise_exception(self.obj)
+            self.hold = create_hold_or_raise_exception(
+                self.obj.event_id, self.obj.user_id
+            )
+        except ValueError as error:
+            return False, str(error)
+        return True, ""
+
+
+class HoldConfirmer:
+    def __init__(self, hold_id, db_model, api_name, user_id=None):
+        self.hold_id = hold_id
+        self.db_model: _db.Model = db_model
+        self.api_name: str = api_name
+        self.user_id = user_id
+        self.obj = None
+
+    def confirm(self):
+        try:
+            obj_id_is_uuid_or_raise_exception(self.hold_id, self.api_name)
+            row = confirm_hold_or_raise_exception(self.hold_id, self.user_id)
         except ValueError as error:
             return False, str(error)
+        self.obj = self.db_model(**row._asdict())
+        return True, ""
+
+    @property
+    def object(self):
+        if self.obj is None:
+            raise ValueError("object not found")
+        return self.obj
+
+
+class BookingsBulkCreator:
+    """Book several events for the request user with set based queries.
+
+    Every event is admitted by the same checks as in BookingCreator.
+    """
+
+    def __init__(self, request, db_model, api_name, db=_db, user_id=None):
+        self.event_ids = [
+            str(uuid.UUID(str(event_id)))
+            for event_id in ObjCreator._get_data(request)["event_ids"]
+        ]
+        self.db_model: _db.Model = db_model
+        self.api_name: str = api_name
+        self.db: _db = db
+        self.user_id = user_id
+        self.results: dict = dict()
+        self.bookings: dict = dict()
+
+    def _validate(self):
+        if len(self.event_ids) > settings.bulk_booking_max_size:
+            return False, "too many events"
+        admissions = get_bookings_admission(
+            list(set(self.event_ids)), self.user_id
+        )
+        for event_id in get_high_demand_events(list(set(self.event_ids))):
+            self.results[event_id] = TOKEN_REQUIRED_MESSAGE
+        for event_id in self.event_ids:
+            if event_id in self.results:
+                continue
+            booking = self.db_model(event_id=event_id, user_id=self.user_id)
+            try:
+                check_booking_admission_or_raise_exception(
+                    admissions.get(event_id, None), booking, self.api_name
+                )
+            except ValueError as error:
+                self.results[event_id] = str(error)
+                continue
+            self.results[event_id] = None
+        return True, ""
+
+    def _claim_inventory_tickets(self, event_ids):
+        claimed = []
+        for event_id in event_ids:
+            try:
+                if claim_inventory_ticket_or_raise_exception(event_id):
+                    claimed.append(event_id)
+            except ValueError as error:
+                self.results[event_id] = str(error)
+        return claimed
+
+    def _save_objs(self, event_ids):
+        try:
+            rows = insert_bookings([
+                {"event_id": event_id, "user_id": self.user_id}
+                for event_id in event_ids
+            ])
+            inserted = {str(row.event_id): row for row in rows}
+            ticketed_ids = take_events_tickets(list(inserted))
+            sold_out_ids = [
+                event_id
+                for event_id in inserted
+                if event_id not in ticketed_ids
+            ]
+            if sold_out_ids:
+                self.db.session.execute(
+                    delete(self.db_model).where(
+                        self.db_model.user_id == self.user_id,
+                        self.db_model.event_id.in_(sold_out_ids),
+                    )
+                )
+            self.db.session.commit()
+        except Exception as error:
+            self.db.session.rollback()
+            logging.error(ERROR_MESSAGE.format(api=self.api_name, error=error))
+            for event_id in event_ids:
+                self.results[event_id] = "false"
+            return
+        for event_id in event_ids:
+            if event_id not in inserted:
+                self.results[event_id] = "already exist"
+            elif event_id not in ticketed_ids:
+                self.results[event_id] = NO_TICKETS_MESSAGE
+            else:
+                self.results[event_id] = "created"
+                self.bookings[event_id] = {
+                    key: str(value)
+                    for key, value in inserted[event_id]._asdict().items()
+                }
+
+    def save(self):
+        result, info = self._validate()
+        if result is False:
+            return result, info
+        event_ids = [
+            event_id
+            for event_id, status in self.results.items()
+            if status is None
+        ]
+        claimed = []
+        if inventory_enabled():
+            claimed = self._claim_inventory_tickets(event_ids)
+            event_ids = [
+                event_id
+                for event_id in event_ids
+                if self.results[event_id] is None
+            ]
+        if event_ids:
+            self._save_objs(event_ids)
+        for event_id in claimed:
+            if event_id not in self.bookings:
+                return_inventory_ticket(event_id)
         return True, ""
 
+    @property
+    def objects(self):
+        return [
+            {
+                "event_id": event_id,
+                "status": self.results[event_id],
+                "booking": self.bookings.get(event_id, None),
+            }
+            for event_id in self.event_ids
+        ]
+
 
 class BookingUpdater(ObjUpdater):
+    def _update_obj(self):
+        self.old_event_id = self.obj.event_id
+        super()._update_obj()
+
+    def _event_changed(self):
+        return str(self.obj.event_id) != str(self.old_event_id)
+
     def _validate(self):
         try:
             event_id = self.new_data.get("event_id", None)
             if event_id is not None:
-                check_event_exist_or_raise_exception(event_id)
-                check_booking_not_exist_or_raise_exception(self.obj)
+                admission = get_booking_admission(event_id, self.obj.user_id)
+                check_event_exist_or_raise_exception(admission, event_id)
                 check_that_user_is_owner(self.obj, self.user_id)
-                check_that_user_is_not_host(self.obj)
-                check_event_have_available_tickets_or_raise_exception(self.obj)
+                check_that_user_is_not_host(admission, self.obj.user_id)
+                if self._event_changed():
+                    # Bookings of high demand events are made through the
+                    # waiting room only.
+                    if get_high_demand_events([event_id]):
+                        raise ValueError(TOKEN_REQUIRED_MESSAGE)
+                    check_event_have_available_tickets_or_raise_exception(
+                        admission
+                    )
         except ValueError as error:
             return False, str(error)
         return True, ""
 
+    def _save(self):
+        if not self._event_changed():
+            return super()._save()
+        event_id = self.obj.event_id
+        claimed = False
+        try:
+            if inventory_enabled():
+                claimed = claim_inventory_ticket_or_raise_exception(event_id)
+            try:
+                self.db.session.flush()
+            except IntegrityError as error:
+                raise_exception_if_unique_violation(error, "booking")
+                raise
+            take_event_ticket_or_raise_exception(event_id)
+        except ValueError as error:
+            self.db.session.rollback()
+            if claimed:
+                return_inventory_ticket(event_id)
+            return False, str(error)
+        except Exception:
+            self.db.session.rollback()
+            if claimed:
+                return_inventory_ticket(event_id)
+            raise
+        return_event_ticket(self.old_event_id)
+        result, info = super()._save()
+        if claimed and result is False:
+            return_inventory_ticket(event_id)
+        elif inventory_enabled() and result is True:
+            return_inventory_ticket(self.old_event_id)
+        return result, info
+
 
 class BookingGetter(ObjGetter):
     pass
@@ -75,3 +379,11 @@ class BookingRemover(ObjRemover):
         except ValueError as error:
             return False, str(error)
         return True, ""
+
+    def _dell_obj(self):
+        event_id = self.obj.event_id
+        return_event_ticket(event_id)
+        result, info = super()._dell_obj()
+        if result is True and inventory_enabled():
+            return_inventory_ticket(event_id)
+        return result, info
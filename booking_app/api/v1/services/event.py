@@ -1,3 +1,5 @@
+from sqlalchemy.orm import joinedload
+
 from booking_app.api.v1.services.base import (
     ObjCreator,
     ObjectsGetter,
@@ -5,39 +7,112 @@ from booking_app.api.v1.services.base import (
     ObjRemover,
     ObjUpdater
 )
+from booking_app.api.v1.services.film_validation import \
+    deferred_film_validation_enabled
+from booking_app.api.v1.services.films import get_films_metadata
+from booking_app.api.v1.services.tickets import (drop_event_inventory,
+                                                 inventory_enabled)
 from booking_app.api.v1.services.utils import change_date_str_to_utc_format
 from booking_app.api.v1.services.validators.common import \
     check_that_user_is_host
 from booking_app.api.v1.services.validators.event import (
     check_event_date_and_set_to_default_tz, check_film_work_id,
-    check_place_host_is_request_user, get_place_if_exist_or_raise_exception)
+    check_place_host_is_request_user, get_place_if_exist_or_raise_exception,
+    raise_exception_if_place_occupied)
 from booking_app.api.v1.services.validators.place import \
     check_max_tickets_count
+from booking_app.api.v1.services.waiting_room import (set_event_high_demand,
+                                                      waiting_room_enabled)
+from booking_app.concurrency import submit_in_request_context
+from booking_app.db_models import FILM_INVALID, FILM_PENDING
 from booking_app.db_models import Event as Event_db_model
 from booking_app.db_models import Place as Place_db_model
 
 
+EXPAND_FILM = "film"
+# Loads the place and city of events in their SELECT, EventGet needs the
+# city timezone of every event.
+EVENT_TIMEZONE_OPTIONS = [
+    joinedload(Event_db_model.place).joinedload(Place_db_model.city)
+]
+
+
+def expand_events_with_films(events, authorization):
+    """Embed films of the events, fetched once per distinct film."""
+    films = get_films_metadata(
+        [event["film_work_id"] for event in events], authorization
+    )
+    for event in events:
+        event["film"] = films[str(event["film_work_id"])]
+    return events
+
+
+def start_film_check(request, film_work_id):
+    """Start the remote film check, it does not depend on database checks.
+
+    Returns None if films are checked later by the worker.
+    """
+    if deferred_film_validation_enabled():
+        return None
+    return submit_in_request_context(check_film_work_id, request, film_work_id)
+
+
+def cancel_film_check(film_check):
+    """Drop a film check whose result is not needed any more.
+
+    A check that did not start is removed from the pool, a running one
+    finishes in the background.
+    """
+    if film_check is not None:
+        film_check.cancel()
+
+
 class EventCreator(ObjCreator):
     def _create_obj(self):
         self.data["host_id"] = self.user_id
         return self.db_model(**self.data)
 
     def _validate(self):
+        film_check = None
         try:
             check_place_host_is_request_user(self.obj, self.user_id)
+            film_check = start_film_check(
+                self.request, self.obj.film_work_id
+            )
             place = get_place_if_exist_or_raise_exception(self.obj.place_id)
             self.obj = check_event_date_and_set_to_default_tz(place, self.obj)
             check_max_tickets_count(self.obj.max_tickets_count, self.api_name)
-            check_film_work_id(self.request, self.obj.film_work_id)
+            if film_check is None:
+                self.obj.film_validation = FILM_PENDING
+            else:
+                film_check.result()
         except ValueError as error:
+            cancel_film_check(film_check)
             return False, str(error)
         return True, ""
 
+    def _save_obj(self):
+        result, info = super()._save_obj()
+        if result is False:
+            try:
+                raise_exception_if_place_occupied(info)
+            except ValueError as error:
+                return False, str(error)
+        if result is True and waiting_room_enabled() and self.obj.high_demand:
+            set_event_high_demand(self.obj.id, True)
+        return result, info
+
 
 class EventUpdater(ObjUpdater):
     def _validate(self):
+        film_check = None
         try:
             check_place_host_is_request_user(self.obj, self.user_id)
+            film_changed = self.new_data.get("film_work_id", None) is not None
+            if film_changed:
+                film_check = start_film_check(
+                    self.request, self.obj.film_work_id
+                )
             place = get_place_if_exist_or_raise_exception(self.obj.place_id)
             if (
                 self.new_data.get("event_start", None) is not None
@@ -50,18 +125,50 @@ class EventUpdater(ObjUpdater):
                 check_max_tickets_count(
                     self.obj.max_tickets_count, self.api_name
                 )
-            if self.new_data.get("film_work_id", None) is not None:
-                check_film_work_id(self.request, self.obj.film_work_id)
+            if film_changed and film_check is None:
+                self.obj.film_validation = FILM_PENDING
+            elif film_changed:
+                film_check.result()
         except ValueError as error:
+            cancel_film_check(film_check)
             return False, str(error)
         return True, ""
 
+    def _save_error_info(self, error):
+        try:
+            raise_exception_if_place_occupied(error)
+        except ValueError as occupied_error:
+            return str(occupied_error)
+        return super()._save_error_info(error)
+
+    def _save(self):
+        result, info = super()._save()
+        if (
+            result is True
+            and inventory_enabled()
+            and self.new_data.get("max_tickets_count", None) is not None
+        ):
+            drop_event_inventory(self.obj.id)
+        if (
+            result is True
+            and waiting_room_enabled()
+            and self.new_data.get("high_demand", None) is not None
+        ):
+            set_event_high_demand(self.obj.id, self.obj.high_demand)
+        return result, info
+
 
 class EventGetter(ObjGetter):
-    pass
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.options = EVENT_TIMEZONE_OPTIONS
 
 
 class EventsGetter(ObjectsGetter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.options = EVENT_TIMEZONE_OPTIONS
+
     def _check_filters_obj_if_exist(self):
         place_id = self.query_dict.get("place_id", None)
         if place_id is not None:
@@ -72,6 +179,9 @@ class EventsGetter(ObjectsGetter):
         host_id = self.query_dict.get("host_id", None)
         if host_id is not None:
             self.filters["host_id"] = host_id
+        self.other_filters.append(
+            Event_db_model.film_validation != FILM_INVALID
+        )
         earlier_than = self.query_dict.get("earlier_than", None)
         later_than = self.query_dict.get("later_than", None)
         if earlier_than:
@@ -94,3 +204,12 @@ class EventRemover(ObjRemover):
         except ValueError as error:
             return False, str(error)
         return True, ""
+
+    def _dell_obj(self):
+        event_id = self.obj.id
+        result, info = super()._dell_obj()
+        if result is True and inventory_enabled():
+            drop_event_inventory(event_id)
+        if result is True and waiting_room_enabled():
+            set_event_high_demand(event_id, False)
+        return result, info
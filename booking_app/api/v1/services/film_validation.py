@@ -0,0 +1,87 @@
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, or_, select, update
+
+from booking_app.api.v1.defines import INVALID_FILMS_MESSAGE
+from booking_app.api.v1.services.films import warm_up_film_cache
+from booking_app.db import db
+from booking_app.db_models import FILM_INVALID, FILM_PENDING, FILM_VALID
+from booking_app.db_models import Event as Event_db_model
+from booking_app.settings import settings
+
+
+def deferred_film_validation_enabled():
+    return settings.deferred_film_validation_enabled
+
+
+def validate_pending_events(batch_size):
+    """Check films of pending events, returns the number of films.
+
+    Every film is checked once for all of its pending events. Events of
+    films the films service could not answer about stay pending, they get
+    film_checked_at and are checked again after
+    FILM_VALIDATION_RETRY_SECONDS. Films never checked go first, then the
+    ones checked least recently.
+    """
+    checked_at = datetime.utcnow()
+    retry_after = checked_at - timedelta(
+        seconds=settings.film_validation_retry_seconds
+    )
+    film_work_ids = [
+        str(film_work_id)
+        for film_work_id in db.session.execute(
+            select(Event_db_model.film_work_id)
+            .where(
+                Event_db_model.film_validation == FILM_PENDING,
+                or_(
+                    Event_db_model.film_checked_at.is_(None),
+                    Event_db_model.film_checked_at <= retry_after,
+                ),
+            )
+            .group_by(Event_db_model.film_work_id)
+            .order_by(func.min(Event_db_model.film_checked_at).nullsfirst())
+            .limit(batch_size)
+        ).scalars()
+    ]
+    if not film_work_ids:
+        return 0
+    films = warm_up_film_cache(
+        film_work_ids, settings.film_validation_authorization or None
+    )
+    valid_ids = [
+        film_work_id for film_work_id, exists in films.items() if exists
+    ]
+    invalid_ids = [
+        film_work_id
+        for film_work_id, exists in films.items()
+        if exists is False
+    ]
+    for state, checked_ids in (
+        (FILM_VALID, valid_ids), (FILM_INVALID, invalid_ids)
+    ):
+        if not checked_ids:
+            continue
+        db.session.execute(
+            update(Event_db_model)
+            .where(
+                Event_db_model.film_work_id.in_(checked_ids),
+                Event_db_model.film_validation == FILM_PENDING,
+            )
+            .values(film_validation=state)
+            .execution_options(synchronize_session=False)
+        )
+    # Only events of films without an answer are still pending.
+    db.session.execute(
+        update(Event_db_model)
+        .where(
+            Event_db_model.film_work_id.in_(film_work_ids),
+            Event_db_model.film_validation == FILM_PENDING,
+        )
+        .values(film_checked_at=checked_at)
+        .execution_options(synchronize_session=False)
+    )
+    if invalid_ids:
+        logging.info(INVALID_FILMS_MESSAGE.format(ids=invalid_ids))
+    db.session.commit()
+    return len(film_work_ids)
@@ -0,0 +1,288 @@
+import json
+import logging
+import threading
+import time
+from http import HTTPStatus
+
+from redis.exceptions import RedisError
+
+from booking_app.api.v1.defines import ERROR_MESSAGE
+from booking_app.cache import LocalCache
+from booking_app.concurrency import get_executor
+from booking_app.db import redis_db
+from booking_app.http_client import UPSTREAM_ERRORS, http_client
+from booking_app.settings import settings
+
+FILM_KEY = "film:exists:{film_work_id}"
+FILM_METADATA_KEY = "film:metadata:{film_work_id}"
+
+_local_cache = LocalCache(
+    settings.film_cache_local_size, settings.film_cache_local_ttl_seconds
+)
+_metadata_cache = LocalCache(
+    settings.film_cache_local_size, settings.film_cache_local_ttl_seconds
+)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def film_cache_enabled():
+    return settings.film_cache_enabled
+
+
+def _entry_ttl(exists):
+    if exists:
+        return (
+            settings.film_cache_expire_in_seconds
+            + settings.film_cache_stale_seconds
+        )
+    return settings.film_cache_not_found_ttl_seconds
+
+
+def _fetch_film_exists(film_work_id, authorization):
+    """Ask the films service, returns None if it gave no clear answer."""
+    response = http_client.get(
+        "films",
+        settings.get_film_host.format(id=film_work_id),
+        headers={
+            "Authorization": authorization,
+        },
+    )
+    if response.status_code == HTTPStatus.OK:
+        return True
+    if response.status_code == HTTPStatus.NOT_FOUND:
+        return False
+    return None
+
+
+def _get_entry(film_work_id):
+    entry = _local_cache.get(str(film_work_id), None)
+    if entry is not None:
+        return entry
+    try:
+        entry = redis_db.get(FILM_KEY.format(film_work_id=film_work_id))
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="films", error=error))
+        return None
+    if entry is None:
+        return None
+    entry = json.loads(entry)
+    _local_cache.set(
+        str(film_work_id),
+        entry,
+        min(_local_cache.ttl_seconds, _entry_ttl(entry["exists"])),
+    )
+    return entry
+
+
+def _save_entry(film_work_id, exists):
+    entry = {"exists": exists, "checked_at": time.time()}
+    _local_cache.set(
+        str(film_work_id),
+        entry,
+        min(_local_cache.ttl_seconds, _entry_ttl(exists)),
+    )
+    try:
+        redis_db.set(
+            FILM_KEY.format(film_work_id=film_work_id),
+            json.dumps(entry),
+            ex=_entry_ttl(exists),
+        )
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="films", error=error))
+    return entry
+
+
+def _is_fresh(entry):
+    if not entry["exists"]:
+        return True
+    return (
+        time.time() - entry["checked_at"]
+        < settings.film_cache_expire_in_seconds
+    )
+
+
+def _refresh(film_work_id, authorization):
+    try:
+        exists = _fetch_film_exists(film_work_id, authorization)
+        if exists is not None:
+            _save_entry(film_work_id, exists)
+    except UPSTREAM_ERRORS as error:
+        logging.error(ERROR_MESSAGE.format(api="films", error=error))
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(str(film_work_id))
+
+
+def _refresh_in_background(film_work_id, authorization):
+    with _refreshing_lock:
+        if str(film_work_id) in _refreshing:
+            return
+        _refreshing.add(str(film_work_id))
+    get_executor().submit(_refresh, film_work_id, authorization)
+
+
+def film_exists(film_work_id, authorization):
+    """Check the film in the cache before asking the films service.
+
+    Found films are kept for FILM_CACHE_EXPIRE_IN_SECONDS and then served
+    stale for FILM_CACHE_STALE_SECONDS while a background request
+    revalidates them. Not found films are kept for a short time only.
+    Errors of the films service are raised and never cached.
+    """
+    if not film_cache_enabled():
+        return bool(_fetch_film_exists(film_work_id, authorization))
+    entry = _get_entry(film_work_id)
+    if entry is not None:
+        if not _is_fresh(entry):
+            _refresh_in_background(film_work_id, authorization)
+        return entry["exists"]
+    exists = _fetch_film_exists(film_work_id, authorization)
+    if exists is None:
+        return False
+    return _save_entry(film_work_id, exists)["exists"]
+
+
+def warm_up_film_cache(film_work_ids, authorization):
+    """Check films that are not cached or stale, all at once.
+
+    Returns {film_work_id: exists}, exists is None if the films service
+    could not answer for the film.
+    """
+    result = dict()
+    missing = []
+    for film_work_id in dict.fromkeys(str(id_) for id_ in film_work_ids):
+        entry = _get_entry(film_work_id) if film_cache_enabled() else None
+        if entry is not None and _is_fresh(entry):
+            result[film_work_id] = entry["exists"]
+        else:
+            missing.append(film_work_id)
+
+    def check(film_work_id):
+        try:
+            exists = _fetch_film_exists(film_work_id, authorization)
+        except UPSTREAM_ERRORS as error:
+            logging.error(ERROR_MESSAGE.format(api="films", error=error))
+            return None
+        if exists is not None and film_cache_enabled():
+            _save_entry(film_work_id, exists)
+        return exists
+
+    for film_work_id, exists in zip(
+        missing, get_executor().map(check, missing)
+    ):
+        result[film_work_id] = exists
+    return result
+
+
+def _fetch_film_metadata(film_work_id, authorization):
+    """Return the film of the films service, None if there is none.
+
+    With the film cache enabled the answer is also saved as a film
+    existence check.
+    """
+    try:
+        response = http_client.get(
+            "films",
+            settings.get_film_host.format(id=film_work_id),
+            headers={
+                "Authorization": authorization,
+            },
+        )
+    except UPSTREAM_ERRORS as error:
+        logging.error(ERROR_MESSAGE.format(api="films", error=error))
+        return None
+    if response.status_code == HTTPStatus.NOT_FOUND:
+        if film_cache_enabled():
+            _save_entry(film_work_id, False)
+        return None
+    if response.status_code != HTTPStatus.OK:
+        return None
+    if film_cache_enabled():
+        _save_entry(film_work_id, True)
+    return response.json()
+
+
+def _get_cached_metadata(film_work_ids):
+    films = dict()
+    for film_work_id in film_work_ids:
+        film = _metadata_cache.get(film_work_id, None)
+        if film is not None:
+            films[film_work_id] = film
+    missing = [
+        film_work_id for film_work_id in film_work_ids
+        if film_work_id not in films
+    ]
+    if not missing:
+        return films
+    try:
+        values = redis_db.mget([
+            FILM_METADATA_KEY.format(film_work_id=film_work_id)
+            for film_work_id in missing
+        ])
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="films", error=error))
+        return films
+    for film_work_id, value in zip(missing, values):
+        if value is not None:
+            films[film_work_id] = json.loads(value)
+            _metadata_cache.set(film_work_id, films[film_work_id])
+    return films
+
+
+def _save_metadata(films):
+    if not films:
+        return
+    pipeline = redis_db.pipeline(transaction=False)
+    for film_work_id, film in films.items():
+        _metadata_cache.set(film_work_id, film)
+        pipeline.set(
+            FILM_METADATA_KEY.format(film_work_id=film_work_id),
+            json.dumps(film),
+            ex=settings.film_metadata_ttl_seconds,
+        )
+    try:
+        pipeline.execute()
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="films", error=error))
+
+
+def _known_missing(film_work_id):
+    if not film_cache_enabled():
+        return False
+    entry = _get_entry(film_work_id)
+    return entry is not None and not entry["exists"]
+
+
+def get_films_metadata(film_work_ids, authorization):
+    """Return {film_work_id: film or None} for many films.
+
+    Cached films and films known to be missing cost no request, the
+    rest are requested concurrently. Films the films service could not
+    give are None.
+    """
+    film_work_ids = list(dict.fromkeys(str(id_) for id_ in film_work_ids))
+    films = _get_cached_metadata(film_work_ids)
+    missing = [
+        film_work_id for film_work_id in film_work_ids
+        if film_work_id not in films and not _known_missing(film_work_id)
+    ]
+    fetched = {
+        film_work_id: film
+        for film_work_id, film in zip(
+            missing,
+            get_executor().map(
+                lambda film_work_id: _fetch_film_metadata(
+                    film_work_id, authorization
+                ),
+                missing,
+            ),
+        )
+        if film is not None
+    }
+    _save_metadata(fetched)
+    films.update(fetched)
+    return {
+        film_work_id: films.get(film_work_id, None)
+        for film_work_id in film_work_ids
+    }
@@ -0,0 +1,255 @@
+import logging
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+
+from redis.exceptions import RedisError
+from sqlalchemy import delete, func, update
+from sqlalchemy.exc import IntegrityError
+
+from booking_app.api.v1.defines import (ERROR_MESSAGE, EXIST_LOG_MESSAGE,
+                                        NOT_FOUND_MESSAGE)
+from booking_app.api.v1.services.tickets import (
+    claim_inventory_ticket_or_raise_exception, insert_bookings,
+    inventory_enabled, return_event_ticket, return_inventory_ticket,
+    take_event_ticket_or_raise_exception)
+from booking_app.api.v1.services.validators.common import \
+    raise_exception_if_unique_violation
+from booking_app.db import db, redis_db
+from booking_app.db_models import Event as Event_db_model
+from booking_app.db_models import TicketHold as TicketHold_db_model
+from booking_app.settings import settings
+
+HOLD_KEY = "booking:hold:{hold_id}"
+USER_HOLD_KEY = "booking:user_hold:{event_id}:{user_id}"
+# Sorted set of "{event_id}:{hold_id}" scored by expiry time. Removing a
+# member decides who owns the held ticket: the confirmation or the sweeper.
+HOLDS_KEY = "booking:holds"
+
+HOLD_NOT_EXIST_MESSAGE = "hold not exist or expired"
+
+
+def _hold_member(event_id, hold_id):
+    return "{event_id}:{hold_id}".format(event_id=event_id, hold_id=hold_id)
+
+
+def _create_redis_hold(hold):
+    ttl = settings.ticket_hold_ttl_seconds
+    if not redis_db.set(
+        USER_HOLD_KEY.format(
+            event_id=hold["event_id"], user_id=hold["user_id"]
+        ),
+        hold["id"],
+        ex=ttl,
+        nx=True,
+    ):
+        logging.info(EXIST_LOG_MESSAGE.format(model="hold"))
+        raise ValueError("already exist")
+    key = HOLD_KEY.format(hold_id=hold["id"])
+    pipeline = redis_db.pipeline()
+    pipeline.hset(
+        key,
+        mapping={**hold, "expires_at": hold["expires_at"].isoformat()},
+    )
+    pipeline.expire(key, ttl)
+    pipeline.zadd(
+        HOLDS_KEY,
+        {_hold_member(hold["event_id"], hold["id"]): time.time() + ttl},
+    )
+    pipeline.execute()
+    return hold
+
+
+def _release_expired_db_hold(event_id, user_id):
+    """Give back an expired hold of the user the sweeper did not delete
+    yet, the unique constraint would reject the new hold.
+    """
+    released = db.session.execute(
+        delete(TicketHold_db_model)
+        .where(
+            TicketHold_db_model.event_id == event_id,
+            TicketHold_db_model.user_id == user_id,
+            TicketHold_db_model.expires_at <= datetime.utcnow(),
+        )
+        .returning(TicketHold_db_model.id)
+    ).first()
+    if released is not None:
+        return_event_ticket(event_id)
+
+
+def _create_db_hold(hold):
+    """The ticket_hold_event_id_user_id_key constraint rejects a second
+    hold of the user, also a concurrent one.
+    """
+    try:
+        _release_expired_db_hold(hold["event_id"], hold["user_id"])
+        take_event_ticket_or_raise_exception(hold["event_id"])
+        db.session.add(TicketHold_db_model(**hold))
+        db.session.commit()
+    except IntegrityError as error:
+        db.session.rollback()
+        raise_exception_if_unique_violation(error, "hold")
+        raise
+    except Exception:
+        db.session.rollback()
+        raise
+    return hold
+
+
+def create_hold_or_raise_exception(event_id, user_id):
+    """Hold one ticket of the event for the user for a few minutes.
+
+    With the redis inventory the hold lives in redis only, otherwise (or
+    when redis is unavailable) it is a ticket_hold row counted in
+    event.booked_count.
+    """
+    hold = {
+        "id": str(uuid.uuid4()),
+        "event_id": str(event_id),
+        "user_id": str(user_id),
+        "expires_at": datetime.utcnow()
+        + timedelta(seconds=settings.ticket_hold_ttl_seconds),
+    }
+    if inventory_enabled() and claim_inventory_ticket_or_raise_exception(
+        event_id
+    ):
+        try:
+            return _create_redis_hold(hold)
+        except ValueError:
+            return_inventory_ticket(event_id)
+            raise
+        except RedisError as error:
+            logging.error(ERROR_MESSAGE.format(api="holds", error=error))
+            return_inventory_ticket(event_id)
+    return _create_db_hold(hold)
+
+
+def _pop_redis_hold(hold_id, user_id):
+    """Take the hold out of redis, returns its event id.
+
+    Returns None if redis does not know the hold.
+    """
+    hold = {
+        key.decode(): value.decode()
+        for key, value in redis_db.hgetall(
+            HOLD_KEY.format(hold_id=hold_id)
+        ).items()
+    }
+    if not hold:
+        return None
+    if hold["user_id"] != str(user_id):
+        raise ValueError(HOLD_NOT_EXIST_MESSAGE)
+    if not redis_db.zrem(HOLDS_KEY, _hold_member(hold["event_id"], hold_id)):
+        raise ValueError(HOLD_NOT_EXIST_MESSAGE)
+    redis_db.delete(
+        HOLD_KEY.format(hold_id=hold_id),
+        USER_HOLD_KEY.format(event_id=hold["event_id"], user_id=user_id),
+    )
+    return hold["event_id"]
+
+
+def _pop_db_hold(hold_id, user_id):
+    return db.session.execute(
+        delete(TicketHold_db_model)
+        .where(
+            TicketHold_db_model.id == hold_id,
+            TicketHold_db_model.user_id == user_id,
+            TicketHold_db_model.expires_at > datetime.utcnow(),
+        )
+        .returning(TicketHold_db_model.event_id)
+    ).scalar_one_or_none()
+
+
+def confirm_hold_or_raise_exception(hold_id, user_id):
+    """Turn the hold into a booking, returns the booking row.
+
+    The ticket is already taken by the hold, so availability is not
+    checked again.
+    """
+    in_redis = False
+    event_id = None
+    try:
+        event_id = _pop_redis_hold(hold_id, user_id)
+        in_redis = event_id is not None
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="holds", error=error))
+    try:
+        if not in_redis:
+            event_id = _pop_db_hold(hold_id, user_id)
+            if event_id is None:
+                logging.info(
+                    NOT_FOUND_MESSAGE.format(model="hold", id=hold_id)
+                )
+                raise ValueError(HOLD_NOT_EXIST_MESSAGE)
+        rows = insert_bookings([{"event_id": event_id, "user_id": user_id}])
+        if not rows:
+            logging.info(EXIST_LOG_MESSAGE.format(model="booking"))
+            if not in_redis:
+                return_event_ticket(event_id)
+                db.session.commit()
+            raise ValueError("already exist")
+        if in_redis:
+            take_event_ticket_or_raise_exception(event_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        if in_redis:
+            return_inventory_ticket(event_id)
+        raise
+    return rows[0]
+
+
+def count_redis_holds():
+    """Return the number of redis holds per event id.
+
+    Expired holds count until the sweeper gives their tickets back.
+    """
+    members = redis_db.zrange(HOLDS_KEY, 0, -1)
+    return Counter(member.decode().split(":", 1)[0] for member in members)
+
+
+def _sweep_redis_holds(batch_size):
+    members = redis_db.zrangebyscore(
+        HOLDS_KEY, "-inf", time.time(), start=0, num=batch_size
+    )
+    swept = 0
+    for member in members:
+        if redis_db.zrem(HOLDS_KEY, member):
+            event_id, _ = member.decode().split(":", 1)
+            return_inventory_ticket(event_id)
+            swept += 1
+    return swept
+
+
+def _sweep_db_holds():
+    event_ids = db.session.execute(
+        delete(TicketHold_db_model)
+        .where(TicketHold_db_model.expires_at <= datetime.utcnow())
+        .returning(TicketHold_db_model.event_id)
+    ).scalars()
+    expired = Counter(event_ids)
+    for event_id, count in expired.items():
+        db.session.execute(
+            update(Event_db_model)
+            .where(Event_db_model.id == event_id)
+            .values(
+                booked_count=func.greatest(
+                    Event_db_model.booked_count - count, 0
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    return sum(expired.values())
+
+
+def sweep_expired_holds(batch_size):
+    """Give tickets of expired holds back, returns the number of holds."""
+    swept = 0
+    if inventory_enabled():
+        try:
+            swept += _sweep_redis_holds(batch_size)
+        except RedisError as error:
+            logging.error(ERROR_MESSAGE.format(api="holds", error=error))
+    return swept + _sweep_db_holds()
@@ -1,8 +1,7 @@
-import asyncio
 from typing import List
 
-from booking_app.api.v1.services.utils import (get_paginate_obj_list,
-                                               get_users_logins)
+from booking_app.api.v1.services.logins import get_logins
+from booking_app.api.v1.services.utils import get_paginate_obj_list
 from booking_app.db import db as _db
 from booking_app.db_models import Booking as Booking_db_model
 from booking_app.db_models import City as City_db_model
@@ -60,7 +59,7 @@ class HostsGetter:
         host_ids = self._host_ids()
         self.objs_ids = get_paginate_obj_list(host_ids, page_numb=self.page)
         self._sorting()
-        result, info = asyncio.run(get_users_logins(self.objs_ids))
+        result, info = get_logins(self.objs_ids)
         if result is False:
             return False, info
         return result, info
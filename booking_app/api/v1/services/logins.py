@@ -0,0 +1,109 @@
+import json
+import logging
+import time
+
+from redis.exceptions import RedisError
+
+from booking_app.api.v1.defines import ERROR_MESSAGE
+from booking_app.api.v1.services.utils import get_users_logins
+from booking_app.async_runner import async_runner
+from booking_app.cache import LocalCache
+from booking_app.db import redis_db
+from booking_app.settings import settings
+
+# Hash of user_id -> {"login", "cached_at"}. Fields older than
+# LOGIN_CACHE_TTL_SECONDS or unparsable are misses and are dropped when
+# read.
+LOGINS_KEY = "users:logins"
+
+_local_cache = LocalCache(
+    settings.login_cache_local_size, settings.login_cache_local_ttl_seconds
+)
+
+
+def login_cache_enabled():
+    return settings.login_cache_enabled
+
+
+def _get_cached(user_ids):
+    """Return {user_id: login} for the users found in the caches."""
+    logins = dict()
+    for user_id in user_ids:
+        login = _local_cache.get(user_id, None)
+        if login is not None:
+            logins[user_id] = login
+    missing = [user_id for user_id in user_ids if user_id not in logins]
+    if not missing:
+        return logins
+    try:
+        values = redis_db.hmget(LOGINS_KEY, missing)
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="logins", error=error))
+        return logins
+    dropped = []
+    oldest = time.time() - settings.login_cache_ttl_seconds
+    for user_id, value in zip(missing, values):
+        if value is None:
+            continue
+        try:
+            value = json.loads(value)
+            login, cached_at = value["login"], float(value["cached_at"])
+        except (ValueError, TypeError, KeyError):
+            # An unparsable field is a miss, it is fetched again.
+            dropped.append(user_id)
+            continue
+        if cached_at < oldest:
+            dropped.append(user_id)
+            continue
+        logins[user_id] = login
+        _local_cache.set(user_id, login)
+    if dropped:
+        try:
+            redis_db.hdel(LOGINS_KEY, *dropped)
+        except RedisError as error:
+            logging.error(ERROR_MESSAGE.format(api="logins", error=error))
+    return logins
+
+
+def _save(logins):
+    if not logins:
+        return
+    for user_id, login in logins.items():
+        _local_cache.set(user_id, login)
+    cached_at = time.time()
+    try:
+        pipeline = redis_db.pipeline()
+        pipeline.hset(
+            LOGINS_KEY,
+            mapping={
+                user_id: json.dumps({"login": login, "cached_at": cached_at})
+                for user_id, login in logins.items()
+            },
+        )
+        pipeline.expire(LOGINS_KEY, settings.login_cache_ttl_seconds)
+        pipeline.execute()
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="logins", error=error))
+
+
+def get_logins(user_ids):
+    """Return logins like get_users_logins, asking the users service only
+    for the users that are not cached.
+    """
+    if not login_cache_enabled():
+        return async_runner.run(get_users_logins(user_ids))
+    logins = _get_cached(user_ids)
+    missing = [user_id for user_id in user_ids if user_id not in logins]
+    if missing:
+        result, info = async_runner.run(get_users_logins(missing))
+        if result is False and not logins:
+            return result, info
+        if result is True:
+            fetched = {user["id"]: user["login"] for user in info}
+            _save(fetched)
+            logins.update(fetched)
+    return True, [
+        {"id": user_id, "login": logins[user_id]}
+        for user_id in user_ids
+        if user_id in logins
+    ]
@@ -0,0 +1,217 @@
+import logging
+import uuid
+from collections import Counter
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from booking_app.api.v1.defines import ERROR_MESSAGE, EXIST_LOG_MESSAGE
+from booking_app.api.v1.services.tickets import (
+    insert_bookings, return_inventory_ticket,
+    take_event_ticket_or_raise_exception)
+from booking_app.db import db, redis_db
+from booking_app.db_models import Booking as Booking_db_model
+from booking_app.settings import settings
+
+RESERVATION_KEY = "booking:reservation:{reservation_id}"
+# Guards against a second reservation of a user for an event while the
+# first is queued. It is dropped once the worker processed the
+# reservation, the booking unique constraint guards written bookings.
+USER_RESERVATION_KEY = "booking:user_reservation:{event_id}:{user_id}"
+RESERVATIONS_QUEUE = "booking:reservations"
+# Reservations taken by a worker stay in its list until their status is
+# written, a restarted worker puts them back into the queue.
+PROCESSING_QUEUE = "booking:reservations:processing:{worker_id}"
+
+PENDING = "pending"
+CONFIRMED = "confirmed"
+REJECTED = "rejected"
+
+
+def create_reservation_or_raise_exception(event_id, user_id):
+    """Register a pending reservation and queue it for the booking worker."""
+    reservation_id = str(uuid.uuid4())
+    if not redis_db.set(
+        USER_RESERVATION_KEY.format(event_id=event_id, user_id=user_id),
+        reservation_id,
+        ex=settings.reservation_ttl_seconds,
+        nx=True,
+    ):
+        logging.info(EXIST_LOG_MESSAGE.format(model="reservation"))
+        raise ValueError("already exist")
+    reservation = {
+        "id": reservation_id,
+        "status": PENDING,
+        "event_id": str(event_id),
+        "user_id": str(user_id),
+    }
+    key = RESERVATION_KEY.format(reservation_id=reservation_id)
+    pipeline = redis_db.pipeline()
+    pipeline.hset(key, mapping=reservation)
+    pipeline.expire(key, settings.reservation_ttl_seconds)
+    pipeline.rpush(RESERVATIONS_QUEUE, reservation_id)
+    pipeline.execute()
+    return reservation
+
+
+def get_reservation(reservation_id):
+    reservation = redis_db.hgetall(
+        RESERVATION_KEY.format(reservation_id=reservation_id)
+    )
+    return {
+        key.decode(): value.decode() for key, value in reservation.items()
+    }
+
+
+def count_queued_reservations():
+    """Return the number of pending reservations per event id, their
+    tickets are claimed in redis but not written to postgres yet.
+    """
+    reservation_ids = redis_db.lrange(RESERVATIONS_QUEUE, 0, -1)
+    for processing in redis_db.scan_iter(
+        match=PROCESSING_QUEUE.format(worker_id="*")
+    ):
+        reservation_ids += redis_db.lrange(processing, 0, -1)
+    pipeline = redis_db.pipeline(transaction=False)
+    for reservation_id in reservation_ids:
+        pipeline.hmget(
+            RESERVATION_KEY.format(reservation_id=reservation_id.decode()),
+            "event_id",
+            "status",
+        )
+    return Counter(
+        event_id.decode()
+        for event_id, status in pipeline.execute()
+        if event_id is not None and status == PENDING.encode()
+    )
+
+
+def _processing_queue():
+    return PROCESSING_QUEUE.format(worker_id=settings.booking_worker_id)
+
+
+def recover_reservations():
+    """Put the reservations this worker took before it stopped back at the
+    head of the queue. Returns their number.
+    """
+    processing = _processing_queue()
+    count = 0
+    while redis_db.lmove(
+        processing, RESERVATIONS_QUEUE, "RIGHT", "LEFT"
+    ) is not None:
+        count += 1
+    return count
+
+
+def _release_reservations(reservation_ids):
+    if not reservation_ids:
+        return
+    processing = _processing_queue()
+    pipeline = redis_db.pipeline()
+    for reservation_id in reservation_ids:
+        pipeline.lrem(processing, 1, reservation_id)
+    pipeline.execute()
+
+
+def _take_reservations(batch_size, timeout):
+    """Move a batch of queued reservations to the processing list.
+
+    Reservations that are expired or already have a status (processed
+    before a restart) are released at once.
+    """
+    processing = _processing_queue()
+    first = redis_db.blmove(
+        RESERVATIONS_QUEUE, processing, timeout, "LEFT", "RIGHT"
+    )
+    if first is None:
+        return []
+    reservation_ids = [first.decode()]
+    pipeline = redis_db.pipeline()
+    for _ in range(batch_size - 1):
+        pipeline.lmove(RESERVATIONS_QUEUE, processing, "LEFT", "RIGHT")
+    reservation_ids += [
+        reservation_id.decode()
+        for reservation_id in pipeline.execute()
+        if reservation_id is not None
+    ]
+    reservations = [
+        get_reservation(reservation_id) for reservation_id in reservation_ids
+    ]
+    _release_reservations([
+        reservation_id
+        for reservation_id, reservation in zip(reservation_ids, reservations)
+        if reservation.get("status", None) != PENDING
+    ])
+    return [
+        reservation for reservation in reservations
+        if reservation.get("status", None) == PENDING
+    ]
+
+
+def _booking_written(reservation):
+    """Bookings get the id of their reservation, so a booking written
+    before a restart is found by it.
+    """
+    return db.session.get(Booking_db_model, reservation["id"]) is not None
+
+
+def _write_bookings(reservations):
+    for reservation in reservations:
+        try:
+            with db.session.begin_nested():
+                rows = insert_bookings([reservation])
+                if not rows and _booking_written(reservation):
+                    reservation.update(
+                        status=CONFIRMED, booking_id=reservation["id"]
+                    )
+                    continue
+                if not rows:
+                    logging.info(EXIST_LOG_MESSAGE.format(model="booking"))
+                    raise ValueError("already exist")
+                take_event_ticket_or_raise_exception(reservation["event_id"])
+        except ValueError as error:
+            reservation.update(status=REJECTED, info=str(error))
+            continue
+        except SQLAlchemyError as error:
+            logging.error(
+                ERROR_MESSAGE.format(api="BookingWorker", error=error)
+            )
+            reservation.update(status=REJECTED, info="false")
+            continue
+        reservation.update(status=CONFIRMED, booking_id=str(rows[0].id))
+    db.session.commit()
+
+
+def persist_reservations(batch_size, timeout):
+    """Write a batch of pending reservations in one transaction.
+
+    Reservations leave the processing list only after their status is
+    written. Returns the number of processed reservations.
+    """
+    reservations = _take_reservations(batch_size, timeout)
+    if not reservations:
+        return 0
+    try:
+        _write_bookings(reservations)
+    except SQLAlchemyError as error:
+        db.session.rollback()
+        logging.error(ERROR_MESSAGE.format(api="BookingWorker", error=error))
+        for reservation in reservations:
+            reservation.pop("booking_id", None)
+            reservation.update(status=REJECTED, info="false")
+    pipeline = redis_db.pipeline()
+    for reservation in reservations:
+        key = RESERVATION_KEY.format(reservation_id=reservation["id"])
+        pipeline.hset(key, mapping=reservation)
+        pipeline.expire(key, settings.reservation_ttl_seconds)
+        pipeline.delete(
+            USER_RESERVATION_KEY.format(
+                event_id=reservation["event_id"],
+                user_id=reservation["user_id"],
+            )
+        )
+    pipeline.execute()
+    for reservation in reservations:
+        if reservation["status"] == REJECTED:
+            return_inventory_ticket(reservation["event_id"])
+    _release_reservations([reservation["id"] for reservation in reservations])
+    return len(reservations)
@@ -0,0 +1,247 @@
+import logging
+import uuid
+from datetime import datetime
+
+from redis.exceptions import RedisError
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from booking_app.api.v1.defines import (ERROR_MESSAGE, NO_TICKETS_MESSAGE,
+                                        NOT_FOUND_MESSAGE)
+from booking_app.db import db, redis_db
+from booking_app.db_models import Booking as Booking_db_model
+from booking_app.db_models import Event as Event_db_model
+from booking_app.db_models import TicketHold as TicketHold_db_model
+from booking_app.settings import settings
+
+INVENTORY_KEY = "event:{event_id}:remaining_tickets"
+
+# Returns -1 if the inventory of the event is not loaded yet,
+# 0 if the event is sold out and 1 if a ticket was claimed.
+CLAIM_TICKET_SCRIPT = """
+local remaining = redis.call('GET', KEYS[1])
+if not remaining then
+    return -1
+end
+if tonumber(remaining) <= 0 then
+    return 0
+end
+redis.call('DECR', KEYS[1])
+return 1
+"""
+
+RETURN_TICKET_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCR', KEYS[1])
+end
+return false
+"""
+
+claim_ticket_script = redis_db.script(CLAIM_TICKET_SCRIPT)
+return_ticket_script = redis_db.script(RETURN_TICKET_SCRIPT)
+
+
+def insert_bookings(bookings):
+    """Insert bookings, skipping users that already booked the event.
+
+    Takes dicts with event_id, user_id and an optional id, returns the
+    inserted rows.
+    """
+    return db.session.execute(
+        insert(Booking_db_model)
+        .values([
+            {
+                "id": booking.get("id", None) or uuid.uuid4(),
+                "event_id": booking["event_id"],
+                "user_id": booking["user_id"],
+            }
+            for booking in bookings
+        ])
+        .on_conflict_do_nothing(
+            index_elements=[
+                Booking_db_model.user_id, Booking_db_model.event_id
+            ]
+        )
+        .returning(
+            Booking_db_model.id,
+            Booking_db_model.event_id,
+            Booking_db_model.user_id,
+            Booking_db_model.created_at,
+        )
+    ).all()
+
+
+def take_event_ticket_or_raise_exception(event_id):
+    """Book one ticket of the event inside the current transaction.
+
+    The conditional UPDATE locks the event row until commit, so concurrent
+    bookings of the same event can not oversell it.
+    """
+    result = db.session.execute(
+        update(Event_db_model)
+        .where(
+            Event_db_model.id == event_id,
+            Event_db_model.booked_count < Event_db_model.max_tickets_count,
+        )
+        .values(booked_count=Event_db_model.booked_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        logging.info(NOT_FOUND_MESSAGE.format(model="ticket", id=event_id))
+        raise ValueError(NO_TICKETS_MESSAGE)
+
+
+def take_events_tickets(event_ids):
+    """Book one ticket of every event in one statement.
+
+    Returns ids of the events that still had available tickets.
+    """
+    rows = db.session.execute(
+        update(Event_db_model)
+        .where(
+            Event_db_model.id.in_(event_ids),
+            Event_db_model.booked_count < Event_db_model.max_tickets_count,
+        )
+        .values(booked_count=Event_db_model.booked_count + 1)
+        .returning(Event_db_model.id)
+        .execution_options(synchronize_session=False)
+    )
+    return {str(row.id) for row in rows}
+
+
+def return_event_ticket(event_id):
+    db.session.execute(
+        update(Event_db_model)
+        .where(Event_db_model.id == event_id, Event_db_model.booked_count > 0)
+        .values(booked_count=Event_db_model.booked_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reconcile_booked_counts():
+    """Rebuild event.booked_count from bookings and ticket holds.
+
+    Expired holds count until the sweeper deletes them, the sweeper takes
+    them off booked_count.
+    """
+    bookings_count = (
+        select(func.count(Booking_db_model.id))
+        .where(Booking_db_model.event_id == Event_db_model.id)
+        .scalar_subquery()
+    ) + (
+        select(func.count(TicketHold_db_model.id))
+        .where(TicketHold_db_model.event_id == Event_db_model.id)
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        update(Event_db_model)
+        .where(Event_db_model.booked_count != bookings_count)
+        .values(booked_count=bookings_count)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def inventory_enabled():
+    return (
+        settings.redis_inventory_enabled
+        or settings.booking_write_behind_enabled
+    )
+
+
+def _load_inventory(event_id):
+    """Load the free tickets of the event into redis.
+
+    Tickets claimed in redis that postgres does not count yet (holds and
+    queued write-behind reservations) are not free.
+    """
+    # Imported here, both modules build on this one.
+    from booking_app.api.v1.services.holds import count_redis_holds
+    from booking_app.api.v1.services.reservation import \
+        count_queued_reservations
+
+    row = db.session.execute(
+        select(
+            Event_db_model.max_tickets_count, Event_db_model.booked_count
+        ).where(Event_db_model.id == event_id)
+    ).one_or_none()
+    if row is None:
+        logging.info(NOT_FOUND_MESSAGE.format(model="event", id=event_id))
+        raise ValueError("event not exist")
+    claimed = (
+        count_redis_holds()[str(event_id)]
+        + count_queued_reservations()[str(event_id)]
+    )
+    redis_db.set(
+        INVENTORY_KEY.format(event_id=event_id),
+        max(row.max_tickets_count - row.booked_count - claimed, 0),
+        ex=settings.inventory_ttl_seconds,
+        nx=True,
+    )
+
+
+def claim_inventory_ticket_or_raise_exception(event_id):
+    """Claim one ticket of the event in redis before touching postgres.
+
+    Returns False if redis is unavailable and the booking has to rely on
+    the database counter only.
+    """
+    key = INVENTORY_KEY.format(event_id=event_id)
+    try:
+        result = claim_ticket_script(keys=[key])
+        if result == -1:
+            _load_inventory(event_id)
+            result = claim_ticket_script(keys=[key])
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="inventory", error=error))
+        return False
+    if result != 1:
+        logging.info(NOT_FOUND_MESSAGE.format(model="ticket", id=event_id))
+        raise ValueError(NO_TICKETS_MESSAGE)
+    return True
+
+
+def return_inventory_ticket(event_id):
+    try:
+        return_ticket_script(keys=[INVENTORY_KEY.format(event_id=event_id)])
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="inventory", error=error))
+
+
+def drop_event_inventory(event_id):
+    try:
+        redis_db.delete(INVENTORY_KEY.format(event_id=event_id))
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="inventory", error=error))
+
+
+def reconcile_inventory(held=None):
+    """Overwrite loaded redis inventories of upcoming events from postgres.
+
+    Events whose inventory is not loaded are skipped, they will be loaded
+    from the database on the next booking. held maps event ids to tickets
+    claimed in redis only (holds and queued reservations).
+    """
+    held = held or {}
+    events = db.session.execute(
+        select(
+            Event_db_model.id,
+            Event_db_model.max_tickets_count,
+            Event_db_model.booked_count,
+        ).where(Event_db_model.event_end > datetime.utcnow())
+    )
+    pipeline = redis_db.pipeline(transaction=False)
+    for event in events:
+        pipeline.set(
+            INVENTORY_KEY.format(event_id=event.id),
+            max(
+                event.max_tickets_count
+                - event.booked_count
+                - held.get(str(event.id), 0),
+                0,
+            ),
+            ex=settings.inventory_ttl_seconds,
+            xx=True,
+        )
+    return sum(1 for result in pipeline.execute() if result)
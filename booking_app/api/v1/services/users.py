@@ -0,0 +1,145 @@
+import logging
+from http import HTTPStatus
+
+from redis.exceptions import RedisError
+
+from booking_app.api.v1.defines import ERROR_MESSAGE
+from booking_app.api.v1.services.users_info import users_info_client
+from booking_app.async_runner import async_runner
+from booking_app.cache import LocalCache
+from booking_app.db import redis_db
+from booking_app.http_client import http_client
+from booking_app.settings import settings
+
+USER_KEY = "user:exists:{user_id}"
+
+_local_cache = LocalCache(
+    settings.user_cache_local_size, settings.user_cache_local_ttl_seconds
+)
+
+
+def user_cache_enabled():
+    return settings.user_cache_enabled
+
+
+def _entry_ttl(exists):
+    if exists:
+        return settings.user_cache_ttl_seconds
+    return settings.user_cache_not_found_ttl_seconds
+
+
+def _get_cached(user_ids):
+    """Return {user_id: exists} for the users found in the caches."""
+    result = dict()
+    for user_id in user_ids:
+        exists = _local_cache.get(user_id, None)
+        if exists is not None:
+            result[user_id] = exists
+    missing = [user_id for user_id in user_ids if user_id not in result]
+    if not missing:
+        return result
+    try:
+        values = redis_db.mget(
+            [USER_KEY.format(user_id=user_id) for user_id in missing]
+        )
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="users", error=error))
+        return result
+    for user_id, value in zip(missing, values):
+        if value is None:
+            continue
+        exists = value == b"1"
+        result[user_id] = exists
+        _local_cache.set(
+            user_id, exists, min(_local_cache.ttl_seconds, _entry_ttl(exists))
+        )
+    return result
+
+
+def _save(users):
+    if not users:
+        return
+    pipeline = redis_db.pipeline(transaction=False)
+    for user_id, exists in users.items():
+        _local_cache.set(
+            user_id, exists, min(_local_cache.ttl_seconds, _entry_ttl(exists))
+        )
+        pipeline.set(
+            USER_KEY.format(user_id=user_id),
+            "1" if exists else "0",
+            ex=_entry_ttl(exists),
+        )
+    try:
+        pipeline.execute()
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="users", error=error))
+
+
+def _fetch_user_exists(user_id, authorization):
+    """Ask the users service, returns None if it gave no clear answer."""
+    response = http_client.get(
+        "users",
+        settings.get_user_host.format(id=user_id),
+        headers={"Authorization": authorization},
+    )
+    if response.status_code == HTTPStatus.OK:
+        return True
+    if response.status_code == HTTPStatus.NOT_FOUND:
+        return False
+    return None
+
+
+def _fetch_users_exist(user_ids, authorization):
+    """Resolve the users by users_info_client, one users_data page per
+    chunk of USERS_INFO_CHUNK_SIZE ids.
+
+    Users missing in an answered chunk do not exist. Users of chunks the
+    users service could not answer are left out of the result, so their
+    absence is never cached.
+    """
+    users, unresolved = async_runner.run(
+        users_info_client.find_users(user_ids, authorization)
+    )
+    unresolved = set(unresolved)
+    return {
+        user_id: user_id in users
+        for user_id in user_ids
+        if user_id not in unresolved
+    }
+
+
+def user_exists(user_id, authorization):
+    """Check the user in the cache before asking the users service.
+
+    Returns None if the users service gave no clear answer, errors of the
+    users service are raised. Neither is cached.
+    """
+    user_id = str(user_id)
+    if not user_cache_enabled():
+        return _fetch_user_exists(user_id, authorization)
+    cached = _get_cached([user_id])
+    if user_id in cached:
+        return cached[user_id]
+    exists = _fetch_user_exists(user_id, authorization)
+    if exists is not None:
+        _save({user_id: exists})
+    return exists
+
+
+def users_exist(user_ids, authorization):
+    """Return {user_id: exists} for many users.
+
+    Cached users cost no request, the rest are resolved by chunked
+    users_data requests. exists is None for users the users service gave
+    no answer about.
+    """
+    user_ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+    cached = _get_cached(user_ids) if user_cache_enabled() else dict()
+    missing = [user_id for user_id in user_ids if user_id not in cached]
+    fetched = _fetch_users_exist(missing, authorization) if missing else {}
+    if user_cache_enabled():
+        _save(fetched)
+    return {
+        user_id: cached.get(user_id, fetched.get(user_id, None))
+        for user_id in user_ids
+    }
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import random
+import time
+from http import HTTPStatus
+
+import aiohttp
+
+from booking_app.api.v1.defines import UNRESOLVED_USERS_MESSAGE
+from booking_app.http_client import CircuitOpenError, http_client
+from booking_app.settings import settings
+
+UPSTREAM = "users_info"
+
+
+class UsersInfoError(Exception):
+    """The users service did not answer a chunk."""
+
+    def __init__(self, retryable=True):
+        super().__init__()
+        self.retryable = retryable
+
+
+class UsersInfoClient:
+    """Batch client of the users_data endpoint of the users service.
+
+    Ids are split into chunks of USERS_INFO_CHUNK_SIZE (not more than a
+    page of the endpoint, so page=1 holds the whole chunk), chunks are
+    fetched concurrently over one session. Failed chunks are retried with
+    exponential backoff and full jitter until USERS_INFO_TIMEOUT_BUDGET
+    runs out. Calls are counted and guarded by the users_info circuit
+    breaker of http_client.
+    """
+
+    def __init__(self):
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=settings.http_pool_maxsize
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=settings.http_connect_timeout,
+                    sock_read=settings.http_read_timeout,
+                ),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _fetch_chunk(self, user_ids, authorization=None):
+        http_client.allow(UPSTREAM)
+        started_at = time.monotonic()
+        error = True
+        headers = {"Authorization": authorization} if authorization else None
+        try:
+            async with self._get_session().post(
+                settings.get_users_info_host.format(page=1, field="login"),
+                json={"ids": user_ids},
+                headers=headers,
+            ) as response:
+                if response.status != HTTPStatus.OK:
+                    error = response.status >= HTTPStatus.INTERNAL_SERVER_ERROR
+                    raise UsersInfoError(retryable=error)
+                data = await response.json()
+                error = False
+                return data
+        finally:
+            # Also runs on cancellation by the budget, so a half open
+            # circuit always gets the result of its probe.
+            http_client.record(
+                UPSTREAM, time.monotonic() - started_at, error=error
+            )
+
+    def _backoff(self, attempt):
+        return random.uniform(
+            0,
+            min(
+                settings.users_info_backoff_max,
+                settings.users_info_backoff_base * 2 ** attempt,
+            ),
+        )
+
+    async def _fetch_chunk_with_retries(
+            self, user_ids, deadline, semaphore, authorization=None
+    ):
+        """Return {user_id: login} or None if the chunk is unresolved."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(settings.number_of_tries_to_get_response):
+            try:
+                async with semaphore:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        return None
+                    return await asyncio.wait_for(
+                        self._fetch_chunk(user_ids, authorization), remaining
+                    )
+            except CircuitOpenError:
+                return None
+            except UsersInfoError as error:
+                if not error.retryable:
+                    return None
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                pass
+            delay = self._backoff(attempt)
+            if loop.time() + delay >= deadline:
+                return None
+            await asyncio.sleep(delay)
+        return None
+
+    async def find_users(self, user_ids, authorization=None):
+        """Return ({user_id: login field} of the users found in answers,
+        ids the users service did not answer).
+
+        A chunk fits in one users_data page, so users missing in its
+        answer are unknown to the users service, they are left out of
+        both.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.users_info_timeout_budget
+        semaphore = asyncio.Semaphore(settings.users_info_max_concurrency)
+        chunk_size = settings.users_info_chunk_size
+        chunks = [
+            user_ids[start:start + chunk_size]
+            for start in range(0, len(user_ids), chunk_size)
+        ]
+        results = await asyncio.gather(*(
+            self._fetch_chunk_with_retries(
+                chunk, deadline, semaphore, authorization
+            )
+            for chunk in chunks
+        ))
+        users = dict()
+        unresolved = []
+        for chunk, data in zip(chunks, results):
+            if data is None:
+                unresolved.extend(chunk)
+                continue
+            for user_id in chunk:
+                if user_id in data:
+                    users[user_id] = data[user_id]
+        if unresolved:
+            logging.warning(
+                UNRESOLVED_USERS_MESSAGE.format(user_ids=unresolved)
+            )
+        return users, unresolved
+
+    async def get_logins(self, user_ids):
+        """Return ({user_id: login}, ids the users service did not answer).
+
+        Users missing in an answer are unknown to the users service, they
+        are left out of both.
+        """
+        users, unresolved = await self.find_users(user_ids)
+        return {
+            user_id: login
+            for user_id, login in users.items()
+            if isinstance(login, str)
+        }, unresolved
+
+
+users_info_client = UsersInfoClient()
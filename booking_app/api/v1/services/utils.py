@@ -1,14 +1,20 @@
 from datetime import datetime
-from http import HTTPStatus
+from functools import lru_cache
 from typing import List
 
-import aiohttp
-import requests
+import pytz
 from pytz import utc
 
+from booking_app.api.v1.services.users_info import users_info_client
 from booking_app.settings import settings
 
 
+@lru_cache(maxsize=None)
+def get_timezone(timezone_str):
+    """pytz.timezone shared by the whole process, one per zone name."""
+    return pytz.timezone(timezone_str)
+
+
 def get_paginate_obj_list(objs, page_numb=1):
     objs_count = len(objs)
     total_page_numbers = objs_count // settings.page_size
@@ -23,29 +29,19 @@ def get_paginate_obj_list(objs, page_numb=1):
 
 
 async def get_users_logins(users_ids: List):
-    users_data = []
-    try:
-        for _ in range(settings.number_of_tries_to_get_response):
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    settings.get_users_info_host.format(
-                        page=1,
-                        field="login",
-                    ),
-                    json={"ids": users_ids},
-                ) as response:
-                    if response.status != HTTPStatus.OK:
-                        continue
-                    data = await response.json()
-                    for user_id in users_ids:
-                        if user_id not in data:
-                            continue
-                        login = data[user_id]
-                        if isinstance(login, str):
-                            users_data.append({"id": user_id, "login": login})
-            return True, users_data
-    except requests.exceptions.ConnectionError:
+    """Return (True, [{"id", "login"}]) for the users whose login was
+    resolved, (False, info) if the users service answered about none.
+    """
+    if not users_ids:
+        return True, []
+    logins, unresolved = await users_info_client.get_logins(users_ids)
+    if len(unresolved) == len(users_ids):
         return False, "get user info error"
+    return True, [
+        {"id": user_id, "login": logins[user_id]}
+        for user_id in users_ids
+        if user_id in logins
+    ]
 
 
 def change_date_str_to_utc_format(date_str):
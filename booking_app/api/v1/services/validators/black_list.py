@@ -1,20 +1,33 @@
-from http import HTTPStatus
-
-import requests
-
-from booking_app.settings import settings
+from booking_app.api.v1.services.users import user_exists, users_exist
+from booking_app.http_client import UPSTREAM_ERRORS, CircuitOpenError
 
 
 def check_user_exist(request, user_id):
     headers = request.headers.environ
     authorization = headers.get("HTTP_AUTHORIZATION", None)
     try:
-        response = getattr(requests, "get")(
-            settings.get_user_host.format(id=user_id),
-            headers={"Authorization": authorization},
-        )
-    except requests.exceptions.ConnectionError:
+        exists = user_exists(user_id, authorization)
+    except CircuitOpenError:
+        raise ValueError("user service unavailable")
+    except UPSTREAM_ERRORS:
         raise ValueError("user_id invalid")
+    if not exists:
+        raise ValueError("user_id invalid")
+
+
+def check_users_exist(request, user_ids):
+    """Return {user_id: error message or None} for many users."""
+    headers = request.headers.environ
+    authorization = headers.get("HTTP_AUTHORIZATION", None)
+    try:
+        users = users_exist(user_ids, authorization)
+    except CircuitOpenError:
+        error = "user service unavailable"
+    except UPSTREAM_ERRORS:
+        error = "user_id invalid"
     else:
-        if response.status_code != HTTPStatus.OK:
-            raise ValueError("user_id invalid")
+        return {
+            user_id: None if exists else "user_id invalid"
+            for user_id, exists in users.items()
+        }
+    return {str(user_id): error for user_id in user_ids}
@@ -2,40 +2,82 @@ import datetime
 import logging
 
 import pytz
-from sqlalchemy import and_
+from sqlalchemy import exists, select
 
 from booking_app.api.v1.defines import (ERROR_MESSAGE, EXIST_LOG_MESSAGE,
-                                        NOT_FOUND_MESSAGE, USER_IN_BLOCK_LIST)
+                                        NO_TICKETS_MESSAGE, NOT_FOUND_MESSAGE,
+                                        USER_IN_BLOCK_LIST)
+from booking_app.api.v1.services.black_list_cache import (
+    black_list_cache_enabled, user_in_black_list)
 from booking_app.db import db
 from booking_app.db_models import BlackList as BlackList_db_model
 from booking_app.db_models import Booking as Booking_db_model
 from booking_app.db_models import Event as Event_db_model
 
 
-def check_booking_not_exist_or_raise_exception(obj):
-    objs = Booking_db_model.query.filter(
-        and_(
-            Booking_db_model.user_id == obj.user_id,
-            Booking_db_model.event_id == obj.event_id,
-            Booking_db_model.id != obj.id,
+def _booking_admission_query(user_id):
+    columns = [
+        Event_db_model.id,
+        Event_db_model.host_id,
+        Event_db_model.event_start,
+        Event_db_model.max_tickets_count,
+        Event_db_model.booked_count,
+    ]
+    if not black_list_cache_enabled():
+        in_black_list = exists().where(
+            BlackList_db_model.host_id == Event_db_model.host_id,
+            BlackList_db_model.user_id == user_id,
+        )
+        columns.append(in_black_list.label("in_black_list"))
+    return select(*columns)
+
+
+def get_booking_admission(event_id, user_id):
+    """Load every fact needed to admit a booking in one statement.
+
+    Duplicates are rejected by the unique constraint of the booking table.
+    Returns None if the event does not exist.
+    """
+    return db.session.execute(
+        _booking_admission_query(user_id).where(
+            Event_db_model.id == event_id
+        )
+    ).one_or_none()
+
+
+def get_bookings_admission(event_ids, user_id):
+    """Same as get_booking_admission for many events, keyed by event id."""
+    rows = db.session.execute(
+        _booking_admission_query(user_id).where(
+            Event_db_model.id.in_(event_ids)
         )
     )
-    if objs.count() > 0:
-        logging.info(EXIST_LOG_MESSAGE.format(model="booking"))
-        raise ValueError("already exist")
+    return {str(row.id): row for row in rows}
 
 
-def check_event_exist_or_raise_exception(obj_id):
-    if db.session.get(Event_db_model, obj_id) is None:
+def check_event_exist_or_raise_exception(admission, obj_id):
+    if admission is None:
         logging.info(NOT_FOUND_MESSAGE.format(model="event", id=obj_id))
         raise ValueError("event not exist")
 
 
-def check_event_have_available_tickets_or_raise_exception(obj):
-    event = db.session.get(Event_db_model, obj.event_id)
-    if event.max_tickets_count <= len(event.bookings):
-        logging.info(NOT_FOUND_MESSAGE.format(model="place", id=obj.id))
-        raise ValueError("Event have not available tickets")
+def check_event_have_available_tickets_or_raise_exception(admission):
+    if admission.max_tickets_count <= admission.booked_count:
+        logging.info(NOT_FOUND_MESSAGE.format(model="ticket", id=admission.id))
+        raise ValueError(NO_TICKETS_MESSAGE)
+
+
+def check_user_has_no_booking_or_raise_exception(event_id, user_id):
+    if db.session.execute(
+        select(
+            exists().where(
+                Booking_db_model.event_id == event_id,
+                Booking_db_model.user_id == user_id,
+            )
+        )
+    ).scalar():
+        logging.info(EXIST_LOG_MESSAGE.format(model="booking"))
+        raise ValueError("already exist")
 
 
 def check_that_user_is_host_or_owner(obj, user_id):
@@ -43,9 +85,8 @@ def check_that_user_is_host_or_owner(obj, user_id):
         raise ValueError("Only host or owner can change/delete object")
 
 
-def check_that_user_is_not_host(obj):
-    event = db.session.get(Event_db_model, obj.event_id)
-    if str(obj.user_id) == str(event.host_id):
+def check_that_user_is_not_host(admission, user_id):
+    if str(user_id) == str(admission.host_id):
         raise ValueError("Host can not take ticket for his own event")
 
 
@@ -54,9 +95,8 @@ def check_that_user_is_owner(obj, user_id):
         raise ValueError("Only owner can change/delete object")
 
 
-def check_event_not_finished_or_raise_exception(obj, api_name):
-    event = db.session.get(Event_db_model, obj.event_id)
-    event_start = pytz.timezone("UTC").localize(event.event_start)
+def check_event_not_finished_or_raise_exception(admission, api_name):
+    event_start = pytz.timezone("UTC").localize(admission.event_start)
     if event_start <= datetime.datetime.now(tz=pytz.timezone("UTC")):
         logging.info(
             ERROR_MESSAGE.format(api=api_name, error="Event already finished")
@@ -64,13 +104,19 @@ def check_event_not_finished_or_raise_exception(obj, api_name):
         raise ValueError("Event already finished")
 
 
-def check_user_not_in_black_list_or_raise_exception(obj):
-    event = db.session.get(Event_db_model, obj.event_id)
-    if (
-        BlackList_db_model.query.filter_by(
-            host_id=event.host_id, user_id=obj.user_id
-        ).count()
-        > 0
-    ):
+def check_user_not_in_black_list_or_raise_exception(admission, user_id):
+    if black_list_cache_enabled():
+        in_black_list = user_in_black_list(admission.host_id, user_id)
+    else:
+        in_black_list = admission.in_black_list
+    if in_black_list:
         logging.info(USER_IN_BLOCK_LIST)
         raise ValueError(USER_IN_BLOCK_LIST)
+
+
+def check_booking_admission_or_raise_exception(admission, obj, api_name):
+    check_event_exist_or_raise_exception(admission, obj.event_id)
+    check_event_not_finished_or_raise_exception(admission, api_name)
+    check_user_not_in_black_list_or_raise_exception(admission, obj.user_id)
+    check_that_user_is_not_host(admission, obj.user_id)
+    check_event_have_available_tickets_or_raise_exception(admission)
@@ -1,7 +1,9 @@
 import logging
 import uuid
 
-from booking_app.api.v1.defines import ERROR_MESSAGE
+from booking_app.api.v1.defines import ERROR_MESSAGE, EXIST_LOG_MESSAGE
+
+UNIQUE_VIOLATION = "23505"
 
 
 def check_obj_uuid(obj_id, api_name):
@@ -22,8 +24,8 @@ def obj_id_is_uuid_or_raise_exception(obj_id, api_name):
         raise ValueError("uuid invalid")
 
 
-def get_obj_if_exist_or_raise_exception(obj_id, db_model, db):
-    obj = db.session.get(db_model, obj_id)
+def get_obj_if_exist_or_raise_exception(obj_id, db_model, db, options=None):
+    obj = db.session.get(db_model, obj_id, options=options)
     if obj:
         return obj
     else:
@@ -44,3 +46,9 @@ def check_related_objects_raise_exception_if_exist(
 def check_that_user_is_host(obj, user_id):
     if str(obj.host_id) != user_id:
         raise ValueError("Only host can change/delete object")
+
+
+def raise_exception_if_unique_violation(error, model):
+    if getattr(error.orig, "pgcode", None) == UNIQUE_VIOLATION:
+        logging.info(EXIST_LOG_MESSAGE.format(model=model))
+        raise ValueError("already exist")
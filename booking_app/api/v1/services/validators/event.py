@@ -1,21 +1,53 @@
 import logging
 from datetime import datetime, timezone
-from http import HTTPStatus
 
-import pytz
-import requests
-from sqlalchemy import and_
+from sqlalchemy import exists, select
 
 from booking_app.api.v1.defines import NOT_FOUND_MESSAGE
+from booking_app.api.v1.services.films import film_exists
+from booking_app.api.v1.services.utils import get_timezone
 from booking_app.db import db
 from booking_app.db_models import Event as Event_db_model
+from booking_app.db_models import event_period
 from booking_app.db_models import Place as Place_db_model
+from booking_app.http_client import UPSTREAM_ERRORS, CircuitOpenError
 from booking_app.settings import settings
 
+EXCLUSION_VIOLATION = "23P01"
+PLACE_OCCUPIED_MESSAGE = (
+    "Place is already occupied by another event at this time"
+)
+
+
+def check_place_is_free_or_raise_exception(
+        place_id, event_start, event_end, event_id=None
+):
+    """One probe of the place_id/period exclusion index, takes naive UTC.
+
+    The exclusion constraint still rejects events created concurrently.
+    """
+    period = event_period(
+        Event_db_model.event_start, Event_db_model.event_end
+    )
+    conditions = [
+        Event_db_model.place_id == place_id,
+        period.op("&&")(event_period(event_start, event_end)),
+    ]
+    if event_id is not None:
+        conditions.append(Event_db_model.id != event_id)
+    if db.session.execute(select(exists().where(*conditions))).scalar():
+        raise ValueError(PLACE_OCCUPIED_MESSAGE)
+
+
+def raise_exception_if_place_occupied(error):
+    pgcode = getattr(getattr(error, "orig", None), "pgcode", None)
+    if pgcode == EXCLUSION_VIOLATION:
+        raise ValueError(PLACE_OCCUPIED_MESSAGE)
+
 
 def check_event_date_and_set_to_default_tz(place, new_event):
     data_format = settings.data_format
-    event_timezone = pytz.timezone(place.city.timezone)
+    event_timezone = get_timezone(place.city.timezone)
     try:
         event_start = datetime.strptime(new_event.event_start, data_format)
         event_end = datetime.strptime(new_event.event_end, data_format)
@@ -32,35 +64,12 @@ def check_event_date_and_set_to_default_tz(place, new_event):
         raise ValueError("event_start has to be in future")
     if event_start_with_tz >= event_end_with_tmz:
         raise ValueError("event_end can not be earlier that event_start")
-    if (
-        Event_db_model.query.filter(
-            and_(
-                Event_db_model.place_id == new_event.place_id,
-                Event_db_model.event_start >= event_start,
-                Event_db_model.event_end <= event_end,
-            )
-        ).count()
-        > 0
-        or Event_db_model.query.filter(
-            and_(
-                Event_db_model.place_id == new_event.place_id,
-                Event_db_model.event_start >= event_start,
-                Event_db_model.event_start < event_end,
-            )
-        ).count()
-        > 0
-        or Event_db_model.query.filter(
-            and_(
-                Event_db_model.place_id == new_event.place_id,
-                Event_db_model.event_end > event_start,
-                Event_db_model.event_end <= event_end,
-            )
-        ).count()
-        > 0
-    ):
-        raise ValueError(
-            "Place is already occupied by another event at this time"
-        )
+    check_place_is_free_or_raise_exception(
+        new_event.place_id,
+        event_start_with_tz.astimezone(timezone.utc).replace(tzinfo=None),
+        event_end_with_tmz.astimezone(timezone.utc).replace(tzinfo=None),
+        new_event.id,
+    )
     new_event.event_start = event_start_with_tz.astimezone(timezone.utc)
     new_event.event_end = event_end_with_tmz.astimezone(timezone.utc)
     return new_event
@@ -84,14 +93,10 @@ def check_film_work_id(request, film_work_id):
     headers = request.headers.environ
     authorization = headers.get("HTTP_AUTHORIZATION", None)
     try:
-        response = getattr(requests, "get")(
-            settings.get_film_host.format(id=film_work_id),
-            headers={
-                "Authorization": authorization,
-            },
-        )
-    except requests.exceptions.ConnectionError:
+        exists = film_exists(film_work_id, authorization)
+    except CircuitOpenError:
+        raise ValueError("film service unavailable")
+    except UPSTREAM_ERRORS:
+        raise ValueError("film_work_id invalid")
+    if not exists:
         raise ValueError("film_work_id invalid")
-    else:
-        if response.status_code != HTTPStatus.OK:
-            raise ValueError("film_work_id invalid")
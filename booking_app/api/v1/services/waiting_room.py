@@ -0,0 +1,193 @@
+import logging
+import time
+import uuid
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+
+from booking_app.api.v1.defines import ERROR_MESSAGE, NOT_FOUND_MESSAGE
+from booking_app.db import db, redis_db
+from booking_app.db_models import Event as Event_db_model
+from booking_app.settings import settings
+
+HIGH_DEMAND_EVENTS_KEY = "waiting_room:events"
+ISSUED_KEY = "waiting_room:{event_id}:issued"
+ADMITTED_KEY = "waiting_room:{event_id}:admitted"
+ADMITTED_AT_KEY = "waiting_room:{event_id}:admitted_at"
+USER_TOKEN_KEY = "waiting_room:{event_id}:user:{user_id}"
+TOKEN_KEY = "waiting_room:token:{token}"
+
+WAITING_ROOM_TOKEN_HEADER = "Waiting-Room-Token"
+TOKEN_REQUIRED_MESSAGE = "waiting room token required"
+NOT_ADMITTED_MESSAGE = "waiting room token is not admitted yet"
+
+# Admits queued positions at ARGV[2] per second since the last admission
+# and returns the last admitted position. An idle room does not save up
+# admissions, so a premiere opening later can not let the whole queue in.
+ADMIT_SCRIPT = """
+local issued = tonumber(redis.call('GET', KEYS[1]) or '0')
+local admitted = tonumber(redis.call('GET', KEYS[2]) or '0')
+local now = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local admitted_at = tonumber(redis.call('GET', KEYS[3]) or (now - 1))
+local allowed = math.floor((now - admitted_at) * rate)
+if allowed <= 0 then
+    return admitted
+end
+if admitted + allowed >= issued then
+    admitted = issued
+    admitted_at = now
+else
+    admitted = admitted + allowed
+    admitted_at = admitted_at + allowed / rate
+end
+redis.call('SET', KEYS[2], tostring(admitted), 'EX', ARGV[3])
+redis.call('SET', KEYS[3], tostring(admitted_at), 'EX', ARGV[3])
+return admitted
+"""
+
+admit_script = redis_db.script(ADMIT_SCRIPT)
+
+
+def waiting_room_enabled():
+    return settings.waiting_room_enabled
+
+
+def set_event_high_demand(event_id, high_demand):
+    try:
+        if high_demand:
+            redis_db.sadd(HIGH_DEMAND_EVENTS_KEY, str(event_id))
+        else:
+            redis_db.srem(HIGH_DEMAND_EVENTS_KEY, str(event_id))
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="waiting room", error=error))
+
+
+def reconcile_high_demand_events():
+    """Rebuild the redis set of high-demand events from postgres."""
+    event_ids = [
+        str(event_id)
+        for event_id in db.session.execute(
+            select(Event_db_model.id).where(
+                Event_db_model.high_demand.is_(True)
+            )
+        ).scalars()
+    ]
+    pipeline = redis_db.pipeline()
+    pipeline.delete(HIGH_DEMAND_EVENTS_KEY)
+    if event_ids:
+        pipeline.sadd(HIGH_DEMAND_EVENTS_KEY, *event_ids)
+    pipeline.execute()
+    return len(event_ids)
+
+
+def get_high_demand_events(event_ids):
+    """Return ids of the events that are booked through the waiting room.
+
+    Bookings are let through if redis is unavailable.
+    """
+    if not waiting_room_enabled() or not event_ids:
+        return set()
+    try:
+        pipeline = redis_db.pipeline(transaction=False)
+        for event_id in event_ids:
+            pipeline.sismember(HIGH_DEMAND_EVENTS_KEY, str(event_id))
+        members = pipeline.execute()
+    except RedisError as error:
+        logging.error(ERROR_MESSAGE.format(api="waiting room", error=error))
+        return set()
+    return {
+        str(event_id)
+        for event_id, member in zip(event_ids, members)
+        if member
+    }
+
+
+def _admit(event_id):
+    return admit_script(
+        keys=[
+            ISSUED_KEY.format(event_id=event_id),
+            ADMITTED_KEY.format(event_id=event_id),
+            ADMITTED_AT_KEY.format(event_id=event_id),
+        ],
+        args=[
+            time.time(),
+            settings.waiting_room_admission_rate,
+            settings.waiting_room_token_ttl_seconds,
+        ],
+    )
+
+
+def _token_status(token, token_data, admitted):
+    position = int(token_data["position"])
+    return {
+        "token": token,
+        "event_id": token_data["event_id"],
+        "position": position,
+        "admitted": position <= admitted,
+        "ahead": max(position - admitted - 1, 0),
+    }
+
+
+def _decode(data):
+    return {key.decode(): value.decode() for key, value in data.items()}
+
+
+def join_waiting_room_or_raise_exception(event_id, user_id):
+    """Give the user a queue position token for the event.
+
+    A user that already waits for the event gets the same token back.
+    """
+    if str(event_id) not in get_high_demand_events([event_id]):
+        logging.info(
+            NOT_FOUND_MESSAGE.format(model="waiting room", id=event_id)
+        )
+        raise ValueError("event has no waiting room")
+    ttl = settings.waiting_room_token_ttl_seconds
+    token = str(uuid.uuid4())
+    user_token_key = USER_TOKEN_KEY.format(event_id=event_id, user_id=user_id)
+    if not redis_db.set(user_token_key, token, ex=ttl, nx=True):
+        token = redis_db.get(user_token_key).decode()
+        return get_waiting_room_status_or_raise_exception(token, user_id)
+    token_data = {
+        "event_id": str(event_id),
+        "user_id": str(user_id),
+        "position": redis_db.incr(ISSUED_KEY.format(event_id=event_id)),
+    }
+    pipeline = redis_db.pipeline()
+    pipeline.expire(ISSUED_KEY.format(event_id=event_id), ttl)
+    pipeline.hset(TOKEN_KEY.format(token=token), mapping=token_data)
+    pipeline.expire(TOKEN_KEY.format(token=token), ttl)
+    pipeline.execute()
+    return _token_status(token, token_data, _admit(event_id))
+
+
+def get_waiting_room_status_or_raise_exception(token, user_id):
+    token_data = _decode(redis_db.hgetall(TOKEN_KEY.format(token=token)))
+    if not token_data or token_data["user_id"] != str(user_id):
+        logging.info(NOT_FOUND_MESSAGE.format(model="waiting room", id=token))
+        raise ValueError("waiting room token not exist")
+    return _token_status(token, token_data, _admit(token_data["event_id"]))
+
+
+def check_waiting_room_token_or_raise_exception(event_id, user_id, token):
+    """Let the booking through if the event is not high-demand or the
+    token of the user is admitted. Costs one redis round trip.
+    """
+    pipeline = redis_db.pipeline(transaction=False)
+    pipeline.sismember(HIGH_DEMAND_EVENTS_KEY, str(event_id))
+    pipeline.hgetall(TOKEN_KEY.format(token=token))
+    pipeline.get(ADMITTED_KEY.format(event_id=event_id))
+    high_demand, token_data, admitted = pipeline.execute()
+    if not high_demand:
+        return
+    if token is None:
+        raise ValueError(TOKEN_REQUIRED_MESSAGE)
+    token_data = _decode(token_data)
+    if (
+        token_data.get("event_id", None) != str(event_id)
+        or token_data.get("user_id", None) != str(user_id)
+    ):
+        raise ValueError("waiting room token invalid")
+    if int(token_data["position"]) > int(admitted or 0):
+        raise ValueError(NOT_ADMITTED_MESSAGE)
@@ -0,0 +1,36 @@
+import logging
+from http import HTTPStatus
+from typing import List
+
+from flask import Blueprint
+from flask_jwt_extended import jwt_required
+from spectree import Response
+
+from booking_app.api.permissions import superuser_authentication_required
+from booking_app.api.v1.defines import END_LOG_MESSAGE, START_LOG_MESSAGE
+from booking_app.api.v1.models.common import Status
+from booking_app.api.v1.models.upstreams import Upstream
+from booking_app.http_client import http_client
+from booking_app.utils import booking_doc
+
+upstream = Blueprint("upstreams", __name__)
+
+
+@upstream.route("/", methods=["GET"])
+@jwt_required(verify_type=False)
+@superuser_authentication_required
+@booking_doc.validate(
+    tags=["upstream"],
+    resp=Response(
+        HTTP_200=(List[Upstream], "Get outbound requests statistics"),
+        HTTP_400=(Status, "Error"),
+    ),
+)
+def upstreams():
+    logging.debug(START_LOG_MESSAGE.format(api="UpstreamAPI", method="get"))
+    data = [
+        Upstream(name=name, **stats).dict()
+        for name, stats in sorted(http_client.stats().items())
+    ]
+    logging.debug(END_LOG_MESSAGE.format(api="UpstreamAPI", method="get"))
+    return data, HTTPStatus.OK
@@ -0,0 +1,45 @@
+import logging
+from functools import wraps
+from http import HTTPStatus
+
+from flask import jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from redis.exceptions import RedisError
+
+from booking_app.api.v1.defines import ERROR_MESSAGE
+from booking_app.api.v1.services.waiting_room import (
+    WAITING_ROOM_TOKEN_HEADER, check_waiting_room_token_or_raise_exception,
+    waiting_room_enabled)
+
+
+def waiting_room_required(func):
+    """Only let admitted waiting room tokens book high-demand events.
+
+    Applied before authentication_required, so users that are not
+    admitted yet reach neither the auth service nor postgres.
+    """
+
+    @wraps(func)
+    def wrapped(*args, **kwargs):
+        if not waiting_room_enabled():
+            return func(*args, **kwargs)
+        data = request.get_json(silent=True) or {}
+        event_id = data.get("event_id", None) if isinstance(data, dict) \
+            else None
+        if event_id is None:
+            return func(*args, **kwargs)
+        try:
+            check_waiting_room_token_or_raise_exception(
+                event_id,
+                get_jwt_identity(),
+                request.headers.get(WAITING_ROOM_TOKEN_HEADER, None),
+            )
+        except ValueError as error:
+            return jsonify({"status": str(error)}), HTTPStatus.FORBIDDEN
+        except RedisError as error:
+            logging.error(
+                ERROR_MESSAGE.format(api="waiting room", error=error)
+            )
+        return func(*args, **kwargs)
+
+    return wrapped
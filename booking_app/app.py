@@ -10,9 +10,12 @@ from booking_app.api.v1.black_list import black_list
 from booking_app.api.v1.booking import booking
 from booking_app.api.v1.city import city
 from booking_app.api.v1.event import event
+from booking_app.api.v1.films import films
 from booking_app.api.v1.hosts import host
 from booking_app.api.v1.place import place
-from booking_app.db_init import init_db
+from booking_app.api.v1.upstreams import upstream
+from booking_app.db_init import init_db, init_redis
+from booking_app.http_client import http_client
 from booking_app.init_limiter import init_limiter
 from booking_app.logging_settings import logging_settings
 from booking_app.settings import settings
@@ -23,6 +26,8 @@ def create_booking_app(settings: BaseSettings = settings):
     dictConfig(logging_settings)
     current_app = Flask(__name__)
     init_db(current_app, settings)
+    init_redis(settings)
+    http_client.init(settings)
     current_app.config["TIMEZONE"] = pytz.timezone(settings.timezone)
     current_app.config["JWT_SECRET_KEY"] = settings.jwt_secret_key
     current_app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
@@ -33,6 +38,8 @@ def create_booking_app(settings: BaseSettings = settings):
     current_app.register_blueprint(booking, url_prefix="/api/v1/booking")
     current_app.register_blueprint(host, url_prefix="/api/v1/host")
     current_app.register_blueprint(black_list, url_prefix="/api/v1/black_list")
+    current_app.register_blueprint(upstream, url_prefix="/api/v1/upstreams")
+    current_app.register_blueprint(films, url_prefix="/api/v1/films")
     booking_doc.register(current_app)
     init_limiter(current_app, settings)
     return current_app
@@ -0,0 +1,73 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import TimeoutError
+
+
+class AsyncRunner:
+    """Run coroutines from sync code on one long-lived event loop.
+
+    The loop runs in a daemon thread started on first use (and again in a
+    forked worker), so under gevent it is started after monkey patching
+    and the thread is a greenlet. Sessions opened on the loop keep their
+    connections between requests.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _run_loop(loop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def _start(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop,
+            args=(self._loop,),
+            name="async-runner",
+            daemon=True,
+        )
+        self._thread.start()
+        self._pid = os.getpid()
+
+    @property
+    def loop(self):
+        if self._loop is None or self._pid != os.getpid():
+            with self._lock:
+                if self._loop is None or self._pid != os.getpid():
+                    self._start()
+        return self._loop
+
+    def run(self, coro, timeout=None):
+        """Wait for the coroutine, the loop thread itself must not call it.
+
+        On timeout the coroutine is cancelled and TimeoutError is raised.
+        """
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("AsyncRunner.run called from its loop")
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+
+async_runner = AsyncRunner()
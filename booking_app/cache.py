@@ -0,0 +1,44 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LocalCache:
+    """Thread safe in-process cache with per key expiry and LRU eviction."""
+
+    def __init__(self, max_size, ttl_seconds):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key, None)
+            if item is None:
+                return default
+            value, expire_at = item
+            if expire_at <= time.monotonic():
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl_seconds=None):
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds
+        if ttl_seconds <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + ttl_seconds)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
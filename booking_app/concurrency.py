@@ -0,0 +1,35 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import copy_current_request_context
+
+from booking_app.settings import settings
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the pool used to call upstream services concurrently.
+
+    The pool is created on first use, so under gevent it is created after
+    monkey patching and its workers are greenlets.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.upstream_max_workers,
+                    thread_name_prefix="upstream",
+                )
+    return _executor
+
+
+def submit_in_request_context(func, *args):
+    """Start func in the upstream pool with a copy of the request context.
+
+    Lets a remote check run while the request thread does its database
+    work, the result is taken by future.result().
+    """
+    return get_executor().submit(copy_current_request_context(func), *args)
@@ -1,3 +1,53 @@
+from typing import Optional
+
 from flask_sqlalchemy import SQLAlchemy
+from redis import Redis
 
 db = SQLAlchemy()
+
+
+class RedisScript:
+    """Lua script of a RedisDB, registered with its client on first call."""
+
+    def __init__(self, redis, source):
+        self.redis = redis
+        self.source = source
+        self._script = None
+
+    def __call__(self, keys=None, args=None):
+        if (
+            self._script is None
+            or self._script.registered_client is not self.redis.client
+        ):
+            self._script = self.redis.register_script(self.source)
+        return self._script(keys=keys, args=args)
+
+
+class RedisDB:
+    """Redis client shared by the app, configured by init_redis."""
+
+    def __init__(self):
+        self.client: Optional[Redis] = None
+
+    def init(self, settings):
+        self.client = Redis.from_url(
+            "{protocol}://{host}:{port}".format(
+                protocol=settings.redis_protocol,
+                host=settings.redis_host,
+                port=settings.redis_port,
+            ),
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_timeout,
+        )
+
+    def script(self, source):
+        """Return a script that can be created at import time."""
+        return RedisScript(self, source)
+
+    def __getattr__(self, name):
+        if self.client is None:
+            raise RuntimeError("redis is not initialized")
+        return getattr(self.client, name)
+
+
+redis_db = RedisDB()
@@ -1,7 +1,7 @@
 from flask import Flask
 from pydantic import BaseSettings
 
-from booking_app.db import db
+from booking_app.db import db, redis_db
 
 
 def init_db(app: Flask, settings: BaseSettings):
@@ -25,5 +25,6 @@ def init_db(app: Flask, settings: BaseSettings):
     return db
 
 
-def init_redis():
-    pass
+def init_redis(settings: BaseSettings):
+    redis_db.init(settings)
+    return redis_db
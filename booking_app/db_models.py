@@ -1,10 +1,21 @@
 import uuid
 
-from sqlalchemy import func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import DDL, column, event, func, literal_column, text
+from sqlalchemy.dialects.postgresql import UUID, ExcludeConstraint
 
 from booking_app.db import db
 
+# Event.film_validation states. Pending events wait for the film check of
+# booking_app.worker, invalid ones are hidden from event lists.
+FILM_VALID = "valid"
+FILM_PENDING = "pending"
+FILM_INVALID = "invalid"
+
+
+def event_period(event_start, event_end):
+    """[event_start, event_end) range, as used by the place exclusion."""
+    return func.tsrange(event_start, event_end, literal_column("'[)'"))
+
 
 class BaseID(db.Model):
     __abstract__ = True
@@ -58,6 +69,21 @@ class Place(BaseID, BaseCreate, ToDictMixin):
 
 
 class Event(BaseID, BaseCreate, ToDictMixin):
+    __table_args__ = (
+        # Events of a place must not overlap, needs btree_gist.
+        ExcludeConstraint(
+            ("place_id", "="),
+            (event_period(column("event_start"), column("event_end")), "&&"),
+            name="event_place_id_period_excl",
+            using="gist",
+        ),
+        db.Index(
+            "ix_event_pending_film_work_id",
+            "film_work_id",
+            postgresql_where=text("film_validation = 'pending'"),
+        ),
+    )
+
     film_work_id = db.Column(UUID(as_uuid=True), nullable=False)
     place_id = db.Column(
         UUID(as_uuid=True),
@@ -67,14 +93,50 @@ class Event(BaseID, BaseCreate, ToDictMixin):
     event_start = db.Column(db.DateTime, nullable=False)
     event_end = db.Column(db.DateTime, nullable=False)
     max_tickets_count = db.Column(db.Integer, nullable=False)
+    booked_count = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
     host_id = db.Column(UUID(as_uuid=True), nullable=False)
+    high_demand = db.Column(
+        db.Boolean, default=False, server_default="false", nullable=False
+    )
+    film_validation = db.Column(
+        db.String(16),
+        default=FILM_VALID,
+        server_default=FILM_VALID,
+        nullable=False,
+    )
+    # Last film check of a pending event the films service did not answer.
+    film_checked_at = db.Column(db.DateTime, nullable=True)
     place = db.relationship(
         "Place", backref=db.backref("events"), overlaps="events",
         single_parent=True, cascade="all, delete-orphan"
     )
 
+    def to_dict(self):
+        # The place and city are eager loaded by event queries, otherwise
+        # they are usually in the session already.
+        timezone = self.place.city.timezone
+        out = super().to_dict()
+        out.pop("place", None)
+        out["timezone"] = timezone
+        return out
+
+
+event.listen(
+    Event.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"),
+)
+
 
 class Booking(BaseID, BaseCreate, ToDictMixin):
+    __table_args__ = (
+        db.UniqueConstraint(
+            "user_id", "event_id", name="booking_user_id_event_id_key"
+        ),
+    )
+
     event_id = db.Column(
         UUID(as_uuid=True),
         db.ForeignKey("event.id", ondelete='RESTRICT'),
@@ -87,6 +149,26 @@ class Booking(BaseID, BaseCreate, ToDictMixin):
     )
 
 
+class TicketHold(BaseID, BaseCreate, ToDictMixin):
+    __table_args__ = (
+        db.UniqueConstraint(
+            "event_id", "user_id", name="ticket_hold_event_id_user_id_key"
+        ),
+    )
+
+    event_id = db.Column(
+        UUID(as_uuid=True),
+        db.ForeignKey("event.id", ondelete='CASCADE'),
+        nullable=False,
+    )
+    user_id = db.Column(UUID(as_uuid=True), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
 class BlackList(BaseID, BaseCreate, ToDictMixin):
+    __table_args__ = (
+        db.Index("ix_black_list_host_id_user_id", "host_id", "user_id"),
+    )
+
     host_id = db.Column(UUID(as_uuid=True), nullable=False)
     user_id = db.Column(UUID(as_uuid=True), nullable=False)
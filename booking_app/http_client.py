@@ -0,0 +1,240 @@
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from booking_app.settings import settings
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """The upstream is failing, the request was not sent."""
+
+
+# Errors raised when an upstream service could not answer in time.
+UPSTREAM_ERRORS = (
+    requests.exceptions.ConnectionError, requests.exceptions.Timeout
+)
+
+
+def _gevent_patched():
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("socket")
+
+
+class CircuitBreaker:
+    """Stop calling an upstream whose recent calls mostly failed.
+
+    A call fails if it raised, answered 5xx or was slower than
+    slow_call_seconds. The breaker opens when the failure rate of the
+    last calls reaches failure_rate, rejects calls for open_seconds and
+    then lets a single probe through (half open). A successful probe
+    closes it, a failed one opens it again. A probe that was never
+    recorded is replaced by a new one after open_seconds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self, window, min_calls, failure_rate, open_seconds, slow_call_seconds
+    ):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.opened = 0
+        self.rejected = 0
+        self._results = deque(maxlen=window)
+        self._probing = False
+        self._probe_started_at = 0.0
+
+    def allow(self):
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN:
+            if (
+                self._probing
+                and now - self._probe_started_at < self.open_seconds
+            ):
+                self.rejected += 1
+                return False
+            self._probing = True
+            self._probe_started_at = now
+        return True
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.opened += 1
+        self._results.clear()
+
+    def record(self, latency, error):
+        failed = error or latency > self.slow_call_seconds
+        if self.state == self.HALF_OPEN:
+            self._probing = False
+            if failed:
+                self._open()
+            else:
+                self.state = self.CLOSED
+            return
+        self._results.append(failed)
+        if (
+            len(self._results) >= self.min_calls
+            and sum(self._results) / len(self._results) >= self.failure_rate
+        ):
+            self._open()
+
+
+class UpstreamStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.breaker = CircuitBreaker(
+            settings.circuit_breaker_window,
+            settings.circuit_breaker_min_calls,
+            settings.circuit_breaker_failure_rate,
+            settings.circuit_breaker_open_seconds,
+            settings.circuit_breaker_slow_call_seconds,
+        )
+
+    def to_dict(self):
+        average_latency = (
+            self.total_latency / self.requests if self.requests else 0.0
+        )
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "average_latency_ms": round(average_latency * 1000, 3),
+            "max_latency_ms": round(self.max_latency * 1000, 3),
+            "state": self.breaker.state,
+            "opened": self.breaker.opened,
+            "rejected": self.breaker.rejected,
+        }
+
+
+class HttpClient:
+    """Shared client for calls to other services.
+
+    Keeps a pool of keep-alive connections per host and counts requests,
+    errors and latency per upstream name, each upstream has its own
+    circuit breaker. The session is created on first use, so under pywsgi
+    it is built on gevent patched sockets. In that case the pools block
+    instead of opening extra connections, greenlets wait for a free
+    connection.
+    """
+
+    def __init__(self):
+        self.connect_timeout = 2.0
+        self.read_timeout = 5.0
+        self.pool_connections = 10
+        self.pool_maxsize = 20
+        self._session = None
+        self._lock = threading.Lock()
+        self._stats = dict()
+
+    def init(self, settings):
+        self.connect_timeout = settings.http_connect_timeout
+        self.read_timeout = settings.http_read_timeout
+        self.pool_connections = settings.http_pool_connections
+        self.pool_maxsize = settings.http_pool_maxsize
+        self.close()
+
+    def _create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=_gevent_patched(),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+
+    def _upstream_stats(self, upstream):
+        stats = self._stats.get(upstream, None)
+        if stats is None:
+            stats = self._stats[upstream] = UpstreamStats()
+        return stats
+
+    def allow(self, upstream):
+        """Raise CircuitOpenError if the upstream must not be called."""
+        if not settings.circuit_breaker_enabled:
+            return
+        with self._lock:
+            allowed = self._upstream_stats(upstream).breaker.allow()
+        if not allowed:
+            raise CircuitOpenError(
+                "{upstream} circuit is open".format(upstream=upstream)
+            )
+
+    def record(self, upstream, latency, error=False):
+        with self._lock:
+            stats = self._upstream_stats(upstream)
+            stats.requests += 1
+            stats.errors += int(error)
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+            if settings.circuit_breaker_enabled:
+                stats.breaker.record(latency, error)
+
+    def stats(self):
+        with self._lock:
+            return {
+                upstream: stats.to_dict()
+                for upstream, stats in self._stats.items()
+            }
+
+    def request(self, method, upstream, url, **kwargs):
+        kwargs.setdefault(
+            "timeout", (self.connect_timeout, self.read_timeout)
+        )
+        self.allow(upstream)
+        started_at = time.monotonic()
+        error = True
+        try:
+            response = self.session.request(method, url, **kwargs)
+            error = response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+            return response
+        finally:
+            # Any exception is recorded, a half open circuit must always
+            # get the result of its probe.
+            self.record(upstream, time.monotonic() - started_at, error=error)
+
+    def get(self, upstream, url, **kwargs):
+        return self.request("GET", upstream, url, **kwargs)
+
+    def post(self, upstream, url, **kwargs):
+        return self.request("POST", upstream, url, **kwargs)
+
+
+http_client = HttpClient()
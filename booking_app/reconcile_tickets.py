@@ -0,0 +1,35 @@
+import logging
+
+from booking_app.api.v1.services.holds import count_redis_holds
+from booking_app.api.v1.services.reservation import count_queued_reservations
+from booking_app.api.v1.services.tickets import (inventory_enabled,
+                                                 reconcile_booked_counts,
+                                                 reconcile_inventory)
+from booking_app.api.v1.services.waiting_room import (
+    reconcile_high_demand_events, waiting_room_enabled)
+from booking_app.app import create_booking_app
+
+if __name__ == "__main__":
+    create_booking_app()
+    fixed_events_count = reconcile_booked_counts()
+    logging.info(
+        "booked_count fixed for {count} events".format(
+            count=fixed_events_count
+        )
+    )
+    if inventory_enabled():
+        reconciled_events_count = reconcile_inventory(
+            count_redis_holds() + count_queued_reservations()
+        )
+        logging.info(
+            "redis inventory reconciled for {count} events".format(
+                count=reconciled_events_count
+            )
+        )
+    if waiting_room_enabled():
+        high_demand_events_count = reconcile_high_demand_events()
+        logging.info(
+            "waiting room enabled for {count} events".format(
+                count=high_demand_events_count
+            )
+        )
@@ -1,4 +1,5 @@
 import os
+import socket
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -21,6 +22,9 @@ class Settings(BaseSettings):
     redis_host: str = Field(env="REDIS_HOST", default="localhost")
     redis_port: int = Field(env="REDIS_PORT", default=6379)
     redis_protocol: str = Field(env="REDIS_PROTOCOL", default="redis")
+    redis_socket_timeout: float = Field(
+        env="REDIS_SOCKET_TIMEOUT", default=1.0
+    )
     jwt_secret_key: str = Field(
         env="JWT_SECRET_KEY",
         default="Y0QMIGwksa5OhtOBF9BczuAJ0hYMUv7esEBgMMdAuJ4V7stwxT9e",
@@ -46,9 +50,177 @@ class Settings(BaseSettings):
     )
     timezone: str = Field(env="TIMEZONE", default="Europe/Moscow")
     data_format: str = Field(env="DATA_FORMAT", default="%Y-%m-%d %H:%M")
+    http_connect_timeout: float = Field(
+        env="HTTP_CONNECT_TIMEOUT", default=2.0
+    )
+    http_read_timeout: float = Field(env="HTTP_READ_TIMEOUT", default=5.0)
+    http_pool_connections: int = Field(
+        env="HTTP_POOL_CONNECTIONS", default=10
+    )
+    http_pool_maxsize: int = Field(env="HTTP_POOL_MAXSIZE", default=20)
+    auth_cache_ttl_seconds: int = Field(
+        env="AUTH_CACHE_TTL_SECONDS", default=60
+    )
+    auth_cache_local_size: int = Field(
+        env="AUTH_CACHE_LOCAL_SIZE", default=10000
+    )
+    auth_degraded_mode_enabled: bool = Field(
+        env="AUTH_DEGRADED_MODE_ENABLED", default=False
+    )
+    auth_degraded_ttl_seconds: int = Field(
+        env="AUTH_DEGRADED_TTL_SECONDS", default=60 * 15
+    )
+    circuit_breaker_enabled: bool = Field(
+        env="CIRCUIT_BREAKER_ENABLED", default=True
+    )
+    circuit_breaker_window: int = Field(
+        env="CIRCUIT_BREAKER_WINDOW", default=20
+    )
+    circuit_breaker_min_calls: int = Field(
+        env="CIRCUIT_BREAKER_MIN_CALLS", default=10
+    )
+    circuit_breaker_failure_rate: float = Field(
+        env="CIRCUIT_BREAKER_FAILURE_RATE", default=0.5
+    )
+    circuit_breaker_open_seconds: float = Field(
+        env="CIRCUIT_BREAKER_OPEN_SECONDS", default=30.0
+    )
+    circuit_breaker_slow_call_seconds: float = Field(
+        env="CIRCUIT_BREAKER_SLOW_CALL_SECONDS", default=2.0
+    )
+    film_cache_enabled: bool = Field(env="FILM_CACHE_ENABLED", default=True)
+    film_cache_expire_in_seconds: int = Field(
+        env="FILM_CACHE_EXPIRE_IN_SECONDS", default=60 * 60
+    )
+    film_cache_stale_seconds: int = Field(
+        env="FILM_CACHE_STALE_SECONDS", default=60 * 60 * 24
+    )
+    film_cache_not_found_ttl_seconds: int = Field(
+        env="FILM_CACHE_NOT_FOUND_TTL_SECONDS", default=60
+    )
+    film_metadata_ttl_seconds: int = Field(
+        env="FILM_METADATA_TTL_SECONDS", default=60 * 60
+    )
+    film_cache_local_ttl_seconds: int = Field(
+        env="FILM_CACHE_LOCAL_TTL_SECONDS", default=60
+    )
+    film_cache_local_size: int = Field(
+        env="FILM_CACHE_LOCAL_SIZE", default=10000
+    )
+    user_cache_enabled: bool = Field(env="USER_CACHE_ENABLED", default=True)
+    user_cache_ttl_seconds: int = Field(
+        env="USER_CACHE_TTL_SECONDS", default=60 * 60
+    )
+    user_cache_not_found_ttl_seconds: int = Field(
+        env="USER_CACHE_NOT_FOUND_TTL_SECONDS", default=60
+    )
+    user_cache_local_ttl_seconds: int = Field(
+        env="USER_CACHE_LOCAL_TTL_SECONDS", default=60
+    )
+    user_cache_local_size: int = Field(
+        env="USER_CACHE_LOCAL_SIZE", default=10000
+    )
+    black_list_bulk_max_size: int = Field(
+        env="BLACK_LIST_BULK_MAX_SIZE", default=500
+    )
+    login_cache_enabled: bool = Field(
+        env="LOGIN_CACHE_ENABLED", default=True
+    )
+    login_cache_ttl_seconds: int = Field(
+        env="LOGIN_CACHE_TTL_SECONDS", default=60 * 60
+    )
+    login_cache_local_ttl_seconds: int = Field(
+        env="LOGIN_CACHE_LOCAL_TTL_SECONDS", default=60
+    )
+    login_cache_local_size: int = Field(
+        env="LOGIN_CACHE_LOCAL_SIZE", default=10000
+    )
+    deferred_film_validation_enabled: bool = Field(
+        env="DEFERRED_FILM_VALIDATION_ENABLED", default=False
+    )
+    film_validation_batch_size: int = Field(
+        env="FILM_VALIDATION_BATCH_SIZE", default=100
+    )
+    film_validation_retry_seconds: int = Field(
+        env="FILM_VALIDATION_RETRY_SECONDS", default=60
+    )
+    film_validation_authorization: str = Field(
+        env="FILM_VALIDATION_AUTHORIZATION", default=""
+    )
+    superuser_cache_ttl_seconds: int = Field(
+        env="SUPERUSER_CACHE_TTL_SECONDS", default=60
+    )
+    upstream_max_workers: int = Field(env="UPSTREAM_MAX_WORKERS", default=16)
     number_of_tries_to_get_response: int = Field(
         env="NUMBER_OF_TRIES_TO_GET_RESPONSE", default=4
     )
+    users_info_chunk_size: int = Field(
+        env="USERS_INFO_CHUNK_SIZE", default=50
+    )
+    users_info_max_concurrency: int = Field(
+        env="USERS_INFO_MAX_CONCURRENCY", default=4
+    )
+    users_info_timeout_budget: float = Field(
+        env="USERS_INFO_TIMEOUT_BUDGET", default=10.0
+    )
+    users_info_backoff_base: float = Field(
+        env="USERS_INFO_BACKOFF_BASE", default=0.1
+    )
+    users_info_backoff_max: float = Field(
+        env="USERS_INFO_BACKOFF_MAX", default=2.0
+    )
+    redis_inventory_enabled: bool = Field(
+        env="REDIS_INVENTORY_ENABLED", default=False
+    )
+    inventory_ttl_seconds: int = Field(
+        env="INVENTORY_TTL_SECONDS", default=60 * 60 * 24
+    )
+    booking_write_behind_enabled: bool = Field(
+        env="BOOKING_WRITE_BEHIND_ENABLED", default=False
+    )
+    reservation_ttl_seconds: int = Field(
+        env="RESERVATION_TTL_SECONDS", default=60 * 60 * 24
+    )
+    booking_worker_batch_size: int = Field(
+        env="BOOKING_WORKER_BATCH_SIZE", default=100
+    )
+    booking_worker_poll_timeout: int = Field(
+        env="BOOKING_WORKER_POLL_TIMEOUT", default=1
+    )
+    booking_worker_id: str = Field(
+        env="BOOKING_WORKER_ID", default=socket.gethostname()
+    )
+    bulk_booking_max_size: int = Field(env="BULK_BOOKING_MAX_SIZE", default=50)
+    idempotency_ttl_seconds: int = Field(
+        env="IDEMPOTENCY_TTL_SECONDS", default=60 * 60 * 24
+    )
+    idempotency_lock_ttl_seconds: int = Field(
+        env="IDEMPOTENCY_LOCK_TTL_SECONDS", default=60
+    )
+    ticket_hold_ttl_seconds: int = Field(
+        env="TICKET_HOLD_TTL_SECONDS", default=60 * 5
+    )
+    waiting_room_enabled: bool = Field(
+        env="WAITING_ROOM_ENABLED", default=False
+    )
+    waiting_room_admission_rate: int = Field(
+        env="WAITING_ROOM_ADMISSION_RATE", default=50
+    )
+    waiting_room_token_ttl_seconds: int = Field(
+        env="WAITING_ROOM_TOKEN_TTL_SECONDS", default=60 * 30
+    )
+    black_list_cache_enabled: bool = Field(
+        env="BLACK_LIST_CACHE_ENABLED", default=False
+    )
+    black_list_cache_ttl_seconds: int = Field(
+        env="BLACK_LIST_CACHE_TTL_SECONDS", default=60 * 60
+    )
+    black_list_local_cache_ttl_seconds: int = Field(
+        env="BLACK_LIST_LOCAL_CACHE_TTL_SECONDS", default=1
+    )
+    black_list_local_cache_size: int = Field(
+        env="BLACK_LIST_LOCAL_CACHE_SIZE", default=10000
+    )
     test: bool = False
     debug: bool = Field(env="DEBUG", default=True)
 
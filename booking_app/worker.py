@@ -0,0 +1,42 @@
+import logging
+import time
+
+from booking_app.api.v1.defines import ERROR_MESSAGE
+from booking_app.api.v1.services.film_validation import (
+    deferred_film_validation_enabled, validate_pending_events)
+from booking_app.api.v1.services.holds import sweep_expired_holds
+from booking_app.api.v1.services.reservation import (persist_reservations,
+                                                     recover_reservations)
+from booking_app.app import create_booking_app
+from booking_app.db import db
+from booking_app.settings import settings
+
+
+def run_worker():
+    recovered = False
+    while True:
+        try:
+            sweep_expired_holds(settings.booking_worker_batch_size)
+            if deferred_film_validation_enabled():
+                validate_pending_events(settings.film_validation_batch_size)
+            if settings.booking_write_behind_enabled:
+                if not recovered:
+                    recover_reservations()
+                    recovered = True
+                persist_reservations(
+                    settings.booking_worker_batch_size,
+                    settings.booking_worker_poll_timeout,
+                )
+            else:
+                time.sleep(settings.booking_worker_poll_timeout)
+        except Exception as error:
+            db.session.rollback()
+            logging.error(
+                ERROR_MESSAGE.format(api="BookingWorker", error=error)
+            )
+            time.sleep(settings.booking_worker_poll_timeout)
+
+
+if __name__ == "__main__":
+    create_booking_app()
+    run_worker()
@@ -9,6 +9,7 @@ from flask_jwt_extended import (
 from sqlalchemy import create_engine, text
 from unittest.mock import patch
 
+from booking_app.api.v1.services.waiting_room import set_event_high_demand
 from booking_app.db_init import db as _db
 from booking_app.settings import settings
 from tests.functional.settings import test_settings, TestSettings
@@ -18,7 +19,7 @@ from tests.functional.utils.factories import (
 from tests.functional.utils.mock import (
     mock_authentication_required_decorator,
     mock_superuser_authentication_required_decorator, mock_check_film_work_id,
-    mock_get_users_logins, mock_check_user_exist
+    mock_get_users_logins, mock_check_user_exist, mock_check_users_exist
 )
 
 OBJ_COUNT = 10
@@ -54,6 +55,10 @@ patch(
     "booking_app.api.v1.services.validators.black_list.check_user_exist",
     mock_check_user_exist,
 ).start()
+patch(
+    "booking_app.api.v1.services.validators.black_list.check_users_exist",
+    mock_check_users_exist,
+).start()
 patch("booking_app.settings.app_settings", return_value=TestSettings())
 
 
@@ -189,6 +194,33 @@ def event_with_other_host(test_db, city, test_app, place_2, user_id_2):
     )
 
 
+@pytest.fixture()
+def high_demand_event(test_db, city, test_app, place_2, user_id_2):
+    event = EventFactory(
+        event_start=datetime.datetime.now() + datetime.timedelta(days=5),
+        event_end=datetime.datetime.now() + datetime.timedelta(days=6),
+        place_id=place_2.id,
+        host_id=user_id_2,
+        high_demand=True,
+    )
+    with patch.object(settings, "waiting_room_enabled", True):
+        set_event_high_demand(event.id, True)
+        yield event
+        set_event_high_demand(event.id, False)
+
+
+@pytest.fixture()
+def sold_out_event(test_db, city, test_app, place_2, user_id_2):
+    return EventFactory(
+        event_start=datetime.datetime.now() + datetime.timedelta(days=3),
+        event_end=datetime.datetime.now() + datetime.timedelta(days=4),
+        place_id=place_2.id,
+        host_id=user_id_2,
+        max_tickets_count=1,
+        booked_count=1,
+    )
+
+
 @pytest.fixture()
 def events(test_db, test_app, place):
     return EventFactory.create_batch(OBJ_COUNT, place_id=place.id)
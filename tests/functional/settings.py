@@ -25,6 +25,17 @@ class TestSettings(BaseSettings):
     redis_host: str = Field(env="REDIS_HOST", default='localhost')
     redis_port: int = Field(env="REDIS_PORT", default=6379)
     redis_protocol: str = Field(env="REDIS_PROTOCOL", default='redis')
+    redis_socket_timeout: float = Field(
+        env="REDIS_SOCKET_TIMEOUT", default=1.0
+    )
+    http_connect_timeout: float = Field(
+        env="HTTP_CONNECT_TIMEOUT", default=2.0
+    )
+    http_read_timeout: float = Field(env="HTTP_READ_TIMEOUT", default=5.0)
+    http_pool_connections: int = Field(
+        env="HTTP_POOL_CONNECTIONS", default=10
+    )
+    http_pool_maxsize: int = Field(env="HTTP_POOL_MAXSIZE", default=20)
     jwt_secret_key: str = Field(
         env="JWT_SECRET_KEY",
         default='Y0QMIGwksa5OhtOBF9BczuAJ0hYMUv7esEBgMMdAuJ4V7stwxT9e'
@@ -42,6 +42,38 @@ class TestBlackList:
         assert response.status_code == status
         assert before_creation_count + 1 == after_creation_count
 
+    def test_black_lists_bulk_post(
+            self,
+            test_client,
+            test_db,
+            access_token_headers,
+            black_list_with_host_user
+    ):
+        url = url_for("black_list.bulk_black_list")
+        method = "post"
+        new_user_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+        data = {
+            "user_ids": new_user_ids + [
+                str(black_list_with_host_user.user_id)
+            ]
+        }
+        status = HTTPStatus.OK
+        before_creation_count = BlackList.query.count()
+        response = getattr(test_client, method)(
+            url, json=data, headers=access_token_headers
+        )
+        after_creation_count = BlackList.query.count()
+        results = {
+            result["user_id"]: result["status"]
+            for result in json.loads(response.data.decode("utf-8"))
+        }
+        assert response.status_code == status
+        assert before_creation_count + 2 == after_creation_count
+        assert results[new_user_ids[0]] == "created"
+        assert results[
+            str(black_list_with_host_user.user_id)
+        ] == "already exist"
+
     def test_black_lists_delete(
             self, test_client, access_token_headers, black_list_with_host_user
     ):
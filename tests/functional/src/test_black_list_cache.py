@@ -0,0 +1,60 @@
+import uuid
+from unittest.mock import patch
+
+from booking_app.api.v1.services import black_list_cache
+from booking_app.api.v1.services.black_list_cache import (
+    BLACK_LIST_KEY, LOADED_MARKER, _get_version, _local_cache,
+    _store_black_list, add_user_to_black_list_cache,
+    drop_host_black_list_cache, user_in_black_list)
+from booking_app.db import redis_db
+from tests.functional.utils.factories import BlackListFactory
+
+
+class TestBlackListCache:
+    def test_user_in_black_list_loads_host_set(
+            self, test_db, black_list_with_host_user, user_id, user_id_2
+    ):
+        key = BLACK_LIST_KEY.format(host_id=user_id)
+        _local_cache.clear()
+        assert user_in_black_list(user_id, user_id_2) is True
+        assert user_in_black_list(user_id, uuid.uuid4()) is False
+        assert redis_db.sismember(key, str(user_id_2))
+        assert redis_db.sismember(key, LOADED_MARKER)
+
+    def test_user_in_black_list_from_redis(self, test_db, user_id, user_id_2):
+        _local_cache.clear()
+        _store_black_list(user_id, _get_version(user_id), {str(user_id_2)})
+        with patch.object(black_list_cache, "_load_black_list") as load:
+            assert user_in_black_list(user_id, user_id_2) is True
+            assert user_in_black_list(user_id, uuid.uuid4()) is False
+        load.assert_not_called()
+
+    def test_add_user_to_black_list_cache(self, test_db, user_id, user_id_2):
+        key = BLACK_LIST_KEY.format(host_id=user_id)
+        _local_cache.clear()
+        assert user_in_black_list(user_id, user_id_2) is False
+        BlackListFactory(host_id=user_id, user_id=user_id_2)
+        add_user_to_black_list_cache(user_id, user_id_2)
+        assert redis_db.sismember(key, str(user_id_2))
+        assert user_in_black_list(user_id, user_id_2) is True
+
+    def test_drop_host_black_list_cache(
+            self, test_db, black_list_with_host_user, user_id, user_id_2
+    ):
+        key = BLACK_LIST_KEY.format(host_id=user_id)
+        _local_cache.clear()
+        assert user_in_black_list(user_id, user_id_2) is True
+        version = _get_version(user_id)
+        drop_host_black_list_cache(user_id, user_id_2)
+        assert not redis_db.exists(key)
+        assert _get_version(user_id) != version
+
+    def test_load_does_not_overwrite_concurrent_change(
+            self, test_db, user_id, user_id_2
+    ):
+        key = BLACK_LIST_KEY.format(host_id=user_id)
+        version = _get_version(user_id)
+        # A user is black-listed while the set is read from postgres.
+        add_user_to_black_list_cache(user_id, user_id_2)
+        assert _store_black_list(user_id, version, set()) is False
+        assert not redis_db.exists(key)
@@ -1,11 +1,28 @@
 import json
+import time
+import uuid
+from datetime import datetime, timedelta
 from http import HTTPStatus
+from unittest.mock import patch
 
 from flask import url_for
+from sqlalchemy.exc import IntegrityError
 
-from booking_app.db import db
-from booking_app.db_models import Booking, Event
+from booking_app.api.v1.services.holds import (HOLDS_KEY,
+                                               sweep_expired_holds)
+from booking_app.api.v1.services.reservation import (
+    CONFIRMED, PENDING, PROCESSING_QUEUE, RESERVATIONS_QUEUE,
+    create_reservation_or_raise_exception, get_reservation,
+    persist_reservations, recover_reservations)
+from booking_app.api.v1.services.tickets import (
+    INVENTORY_KEY, claim_inventory_ticket_or_raise_exception,
+    drop_event_inventory, reconcile_booked_counts)
+from booking_app.api.v1.services.waiting_room import TOKEN_REQUIRED_MESSAGE
+from booking_app.db import db, redis_db
+from booking_app.db_models import Booking, Event, TicketHold
+from booking_app.settings import settings
 from tests.functional.conftest import OBJ_COUNT
+from tests.functional.utils.factories import BookingFactory, EventFactory
 from tests.functional.settings import test_settings
 
 
@@ -38,6 +55,159 @@ class TestBooking:
         after_creation_count = Booking.query.count()
         assert response.status_code == status
         assert before_creation_count + 1 == after_creation_count
+        db.session.refresh(event_with_other_host)
+        assert event_with_other_host.booked_count == 1
+
+    def test_booking_for_sold_out_event_post(
+            self,
+            test_client,
+            test_db,
+            sold_out_event,
+            access_token_headers
+    ):
+        url = url_for("booking.bookings")
+        method = "post"
+        data = {"event_id": sold_out_event.id}
+        status = HTTPStatus.BAD_REQUEST
+        before_creation_count = Booking.query.count()
+        response = getattr(test_client, method)(
+            url, json=data, headers=access_token_headers
+        )
+        after_creation_count = Booking.query.count()
+        assert response.status_code == status
+        assert before_creation_count == after_creation_count
+        db.session.refresh(sold_out_event)
+        assert sold_out_event.booked_count == 1
+
+    def test_booking_post_with_idempotency_key(
+            self,
+            test_client,
+            test_db,
+            event_with_other_host,
+            access_token_headers
+    ):
+        url = url_for("booking.bookings")
+        method = "post"
+        data = {"event_id": event_with_other_host.id}
+        headers = {
+            **access_token_headers, "Idempotency-Key": str(uuid.uuid4())
+        }
+        status = HTTPStatus.CREATED
+        before_creation_count = Booking.query.count()
+        response = getattr(test_client, method)(
+            url, json=data, headers=headers
+        )
+        retry_response = getattr(test_client, method)(
+            url, json=data, headers=headers
+        )
+        after_creation_count = Booking.query.count()
+        assert response.status_code == status
+        assert retry_response.status_code == status
+        assert retry_response.data == response.data
+        assert before_creation_count + 1 == after_creation_count
+
+    def test_booking_for_high_demand_event_post(
+            self,
+            test_client,
+            test_db,
+            high_demand_event,
+            access_token_headers
+    ):
+        url = url_for("booking.bookings")
+        method = "post"
+        data = {"event_id": high_demand_event.id}
+        response = getattr(test_client, method)(
+            url, json=data, headers=access_token_headers
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        response = test_client.post(
+            url_for(
+                "booking.join_waiting_room", event_id=high_demand_event.id
+            ),
+            headers=access_token_headers,
+        )
+        token = json.loads(response.data.decode("utf-8"))
+        assert response.status_code == HTTPStatus.OK
+        assert token["admitted"] is True
+        headers = {
+            **access_token_headers, "Waiting-Room-Token": token["token"]
+        }
+        response = getattr(test_client, method)(
+            url, json=data, headers=headers
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_hold_confirm_post(
+            self,
+            test_client,
+            test_db,
+            event_with_other_host,
+            access_token_headers
+    ):
+        url = url_for("booking.hold_ticket")
+        method = "post"
+        data = {"event_id": event_with_other_host.id}
+        before_creation_count = Booking.query.count()
+        response = getattr(test_client, method)(
+            url, json=data, headers=access_token_headers
+        )
+        hold = json.loads(response.data.decode("utf-8"))
+        assert response.status_code == HTTPStatus.CREATED
+        db.session.refresh(event_with_other_host)
+        assert event_with_other_host.booked_count == 1
+        response = getattr(test_client, method)(
+            url_for("booking.confirm_hold", hold_id=hold["id"]),
+            headers=access_token_headers,
+        )
+        after_creation_count = Booking.query.count()
+        assert response.status_code == HTTPStatus.CREATED
+        assert before_creation_count + 1 == after_creation_count
+        db.session.refresh(event_with_other_host)
+        assert event_with_other_host.booked_count == 1
+
+    def test_booking_twice_post(
+            self,
+            test_client,
+            test_db,
+            booking,
+            event_with_other_host,
+            access_token_headers
+    ):
+        url = url_for("booking.bookings")
+        method = "post"
+        data = {"event_id": event_with_other_host.id}
+        status = HTTPStatus.BAD_REQUEST
+        before_creation_count = Booking.query.count()
+        response = getattr(test_client, method)(
+            url, json=data, headers=access_token_headers
+        )
+        after_creation_count = Booking.query.count()
+        assert response.status_code == status
+        assert before_creation_count == after_creation_count
+
+    def test_bulk_booking_post(
+            self,
+            test_client,
+            test_db,
+            event_with_other_host,
+            sold_out_event,
+            access_token_headers
+    ):
+        url = url_for("booking.bulk_booking")
+        method = "post"
+        data = {"event_ids": [event_with_other_host.id, sold_out_event.id]}
+        status = HTTPStatus.OK
+        before_creation_count = Booking.query.count()
+        response = getattr(test_client, method)(
+            url, json=data, headers=access_token_headers
+        )
+        after_creation_count = Booking.query.count()
+        results = json.loads(response.data.decode("utf-8"))
+        assert response.status_code == status
+        assert before_creation_count + 1 == after_creation_count
+        assert [result["status"] for result in results] == [
+            "created", "Event have not available tickets"
+        ]
 
     def test_booking_for_user_in_black_list_post(
             self,
@@ -89,6 +259,27 @@ class TestBooking:
         assert response.status_code == status
         assert obj.event_id == event_with_other_host.id
 
+    def test_booking_patch_to_high_demand_event(
+            self,
+            test_client,
+            access_token_headers,
+            booking,
+            high_demand_event
+    ):
+        event_id = booking.event_id
+        url = url_for("booking.bookings_detail", booking_id=booking.id)
+        response = test_client.patch(
+            url,
+            json={"event_id": high_demand_event.id},
+            headers=access_token_headers,
+        )
+        db.session.expire_all()
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert json.loads(response.data.decode("utf-8"))["status"] == (
+            TOKEN_REQUIRED_MESSAGE
+        )
+        assert db.session.get(Booking, booking.id).event_id == event_id
+
     def test_booking_patch_with_random_request_user(
             self, test_client,
             random_access_token_headers,
@@ -136,3 +327,311 @@ class TestBooking:
         assert obj_count == len(
             json.loads(response.data.decode("utf-8"))
         )
+
+    def test_booking_post_with_redis_inventory(
+            self,
+            test_client,
+            test_db,
+            event_with_other_host,
+            access_token_headers
+    ):
+        url = url_for("booking.bookings")
+        key = INVENTORY_KEY.format(event_id=event_with_other_host.id)
+        event_with_other_host.booked_count = 3
+        db.session.commit()
+        drop_event_inventory(event_with_other_host.id)
+        with patch.object(settings, "redis_inventory_enabled", True):
+            response = test_client.post(
+                url,
+                json={"event_id": event_with_other_host.id},
+                headers=access_token_headers,
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        db.session.refresh(event_with_other_host)
+        assert event_with_other_host.booked_count == 4
+        assert int(redis_db.get(key)) == (
+            event_with_other_host.max_tickets_count - 4
+        )
+        drop_event_inventory(event_with_other_host.id)
+
+    def test_inventory_load_leaves_out_redis_claims(
+            self, test_db, event_with_other_host, user_id
+    ):
+        event_id = event_with_other_host.id
+        key = INVENTORY_KEY.format(event_id=event_id)
+        hold_member = "{event_id}:{hold_id}".format(
+            event_id=event_id, hold_id=uuid.uuid4()
+        )
+        drop_event_inventory(event_id)
+        redis_db.zadd(HOLDS_KEY, {hold_member: time.time() + 60})
+        reservation = create_reservation_or_raise_exception(event_id, user_id)
+        with patch.object(settings, "redis_inventory_enabled", True):
+            assert claim_inventory_ticket_or_raise_exception(event_id)
+        # One hold, one queued reservation and the claimed ticket.
+        assert int(redis_db.get(key)) == (
+            event_with_other_host.max_tickets_count - 3
+        )
+        redis_db.zrem(HOLDS_KEY, hold_member)
+        redis_db.lrem(RESERVATIONS_QUEUE, 1, reservation["id"])
+        drop_event_inventory(event_id)
+
+    def test_booking_for_sold_out_inventory_post(
+            self,
+            test_client,
+            test_db,
+            event_with_other_host,
+            access_token_headers
+    ):
+        url = url_for("booking.bookings")
+        key = INVENTORY_KEY.format(event_id=event_with_other_host.id)
+        redis_db.set(key, 0)
+        before_creation_count = Booking.query.count()
+        with patch.object(settings, "redis_inventory_enabled", True):
+            response = test_client.post(
+                url,
+                json={"event_id": event_with_other_host.id},
+                headers=access_token_headers,
+            )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert Booking.query.count() == before_creation_count
+        assert int(redis_db.get(key)) == 0
+        db.session.refresh(event_with_other_host)
+        assert event_with_other_host.booked_count == 0
+        drop_event_inventory(event_with_other_host.id)
+
+    def test_booking_twice_post_returns_inventory_ticket(
+            self,
+            test_client,
+            test_db,
+            booking,
+            event_with_other_host,
+            access_token_headers
+    ):
+        url = url_for("booking.bookings")
+        key = INVENTORY_KEY.format(event_id=event_with_other_host.id)
+        redis_db.set(key, 5)
+        with patch.object(settings, "redis_inventory_enabled", True):
+            response = test_client.post(
+                url,
+                json={"event_id": event_with_other_host.id},
+                headers=access_token_headers,
+            )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert int(redis_db.get(key)) == 5
+        drop_event_inventory(event_with_other_host.id)
+
+    def test_booking_post_with_write_behind(
+            self,
+            test_client,
+            test_db,
+            event_with_other_host,
+            access_token_headers
+    ):
+        url = url_for("booking.bookings")
+        with patch.object(settings, "booking_write_behind_enabled", True):
+            response = test_client.post(
+                url,
+                json={"event_id": event_with_other_host.id},
+                headers=access_token_headers,
+            )
+            reservation = json.loads(response.data.decode("utf-8"))
+            assert response.status_code == HTTPStatus.ACCEPTED
+            assert reservation["status"] == PENDING
+            assert persist_reservations(test_settings.page_size, 1) >= 1
+        response = test_client.get(
+            url_for(
+                "booking.reservation_status", reservation_id=reservation["id"]
+            ),
+            headers=access_token_headers,
+        )
+        assert json.loads(response.data.decode("utf-8"))["status"] == (
+            CONFIRMED
+        )
+        assert db.session.get(Booking, reservation["id"]) is not None
+        db.session.refresh(event_with_other_host)
+        assert event_with_other_host.booked_count == 1
+        drop_event_inventory(event_with_other_host.id)
+
+    def test_booking_post_with_write_behind_after_cancel(
+            self,
+            test_client,
+            test_db,
+            event_with_other_host,
+            access_token_headers
+    ):
+        url = url_for("booking.bookings")
+        with patch.object(settings, "booking_write_behind_enabled", True):
+            response = test_client.post(
+                url,
+                json={"event_id": event_with_other_host.id},
+                headers=access_token_headers,
+            )
+            booking_id = json.loads(response.data.decode("utf-8"))["id"]
+            persist_reservations(test_settings.page_size, 1)
+            response = test_client.delete(
+                url_for("booking.bookings_detail", booking_id=booking_id),
+                headers=access_token_headers,
+            )
+            assert response.status_code == HTTPStatus.NO_CONTENT
+            response = test_client.post(
+                url,
+                json={"event_id": event_with_other_host.id},
+                headers=access_token_headers,
+            )
+            assert response.status_code == HTTPStatus.ACCEPTED
+            persist_reservations(test_settings.page_size, 1)
+        assert Booking.query.filter_by(
+            event_id=event_with_other_host.id
+        ).count() == 1
+        drop_event_inventory(event_with_other_host.id)
+
+    def test_persist_reservations_after_restart(
+            self, test_client, test_db, event_with_other_host, user_id
+    ):
+        written = create_reservation_or_raise_exception(
+            event_with_other_host.id, user_id
+        )
+        BookingFactory(
+            id=written["id"],
+            event_id=event_with_other_host.id,
+            user_id=user_id,
+        )
+        pending = create_reservation_or_raise_exception(
+            event_with_other_host.id, uuid.uuid4()
+        )
+        # The worker took both reservations and stopped before it wrote
+        # their status.
+        with patch.object(settings, "booking_worker_id", str(uuid.uuid4())):
+            for _ in range(2):
+                redis_db.lmove(
+                    RESERVATIONS_QUEUE,
+                    PROCESSING_QUEUE.format(
+                        worker_id=settings.booking_worker_id
+                    ),
+                    "RIGHT",
+                    "RIGHT",
+                )
+            assert recover_reservations() == 2
+            persist_reservations(test_settings.page_size, 1)
+        assert get_reservation(written["id"])["status"] == CONFIRMED
+        assert get_reservation(pending["id"])["status"] == CONFIRMED
+        assert Booking.query.filter_by(
+            event_id=event_with_other_host.id
+        ).count() == 2
+
+    def test_booking_patch_returns_inventory_ticket_on_error(
+            self,
+            test_client,
+            access_token_headers,
+            booking,
+            event_with_other_host
+    ):
+        new_event = EventFactory(
+            place_id=event_with_other_host.place_id,
+            host_id=event_with_other_host.host_id,
+        )
+        key = INVENTORY_KEY.format(event_id=new_event.id)
+        redis_db.set(key, 5)
+        url = url_for("booking.bookings_detail", booking_id=booking.id)
+        with patch.object(settings, "redis_inventory_enabled", True), \
+                patch.object(
+                    db.session,
+                    "flush",
+                    side_effect=IntegrityError("", {}, Exception()),
+                ):
+            response = test_client.patch(
+                url,
+                json={"event_id": new_event.id},
+                headers=access_token_headers,
+            )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert int(redis_db.get(key)) == 5
+        assert db.session.get(Booking, booking.id).event_id == (
+            event_with_other_host.id
+        )
+        drop_event_inventory(new_event.id)
+
+    def test_hold_twice_post(
+            self,
+            test_client,
+            test_db,
+            event_with_other_host,
+            access_token_headers
+    ):
+        url = url_for("booking.hold_ticket")
+        data = {"event_id": event_with_other_host.id}
+        response = test_client.post(
+            url, json=data, headers=access_token_headers
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        response = test_client.post(
+            url, json=data, headers=access_token_headers
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        db.session.refresh(event_with_other_host)
+        assert event_with_other_host.booked_count == 1
+
+    def test_hold_post_replaces_expired_hold(
+            self,
+            test_client,
+            test_db,
+            event_with_other_host,
+            user_id,
+            access_token_headers
+    ):
+        db.session.add(
+            TicketHold(
+                event_id=event_with_other_host.id,
+                user_id=user_id,
+                expires_at=datetime.utcnow() - timedelta(minutes=1),
+            )
+        )
+        event_with_other_host.booked_count = 1
+        db.session.commit()
+        response = test_client.post(
+            url_for("booking.hold_ticket"),
+            json={"event_id": event_with_other_host.id},
+            headers=access_token_headers,
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        db.session.refresh(event_with_other_host)
+        assert event_with_other_host.booked_count == 1
+        assert TicketHold.query.filter_by(
+            event_id=event_with_other_host.id, user_id=user_id
+        ).count() == 1
+
+    def test_hold_post_for_booked_event(
+            self,
+            test_client,
+            test_db,
+            booking,
+            event_with_other_host,
+            access_token_headers
+    ):
+        response = test_client.post(
+            url_for("booking.hold_ticket"),
+            json={"event_id": event_with_other_host.id},
+            headers=access_token_headers,
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        db.session.refresh(event_with_other_host)
+        assert event_with_other_host.booked_count == 0
+
+    def test_reconcile_counts_expired_holds_until_swept(
+            self, test_db, event_with_other_host, user_id
+    ):
+        db.session.add(
+            TicketHold(
+                event_id=event_with_other_host.id,
+                user_id=user_id,
+                expires_at=datetime.utcnow() - timedelta(minutes=1),
+            )
+        )
+        event_with_other_host.booked_count = 0
+        db.session.commit()
+        reconcile_booked_counts()
+        db.session.refresh(event_with_other_host)
+        assert event_with_other_host.booked_count == 1
+        sweep_expired_holds(OBJ_COUNT)
+        db.session.refresh(event_with_other_host)
+        assert event_with_other_host.booked_count == 0
@@ -2,13 +2,25 @@ import json
 import uuid
 from datetime import datetime, timedelta
 from http import HTTPStatus
+from unittest.mock import Mock, patch
 
 from flask import url_for
+from pytz import timezone, utc
 
+from booking_app.api.v1.models.event import get_local_date_str
+from booking_app.api.v1.services.film_validation import \
+    validate_pending_events
+from booking_app.api.v1.services.validators.event import \
+    PLACE_OCCUPIED_MESSAGE
 from booking_app.db import db
-from booking_app.db_models import Event
-from tests.functional.conftest import OBJ_COUNT, TEST_INT_VALUE
+from booking_app.db_models import FILM_INVALID, FILM_PENDING, Event
+from booking_app.http_client import http_client
+from booking_app.settings import settings
+from tests.functional.conftest import (
+    OBJ_COUNT, TEST_INT_VALUE, TEST_STR_VALUE
+)
 from tests.functional.settings import test_settings
+from tests.functional.utils.factories import EventFactory
 
 
 class TestEvent:
@@ -22,6 +34,22 @@ class TestEvent:
             OBJ_COUNT, test_settings.page_size
         )
 
+    def test_events_get_with_film_expand(self, test_client, place, events):
+        url = url_for("event.events")
+        film = {"title": TEST_STR_VALUE}
+        with patch.object(
+            http_client,
+            "get",
+            return_value=Mock(status_code=HTTPStatus.OK, json=lambda: film),
+        ) as mock_get:
+            response = test_client.get(url, query_string={"expand": "film"})
+        data = json.loads(response.data.decode("utf-8"))
+        assert response.status_code == HTTPStatus.OK
+        assert all(event["film"] == film for event in data)
+        assert mock_get.call_count <= len(
+            {event["film_work_id"] for event in data}
+        )
+
     def test_event_post(
             self, test_client, test_db, place, access_token_headers
     ):
@@ -45,6 +73,154 @@ class TestEvent:
         assert response.status_code == status
         assert before_creation_count + 1 == after_creation_count
 
+    def test_event_post_for_occupied_place(
+            self, test_client, test_db, place, access_token_headers
+    ):
+        url = url_for("event.events")
+        event_start = datetime.now() + timedelta(days=1)
+        event_end = datetime.now() + timedelta(days=2)
+        data = {
+            "film_work_id": uuid.uuid4(),
+            "place_id": place.id,
+            "event_start": event_start.strftime(test_settings.data_format),
+            "event_end": event_end.strftime(test_settings.data_format),
+            "max_tickets_count": 5
+        }
+        response = test_client.post(
+            url, json=data, headers=access_token_headers
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        data["event_start"] = (event_start + timedelta(hours=1)).strftime(
+            test_settings.data_format
+        )
+        data["event_end"] = (event_end - timedelta(hours=1)).strftime(
+            test_settings.data_format
+        )
+        before_creation_count = Event.query.count()
+        response = test_client.post(
+            url, json=data, headers=access_token_headers
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert Event.query.count() == before_creation_count
+
+    def test_event_post_with_film_check_error(
+            self, test_client, test_db, place, access_token_headers
+    ):
+        url = url_for("event.events")
+        event_start = datetime.now() + timedelta(days=1)
+        event_end = datetime.now() + timedelta(days=2)
+        data = {
+            "film_work_id": uuid.uuid4(),
+            "place_id": place.id,
+            "event_start": event_start.strftime(test_settings.data_format),
+            "event_end": event_end.strftime(test_settings.data_format),
+            "max_tickets_count": 5
+        }
+        before_creation_count = Event.query.count()
+        with patch(
+            "booking_app.api.v1.services.event.check_film_work_id",
+            side_effect=ValueError("film_work_id invalid"),
+        ):
+            response = test_client.post(
+                url, json=data, headers=access_token_headers
+            )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert Event.query.count() == before_creation_count
+
+    def test_film_check_is_cancelled_on_invalid_event(
+            self, test_client, test_db, place, access_token_headers
+    ):
+        url = url_for("event.events")
+        event_start = datetime.now() + timedelta(days=1)
+        event_end = datetime.now() + timedelta(days=2)
+        data = {
+            "film_work_id": uuid.uuid4(),
+            "place_id": place.id,
+            "event_start": event_start.strftime(test_settings.data_format),
+            "event_end": event_end.strftime(test_settings.data_format),
+            "max_tickets_count": 0
+        }
+        film_check = Mock()
+        with patch(
+            "booking_app.api.v1.services.event.start_film_check",
+            return_value=film_check,
+        ):
+            response = test_client.post(
+                url, json=data, headers=access_token_headers
+            )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        film_check.cancel.assert_called_once_with()
+        film_check.result.assert_not_called()
+
+    def test_event_post_with_deferred_film_validation(
+            self, test_client, test_db, place, access_token_headers
+    ):
+        url = url_for("event.events")
+        event_start = datetime.now() + timedelta(days=1)
+        event_end = datetime.now() + timedelta(days=2)
+        film_work_id = str(uuid.uuid4())
+        data = {
+            "film_work_id": film_work_id,
+            "place_id": place.id,
+            "event_start": event_start.strftime(test_settings.data_format),
+            "event_end": event_end.strftime(test_settings.data_format),
+            "max_tickets_count": 5
+        }
+        with patch.object(settings, "deferred_film_validation_enabled", True):
+            response = test_client.post(
+                url, json=data, headers=access_token_headers
+            )
+        event_id = json.loads(response.data.decode("utf-8"))["id"]
+        assert response.status_code == HTTPStatus.CREATED
+        assert db.session.get(Event, event_id).film_validation == (
+            FILM_PENDING
+        )
+        with patch(
+            "booking_app.api.v1.services.film_validation.warm_up_film_cache",
+            return_value={film_work_id: False},
+        ):
+            validate_pending_events(test_settings.page_size)
+        db.session.expire_all()
+        response = test_client.get(url, query_string={"place_id": place.id})
+        assert db.session.get(Event, event_id).film_validation == (
+            FILM_INVALID
+        )
+        assert event_id not in [
+            event["id"] for event in json.loads(response.data.decode("utf-8"))
+        ]
+
+    def test_unanswered_films_do_not_block_pending_events(self, test_db):
+        checked_at = datetime.utcnow() - timedelta(hours=1)
+        unanswered_event = EventFactory(
+            film_validation=FILM_PENDING, film_checked_at=checked_at
+        )
+        new_event = EventFactory(film_validation=FILM_PENDING)
+        unanswered_id = str(unanswered_event.film_work_id)
+        new_id = str(new_event.film_work_id)
+        with patch(
+            "booking_app.api.v1.services.film_validation.warm_up_film_cache",
+            return_value={},
+        ) as warm_up:
+            validate_pending_events(OBJ_COUNT * OBJ_COUNT)
+            film_work_ids = warm_up.call_args.args[0]
+            # Films never checked go before the ones that just failed.
+            assert film_work_ids.index(new_id) < film_work_ids.index(
+                unanswered_id
+            )
+            # Films that just failed are not checked again right away.
+            validate_pending_events(OBJ_COUNT * OBJ_COUNT)
+        assert not any(
+            {new_id, unanswered_id} & set(call.args[0])
+            for call in warm_up.call_args_list[1:]
+        )
+        db.session.expire_all()
+        assert db.session.get(Event, new_event.id).film_validation == (
+            FILM_PENDING
+        )
+        assert db.session.get(Event, new_event.id).film_checked_at > (
+            checked_at
+        )
+
     def test_event_delete(self, test_client, access_token_headers, event):
         url = url_for("event.events_detail", event_id=event.id)
         method = "delete"
@@ -69,9 +245,67 @@ class TestEvent:
         assert response.status_code == status
         assert obj.max_tickets_count == TEST_INT_VALUE
 
+    def test_event_patch_for_occupied_place(
+            self, test_client, access_token_headers, city, place, event,
+            user_id
+    ):
+        other_event = EventFactory(place_id=place.id, host_id=user_id)
+        event_start = event.event_start
+        url = url_for("event.events_detail", event_id=event.id)
+        data = {
+            field: utc.localize(getattr(other_event, field))
+            .astimezone(timezone(city.timezone))
+            .strftime(test_settings.data_format)
+            for field in ("event_start", "event_end")
+        }
+        # Skips the pre-check, as a concurrent update would, so the place
+        # exclusion constraint rejects the update.
+        with patch(
+            "booking_app.api.v1.services.validators.event."
+            "check_place_is_free_or_raise_exception"
+        ):
+            response = test_client.patch(
+                url, json=data, headers=access_token_headers
+            )
+        db.session.expire_all()
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert json.loads(response.data.decode("utf-8"))["status"] == (
+            PLACE_OCCUPIED_MESSAGE
+        )
+        assert db.session.get(Event, event.id).event_start == event_start
+
     def test_event_get(self, test_client, event):
         url = url_for("event.events_detail", event_id=event.id)
         method = "get"
         status = HTTPStatus.OK
         response = getattr(test_client, method)(url)
         assert response.status_code == status
+
+    def test_events_get_number_of_available_tickets(
+            self, test_client, place, events
+    ):
+        url = url_for("event.events")
+        for obj in events:
+            obj.booked_count = 1
+        db.session.commit()
+        response = test_client.get(url, query_string={"place_id": place.id})
+        data = json.loads(response.data.decode("utf-8"))
+        assert response.status_code == HTTPStatus.OK
+        assert all(
+            event["number_of_available_tickets"]
+            == int(event["max_tickets_count"]) - 1
+            for event in data
+        )
+
+    def test_events_get_in_city_timezone(self, test_client, place, events):
+        url = url_for("event.events")
+        response = test_client.get(url, query_string={"place_id": place.id})
+        data = json.loads(response.data.decode("utf-8"))
+        events_by_id = {str(obj.id): obj for obj in events}
+        assert response.status_code == HTTPStatus.OK
+        assert all(
+            event["event_start"] == get_local_date_str(
+                events_by_id[event["id"]].event_start, place.city.timezone
+            )
+            for event in data
+        )
@@ -0,0 +1,58 @@
+import json
+import uuid
+from http import HTTPStatus
+from unittest.mock import Mock, patch
+
+from flask import url_for
+
+from booking_app.api.v1.services.films import (FILM_KEY,
+                                               _fetch_film_metadata,
+                                               film_exists)
+from booking_app.db import redis_db
+from booking_app.http_client import http_client
+from booking_app.settings import settings
+
+
+class TestFilms:
+    def test_films_warm_up_post(self, test_client, access_token_headers):
+        found_id = str(uuid.uuid4())
+        not_found_id = str(uuid.uuid4())
+
+        def get(upstream, url, **kwargs):
+            if found_id in url:
+                return Mock(status_code=HTTPStatus.OK)
+            return Mock(status_code=HTTPStatus.NOT_FOUND)
+
+        url = url_for("films.warm_up")
+        with patch.object(http_client, "get", side_effect=get) as mock_get:
+            response = test_client.post(
+                url,
+                headers=access_token_headers,
+                json={"film_work_ids": [found_id, not_found_id, found_id]},
+            )
+            result = {
+                film["film_work_id"]: film["exists"]
+                for film in json.loads(response.data.decode("utf-8"))
+            }
+            assert response.status_code == HTTPStatus.OK
+            assert result == {found_id: True, not_found_id: False}
+            assert mock_get.call_count == 2
+            assert film_exists(found_id, None) is True
+            assert film_exists(not_found_id, None) is False
+            assert mock_get.call_count == 2
+
+    def test_film_metadata_is_not_cached_when_cache_disabled(self, test_db):
+        film_work_id = str(uuid.uuid4())
+        with patch.object(settings, "film_cache_enabled", False), \
+                patch.object(
+                    http_client,
+                    "get",
+                    return_value=Mock(
+                        status_code=HTTPStatus.OK,
+                        json=lambda: {"id": film_work_id},
+                    ),
+                ):
+            assert _fetch_film_metadata(film_work_id, None) == {
+                "id": film_work_id
+            }
+        assert redis_db.get(FILM_KEY.format(film_work_id=film_work_id)) is None
@@ -0,0 +1,88 @@
+import json
+import time
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from booking_app.api.v1.services import logins
+from booking_app.api.v1.services.logins import (LOGINS_KEY, _local_cache,
+                                                _save, get_logins)
+from booking_app.db import redis_db
+from booking_app.settings import settings
+from tests.functional.utils.mock import mock_get_users_logins
+
+
+@pytest.fixture
+def user_ids():
+    _local_cache.clear()
+    return [str(uuid.uuid4()) for _ in range(3)]
+
+
+def patch_get_users_logins():
+    return patch.object(
+        logins,
+        "get_users_logins",
+        new=AsyncMock(side_effect=mock_get_users_logins),
+    )
+
+
+class TestLogins:
+    def test_local_hit_skips_redis(self, test_db, user_ids):
+        _local_cache.set(user_ids[0], "local")
+        with patch_get_users_logins() as get_users_logins, \
+                patch.object(redis_db, "hmget") as hmget:
+            assert get_logins(user_ids[:1]) == (
+                True, [{"id": user_ids[0], "login": "local"}]
+            )
+        hmget.assert_not_called()
+        get_users_logins.assert_not_called()
+
+    def test_redis_hit_is_kept_locally(self, test_db, user_ids):
+        _save({user_ids[0]: "cached"})
+        _local_cache.clear()
+        with patch_get_users_logins() as get_users_logins:
+            assert get_logins(user_ids[:1]) == (
+                True, [{"id": user_ids[0], "login": "cached"}]
+            )
+        get_users_logins.assert_not_called()
+        assert _local_cache.get(user_ids[0], None) == "cached"
+
+    def test_only_missing_users_are_fetched(self, test_db, user_ids):
+        _save({user_ids[0]: "cached"})
+        with patch_get_users_logins() as get_users_logins:
+            result, info = get_logins(user_ids)
+        get_users_logins.assert_awaited_once_with(user_ids[1:])
+        assert result is True
+        assert info == [
+            {"id": user_ids[0], "login": "cached"},
+            {"id": user_ids[1], "login": "Test"},
+            {"id": user_ids[2], "login": "Test"},
+        ]
+        assert redis_db.hget(LOGINS_KEY, user_ids[1]) is not None
+
+    def test_expired_login_is_dropped(self, test_db, user_ids):
+        cached_at = time.time() - settings.login_cache_ttl_seconds - 1
+        redis_db.hset(
+            LOGINS_KEY,
+            user_ids[0],
+            json.dumps({"login": "expired", "cached_at": cached_at}),
+        )
+        with patch.object(logins, "_save"), \
+                patch_get_users_logins() as get_users_logins:
+            assert get_logins(user_ids[:1]) == (
+                True, [{"id": user_ids[0], "login": "Test"}]
+            )
+        get_users_logins.assert_awaited_once_with(user_ids[:1])
+        assert redis_db.hget(LOGINS_KEY, user_ids[0]) is None
+
+    def test_malformed_login_is_a_miss(self, test_db, user_ids):
+        redis_db.hset(LOGINS_KEY, user_ids[0], "not json")
+        redis_db.hset(LOGINS_KEY, user_ids[1], json.dumps({"login": "x"}))
+        with patch.object(logins, "_save"), \
+                patch_get_users_logins() as get_users_logins:
+            result, info = get_logins(user_ids[:2])
+        get_users_logins.assert_awaited_once_with(user_ids[:2])
+        assert result is True
+        assert [user["login"] for user in info] == ["Test", "Test"]
+        assert redis_db.hmget(LOGINS_KEY, user_ids[:2]) == [None, None]
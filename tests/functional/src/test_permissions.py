@@ -0,0 +1,205 @@
+import threading
+import time
+import uuid
+from http import HTTPStatus
+from unittest.mock import Mock, patch
+
+import pytest
+
+from booking_app.api.permissions import (AUTH_DECISION_KEY,
+                                         SUPERUSER_DECISION_KEY,
+                                         _auth_decisions, _save_decision,
+                                         _save_superuser_flag,
+                                         _superuser_decisions, _token_hash,
+                                         is_authenticated, is_superuser)
+from booking_app.db import redis_db
+from booking_app.http_client import CircuitOpenError, http_client
+from booking_app.settings import settings
+
+
+def get_authorization():
+    return "Bearer {token}".format(token=uuid.uuid4())
+
+
+def get_decision(authorization):
+    return redis_db.get(
+        AUTH_DECISION_KEY.format(token_hash=_token_hash(authorization))
+    )
+
+
+class TestAuthentication:
+    def test_cached_token_skips_auth_service(self, test_db):
+        authorization = get_authorization()
+        exp = time.time() + 3600
+        with patch.object(
+            http_client, "get", return_value=Mock(status_code=HTTPStatus.OK)
+        ) as mock_get:
+            assert is_authenticated(authorization, exp) is True
+            _auth_decisions.clear()
+            assert is_authenticated(authorization, exp) is True
+        assert mock_get.call_count == 1
+
+    def test_unauthorized_drops_cached_decision(self, test_db):
+        authorization = get_authorization()
+        exp = time.time() + 3600
+        with patch.object(settings, "auth_degraded_mode_enabled", True):
+            _save_decision(
+                _token_hash(authorization),
+                time.time() - settings.auth_cache_ttl_seconds - 1,
+                exp,
+            )
+            with patch.object(
+                http_client,
+                "get",
+                return_value=Mock(status_code=HTTPStatus.UNAUTHORIZED),
+            ):
+                assert is_authenticated(authorization, exp) is False
+        assert get_decision(authorization) is None
+        assert _auth_decisions.get(_token_hash(authorization)) is None
+
+    def test_cached_decision_does_not_outlive_exp(self, test_db):
+        authorization = get_authorization()
+        with patch.object(
+            http_client, "get", return_value=Mock(status_code=HTTPStatus.OK)
+        ):
+            assert is_authenticated(authorization, time.time() + 2) is True
+            assert 0 < redis_db.ttl(
+                AUTH_DECISION_KEY.format(
+                    token_hash=_token_hash(authorization)
+                )
+            ) <= 2
+            expired_authorization = get_authorization()
+            assert is_authenticated(
+                expired_authorization, time.time() - 1
+            ) is True
+        assert get_decision(expired_authorization) is None
+
+    def test_degraded_mode_uses_recent_decision(self, test_db):
+        authorization = get_authorization()
+        exp = time.time() + 3600
+        confirmed_at = time.time() - settings.auth_cache_ttl_seconds - 1
+        with patch.object(settings, "auth_degraded_mode_enabled", True):
+            _save_decision(_token_hash(authorization), confirmed_at, exp)
+            with patch.object(
+                http_client, "get", side_effect=CircuitOpenError("auth")
+            ):
+                assert is_authenticated(authorization, exp) is True
+            with patch.object(
+                http_client,
+                "get",
+                return_value=Mock(
+                    status_code=HTTPStatus.SERVICE_UNAVAILABLE
+                ),
+            ):
+                assert is_authenticated(authorization, exp) is True
+            with patch.object(
+                http_client, "get", side_effect=CircuitOpenError("auth")
+            ):
+                with pytest.raises(CircuitOpenError):
+                    is_authenticated(get_authorization(), exp)
+        with patch.object(settings, "auth_degraded_mode_enabled", False):
+            with patch.object(
+                http_client, "get", side_effect=CircuitOpenError("auth")
+            ):
+                with pytest.raises(CircuitOpenError):
+                    is_authenticated(authorization, exp)
+
+
+def get_upstreams_mock(user, auth_status=HTTPStatus.OK):
+    """http_client.get answering the auth and users services."""
+
+    def get(upstream, url, **kwargs):
+        if upstream == "auth":
+            return Mock(status_code=auth_status)
+        if user is None:
+            return Mock(status_code=HTTPStatus.SERVICE_UNAVAILABLE)
+        return Mock(status_code=HTTPStatus.OK, json=lambda: user)
+
+    return get
+
+
+class TestSuperuser:
+    def test_superuser_flag_is_cached(self, test_db, user_id):
+        authorization = get_authorization()
+        exp = time.time() + 3600
+        with patch.object(
+            http_client,
+            "get",
+            side_effect=get_upstreams_mock({"is_superuser": True}),
+        ) as mock_get:
+            assert is_superuser(authorization, user_id, exp) is True
+            _superuser_decisions.clear()
+            assert is_superuser(authorization, user_id, exp) is True
+        assert sorted(
+            call.args[0] for call in mock_get.call_args_list
+        ) == ["auth", "users"]
+        assert redis_db.get(
+            SUPERUSER_DECISION_KEY.format(user_id=user_id)
+        ) == b"1"
+
+    def test_auth_and_users_calls_run_concurrently(self, test_db, user_id):
+        # Fails with BrokenBarrierError if the calls are made one by one.
+        barrier = threading.Barrier(2, timeout=5)
+        get = get_upstreams_mock({"is_superuser": True})
+
+        def wait_for_other_call(upstream, url, **kwargs):
+            barrier.wait()
+            return get(upstream, url, **kwargs)
+
+        with patch.object(
+            http_client, "get", side_effect=wait_for_other_call
+        ):
+            assert is_superuser(
+                get_authorization(), user_id, time.time() + 3600
+            ) is True
+
+    def test_cached_not_superuser_skips_auth_service(self, test_db, user_id):
+        _save_superuser_flag(user_id, False)
+        with patch.object(http_client, "get") as mock_get:
+            assert is_superuser(
+                get_authorization(), user_id, time.time() + 3600
+            ) is False
+        mock_get.assert_not_called()
+
+    def test_superuser_needs_valid_token(self, test_db, user_id):
+        _save_superuser_flag(user_id, True)
+        with patch.object(
+            http_client,
+            "get",
+            side_effect=get_upstreams_mock(
+                {"is_superuser": True}, auth_status=HTTPStatus.UNAUTHORIZED
+            ),
+        ):
+            assert is_superuser(
+                get_authorization(), user_id, time.time() + 3600
+            ) is False
+
+    def test_no_answer_of_users_service_is_not_cached(self, test_db, user_id):
+        with patch.object(
+            http_client, "get", side_effect=get_upstreams_mock(None)
+        ):
+            assert is_superuser(
+                get_authorization(), user_id, time.time() + 3600
+            ) is False
+        assert redis_db.get(
+            SUPERUSER_DECISION_KEY.format(user_id=user_id)
+        ) is None
+        assert _superuser_decisions.get(str(user_id)) is None
+
+    def test_rejected_token_drops_superuser_flag(self, test_db, user_id):
+        _save_superuser_flag(user_id, True)
+        with patch.object(
+            http_client,
+            "get",
+            side_effect=get_upstreams_mock(
+                {"is_superuser": True}, auth_status=HTTPStatus.UNAUTHORIZED
+            ),
+        ) as mock_get:
+            assert is_superuser(
+                get_authorization(), user_id, time.time() + 3600
+            ) is False
+        assert [call.args[0] for call in mock_get.call_args_list] == ["auth"]
+        assert redis_db.get(
+            SUPERUSER_DECISION_KEY.format(user_id=user_id)
+        ) is None
+        assert _superuser_decisions.get(str(user_id)) is None
@@ -0,0 +1,109 @@
+import json
+from http import HTTPStatus
+from unittest.mock import patch
+
+import pytest
+from flask import url_for
+
+from booking_app.http_client import (CircuitBreaker, CircuitOpenError,
+                                     HttpClient, http_client)
+
+
+def get_open_breaker(monotonic):
+    breaker = CircuitBreaker(
+        window=4,
+        min_calls=4,
+        failure_rate=0.5,
+        open_seconds=10,
+        slow_call_seconds=1,
+    )
+    for error in (False, False, True, True):
+        assert breaker.allow() is True
+        breaker.record(0.1, error)
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+class TestUpstreams:
+    def test_upstreams_get(self, test_client, access_token_headers):
+        http_client.record("films", 0.1)
+        http_client.record("films", 0.3, error=True)
+        url = url_for("upstreams.upstreams")
+        method = "get"
+        status = HTTPStatus.OK
+        response = getattr(test_client, method)(
+            url, headers=access_token_headers
+        )
+        films = [
+            upstream
+            for upstream in json.loads(response.data.decode("utf-8"))
+            if upstream["name"] == "films"
+        ]
+        assert response.status_code == status
+        assert films[0]["requests"] >= 2
+        assert films[0]["errors"] >= 1
+
+
+@patch("booking_app.http_client.time.monotonic", return_value=100.0)
+class TestCircuitBreaker:
+    def test_breaker_opens(self, monotonic):
+        breaker = get_open_breaker(monotonic)
+        assert breaker.allow() is False
+        assert breaker.opened == 1
+        assert breaker.rejected == 1
+
+    def test_breaker_counts_slow_calls(self, monotonic):
+        breaker = CircuitBreaker(4, 4, 0.5, 10, 1)
+        for latency in (0.1, 0.1, 2, 2):
+            breaker.record(latency, False)
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_half_open_breaker_lets_single_probe(self, monotonic):
+        breaker = get_open_breaker(monotonic)
+        monotonic.return_value += 10
+        assert breaker.allow() is True
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow() is False
+
+    def test_successful_probe_closes_breaker(self, monotonic):
+        breaker = get_open_breaker(monotonic)
+        monotonic.return_value += 10
+        assert breaker.allow() is True
+        breaker.record(0.1, False)
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow() is True
+
+    def test_failed_probe_opens_breaker_again(self, monotonic):
+        breaker = get_open_breaker(monotonic)
+        monotonic.return_value += 10
+        assert breaker.allow() is True
+        breaker.record(0.1, True)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.opened == 2
+        assert breaker.allow() is False
+
+    def test_lost_probe_is_replaced(self, monotonic):
+        breaker = get_open_breaker(monotonic)
+        monotonic.return_value += 10
+        assert breaker.allow() is True
+        monotonic.return_value += 10
+        assert breaker.allow() is True
+
+    def test_request_records_any_error(self, monotonic):
+        client = HttpClient()
+        breaker = client._upstream_stats("films").breaker
+        breaker.state = CircuitBreaker.HALF_OPEN
+        with patch.object(
+            client.session, "request", side_effect=RuntimeError
+        ):
+            with pytest.raises(RuntimeError):
+                client.get("films", "http://films")
+        assert client.stats()["films"]["errors"] == 1
+        assert breaker.state == CircuitBreaker.OPEN
+        monotonic.return_value += breaker.open_seconds
+        with pytest.raises(RuntimeError), patch.object(
+            client.session, "request", side_effect=RuntimeError
+        ):
+            client.get("films", "http://films")
+        with pytest.raises(CircuitOpenError):
+            client.get("films", "http://films")
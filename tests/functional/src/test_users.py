@@ -0,0 +1,67 @@
+import uuid
+from unittest.mock import patch
+
+from booking_app.api.v1.services.users import (USER_KEY, _local_cache,
+                                               users_exist)
+from booking_app.api.v1.services.users_info import (UsersInfoError,
+                                                    users_info_client)
+from booking_app.db import redis_db
+from booking_app.settings import settings
+
+
+def get_fetch_chunk_mock(users, failing_user_ids=()):
+    """_fetch_chunk answering a users_data page with the known users."""
+
+    async def fetch_chunk(user_ids, authorization=None):
+        if set(user_ids) & set(failing_user_ids):
+            raise UsersInfoError(retryable=False)
+        return {
+            user_id: users[user_id] for user_id in user_ids
+            if user_id in users
+        }
+
+    return fetch_chunk
+
+
+class TestUsersExist:
+    def test_users_are_checked_by_chunks(self, test_db):
+        user_ids = [str(uuid.uuid4()) for _ in range(5)]
+        users = {user_id: "login" for user_id in user_ids[:3]}
+        _local_cache.clear()
+        with patch.object(settings, "users_info_chunk_size", 2), \
+                patch.object(
+                    users_info_client,
+                    "_fetch_chunk",
+                    side_effect=get_fetch_chunk_mock(users),
+                ) as fetch_chunk:
+            result = users_exist(user_ids, "Bearer token")
+        assert result == {
+            user_id: user_id in users for user_id in user_ids
+        }
+        assert max(
+            len(call.args[0]) for call in fetch_chunk.call_args_list
+        ) == 2
+        assert redis_db.get(USER_KEY.format(user_id=user_ids[4])) == b"0"
+
+    def test_unanswered_users_are_not_cached(self, test_db):
+        user_ids = [str(uuid.uuid4()) for _ in range(4)]
+        users = {user_ids[0]: "login", user_ids[2]: "login"}
+        _local_cache.clear()
+        with patch.object(settings, "users_info_chunk_size", 2), \
+                patch.object(
+                    users_info_client,
+                    "_fetch_chunk",
+                    side_effect=get_fetch_chunk_mock(
+                        users, failing_user_ids=[user_ids[2]]
+                    ),
+                ):
+            result = users_exist(user_ids, "Bearer token")
+        assert result == {
+            user_ids[0]: True,
+            user_ids[1]: False,
+            user_ids[2]: None,
+            user_ids[3]: None,
+        }
+        for user_id in user_ids[2:]:
+            assert redis_db.get(USER_KEY.format(user_id=user_id)) is None
+            assert _local_cache.get(user_id, None) is None
@@ -0,0 +1,140 @@
+import asyncio
+import time
+import uuid
+from http import HTTPStatus
+from unittest.mock import patch
+
+import pytest
+
+from booking_app.api.v1.services.users_info import users_info_client
+from booking_app.http_client import http_client
+from booking_app.settings import settings
+
+
+class StubResponse:
+    def __init__(self, status, data=None):
+        self.status = status
+        self.data = data
+
+    async def json(self):
+        return self.data
+
+
+class StubRequest:
+    def __init__(self, answer, user_ids):
+        self.answer = answer
+        self.user_ids = user_ids
+
+    async def __aenter__(self):
+        return await self.answer(self.user_ids)
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class StubSession:
+    """aiohttp session answering users_data posts with answer(user_ids)."""
+
+    closed = False
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.requests = []
+
+    def post(self, url, json=None, headers=None):
+        self.requests.append(json["ids"])
+        return StubRequest(self.answer, json["ids"])
+
+
+@pytest.fixture
+def user_ids():
+    return [str(uuid.uuid4()) for _ in range(4)]
+
+
+@pytest.fixture(autouse=True)
+def users_info_settings():
+    # Keeps the users_info breaker of http_client out of these tests.
+    with patch.object(settings, "users_info_chunk_size", 2), \
+            patch.object(settings, "users_info_backoff_base", 0), \
+            patch.object(http_client, "allow"), \
+            patch.object(http_client, "record"):
+        yield
+
+
+def get_logins(session, user_ids):
+    with patch.object(
+        users_info_client, "_get_session", return_value=session
+    ):
+        return asyncio.run(users_info_client.get_logins(user_ids))
+
+
+class TestUsersInfoClient:
+    def test_ids_are_sent_by_chunks(self, user_ids):
+        async def answer(chunk):
+            return StubResponse(
+                HTTPStatus.OK, {user_id: "login" for user_id in chunk}
+            )
+
+        session = StubSession(answer)
+        logins, unresolved = get_logins(session, user_ids)
+        assert logins == {user_id: "login" for user_id in user_ids}
+        assert unresolved == []
+        assert session.requests == [user_ids[:2], user_ids[2:]]
+
+    def test_failing_chunk_is_retried(self, user_ids):
+        failures = [HTTPStatus.SERVICE_UNAVAILABLE]
+
+        async def answer(chunk):
+            if user_ids[0] in chunk and failures:
+                return StubResponse(failures.pop())
+            return StubResponse(
+                HTTPStatus.OK, {user_id: "login" for user_id in chunk}
+            )
+
+        session = StubSession(answer)
+        logins, unresolved = get_logins(session, user_ids)
+        assert set(logins) == set(user_ids)
+        assert unresolved == []
+        assert session.requests.count(user_ids[:2]) == 2
+
+    def test_client_error_is_not_retried(self, user_ids):
+        async def answer(chunk):
+            if user_ids[0] in chunk:
+                return StubResponse(HTTPStatus.BAD_REQUEST)
+            return StubResponse(
+                HTTPStatus.OK, {user_id: "login" for user_id in chunk}
+            )
+
+        session = StubSession(answer)
+        logins, unresolved = get_logins(session, user_ids)
+        assert set(logins) == set(user_ids[2:])
+        assert unresolved == user_ids[:2]
+        assert session.requests.count(user_ids[:2]) == 1
+
+    def test_chunk_is_unresolved_when_budget_runs_out(self, user_ids):
+        async def answer(chunk):
+            if user_ids[0] in chunk:
+                await asyncio.sleep(5)
+            return StubResponse(
+                HTTPStatus.OK, {user_id: "login" for user_id in chunk}
+            )
+
+        session = StubSession(answer)
+        started_at = time.monotonic()
+        with patch.object(settings, "users_info_timeout_budget", 0.1):
+            logins, unresolved = get_logins(session, user_ids)
+        assert time.monotonic() - started_at < 1
+        assert set(logins) == set(user_ids[2:])
+        assert unresolved == user_ids[:2]
+
+    def test_partial_answer(self, user_ids):
+        async def answer(chunk):
+            return StubResponse(
+                HTTPStatus.OK, {user_ids[0]: "login", user_ids[1]: None}
+            )
+
+        session = StubSession(answer)
+        logins, unresolved = get_logins(session, user_ids)
+        # Users missing in an answer are unknown, not unresolved.
+        assert logins == {user_ids[0]: "login"}
+        assert unresolved == []
@@ -1,5 +1,6 @@
 import random
 import uuid
+from datetime import datetime, timedelta
 
 import factory
 from booking_app.db_models import City, Place, Event, Booking, BlackList
@@ -48,8 +49,13 @@ class EventFactory(factory.alchemy.SQLAlchemyModelFactory):
     created_at = factory.Faker("date_time_this_year", before_now=True)
     host_id = factory.LazyAttribute(lambda a: uuid.uuid4())
     film_work_id = factory.LazyAttribute(lambda a: uuid.uuid4())
-    event_start = factory.Faker("date_time_this_year", before_now=True)
-    event_end = factory.Faker("date_time_this_year", after_now=True)
+    # Events of one place must not overlap, each gets its own future day.
+    event_start = factory.Sequence(
+        lambda n: datetime.now() + timedelta(days=10 + n)
+    )
+    event_end = factory.LazyAttribute(
+        lambda a: a.event_start + timedelta(hours=2)
+    )
     max_tickets_count = random.randint(20, 100)
 
 
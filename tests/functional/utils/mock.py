@@ -34,6 +34,10 @@ def mock_check_user_exist(request_obj, user_id):
     pass
 
 
+def mock_check_users_exist(request_obj, user_ids):
+    return {str(user_id): None for user_id in user_ids}
+
+
 async def mock_get_users_logins(users_ids: List):
     data = []
     for user_id in users_ids: